@@ -1,4 +1,20 @@
-from .core import GitFlow
-from .commands import *
-
 __version__ = '0.1.1'
+
+__all__ = [
+    'GitFlow',
+    'FeatureCommand',
+    'ReleaseCommand',
+    'HotfixCommand',
+    'SupportCommand',
+    'BugfixCommand'
+]
+
+def __getattr__(name):
+    """Import GitFlow and the command classes on first access"""
+    if name == 'GitFlow':
+        from .core import GitFlow
+        return GitFlow
+    if name in __all__:
+        from . import commands
+        return getattr(commands, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,8 +1,37 @@
-from .cli import CLI
+import os
+import sys
+
 
 def main():
-    cli = CLI()
-    cli.run()
+    """Console script entry point
+
+    Answers --version and status --prompt, and hands read-only queries to
+    a running daemon, before the CLI module and typer with it are imported.
+    """
+    argv = sys.argv[1:]
+    if argv == ['--version']:
+        from . import __version__
+        print(f"git-flow {__version__}")
+        return
+    if argv == ['status', '--prompt']:
+        from .prompt import prompt_status
+        try:
+            line = prompt_status()
+        except OSError:
+            # A broken or half-initialized repository must not break the shell prompt
+            return
+        if line:
+            print(line)
+        return
+    from .daemon import route
+    answer = route(argv, os.getcwd())
+    if answer is not None:
+        sys.stdout.write(answer['stdout'])
+        sys.stderr.write(answer['stderr'])
+        sys.exit(answer['code'])
+    from .cli import main as cli_main
+    cli_main()
+
 
 if __name__ == '__main__':
     main()
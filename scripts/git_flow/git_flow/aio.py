@@ -0,0 +1,220 @@
+"""
+Async Git Flow Module
+
+AsyncGitFlow exposes the read-only GitFlow queries as coroutines. Git runs
+through ``asyncio.create_subprocess_exec`` behind a semaphore, so
+independent queries can be awaited together with ``asyncio.gather`` while
+at most ``concurrency`` git processes run at once. Lookups GitFlow answers
+in process (the ref snapshot, HEAD, the commit-graph) are reused as is and
+never leave the event loop.
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional, Tuple
+from .core import GitFlow, GitFlowError, NON_REF_REVISION_RE, REF_MUTATING_COMMANDS, WORKTREE_MUTATING_COMMANDS
+from .graph import CommitGraphError
+from .refs import RefFormatError
+from .status import BranchStatus, BranchStatusEngine
+from . import trace
+
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncGitFlow:
+    """
+    Asyncio counterpart of GitFlow's query methods
+
+    Attributes:
+        gitflow (GitFlow): Synchronous instance holding settings, the ref
+            snapshot and the commit-graph
+        concurrency (int): Maximum number of git processes running at once
+    """
+
+    def __init__(self, repo_path: str = '.', concurrency: int = DEFAULT_CONCURRENCY,
+                 gitflow: Optional[GitFlow] = None):
+        self.gitflow = gitflow or GitFlow(repo_path)
+        self.concurrency = concurrency
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the wrapped GitFlow"""
+        self.gitflow.close()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent git processes, created inside the running loop"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _git_command(self, args: List[str], check: bool = True, input: Optional[str] = None) -> str:
+        """Execute git command without blocking the event loop and return output"""
+        if args and args[0] in REF_MUTATING_COMMANDS:
+            self.gitflow._refs = None
+        if args and args[0] in WORKTREE_MUTATING_COMMANDS:
+            self.gitflow._tree_status = None
+        async with self.semaphore:
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                'git', *args,
+                cwd=self.gitflow.repo_path,
+                stdin=asyncio.subprocess.PIPE if input is not None else asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate(input.encode() if input is not None else None)
+            trace.record_git(args, start, process.returncode, stdout, stderr)
+        if check and process.returncode != 0:
+            raise GitFlowError(f"Git command failed: {stderr.decode(errors='replace')}")
+        return stdout.decode(errors='replace')
+
+    async def rev_parse(self, rev: str) -> str:
+        """Resolve revision to object name, spawning git only for non-ref revisions"""
+        sha = self.gitflow.refs.resolve(rev)
+        trusted = False
+        if sha is None and self.gitflow._ref_reader.supported:
+            try:
+                sha = self.gitflow._ref_reader.resolve(rev)
+                trusted = not NON_REF_REVISION_RE.search(rev)
+            except (OSError, RefFormatError):
+                pass
+        if sha is None and not trusted:
+            sha = (await self._git_command(['rev-parse', '--quiet', '--verify', rev], check=False)).strip() or None
+        if sha is None:
+            raise GitFlowError(f"Unknown revision: {rev}")
+        return sha
+
+    async def get_current_branch(self) -> str:
+        """Get current branch name"""
+        if self.gitflow._ref_reader.supported:
+            return self.gitflow.get_current_branch()
+        return (await self._git_command(['branch', '--show-current'])).strip()
+
+    async def is_clean_working_tree(self, untracked: Optional[bool] = None) -> bool:
+        """Check if working tree and index match HEAD, sharing GitFlow's memoized result"""
+        if untracked is None:
+            untracked = self.gitflow.untracked_dirty
+        status = self.gitflow._tree_status
+        if status is None or (untracked and status[1] is None):
+            try:
+                output = await self._git_command(GitFlow._tree_status_args(untracked))
+            except GitFlowError:
+                return False
+            status = self.gitflow._tree_status = GitFlow._parse_tree_status(output, untracked)
+        tracked_changes, has_untracked = status
+        return not tracked_changes and not (untracked and has_untracked)
+
+    async def branch_exists(self, branch: str) -> bool:
+        """Check if branch exists"""
+        return self.gitflow.branch_exists(branch)
+
+    async def tag_exists(self, tag: str) -> bool:
+        """Check if tag exists"""
+        return self.gitflow.tag_exists(tag)
+
+    async def get_branches(self, remote: bool = False, prefix: str = '') -> List[str]:
+        """Get list of branches, optionally only those starting with prefix"""
+        return self.gitflow.get_branches(remote=remote, prefix=prefix)
+
+    async def get_remote_branches(self) -> List[str]:
+        """Get list of remote branches"""
+        return self.gitflow.get_remote_branches()
+
+    async def get_all_tags(self) -> List[str]:
+        """Get all tags"""
+        return self.gitflow.get_all_tags()
+
+    async def merge_base(self, commit1: str, commit2: str) -> Optional[str]:
+        """Merge base from the commit-graph, falling back to git merge-base"""
+        commit1, commit2 = await asyncio.gather(self.rev_parse(commit1), self.rev_parse(commit2))
+        graph = self.gitflow.commit_graph
+        if graph is not None and graph.contains([commit1, commit2]):
+            try:
+                return graph.merge_base(commit1, commit2)
+            except CommitGraphError:
+                pass
+        return (await self._git_command(['merge-base', commit1, commit2], check=False)).strip() or None
+
+    async def compare_branches(self, branch1: str, branch2: str) -> int:
+        """Compare two branches, with the same return codes as GitFlow.compare_branches"""
+        commit1, commit2 = await asyncio.gather(self.rev_parse(branch1), self.rev_parse(branch2))
+        if commit1 == commit2:
+            return 0
+        base = await self.merge_base(commit1, commit2)
+        if base is None:
+            return 4
+        if commit1 == base:
+            return 1
+        if commit2 == base:
+            return 2
+        return 3
+
+    async def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check if ancestor is reachable from descendant, sharing GitFlow's memo"""
+        key = tuple(await asyncio.gather(self.rev_parse(ancestor), self.rev_parse(descendant)))
+        if key[0] == key[1]:
+            return True
+        if key not in self.gitflow._ancestry:
+            graph = self.gitflow.commit_graph
+            if graph is not None and graph.contains(list(key)):
+                try:
+                    self.gitflow._ancestry[key] = graph.is_ancestor(key[0], key[1])
+                    return self.gitflow._ancestry[key]
+                except CommitGraphError:
+                    pass
+            self.gitflow._ancestry[key] = await self._exit_ok(['merge-base', '--is-ancestor', key[0], key[1]])
+        return self.gitflow._ancestry[key]
+
+    async def is_branch_merged_into(self, subject: str, base: str) -> bool:
+        """Check if subject branch has been merged into base branch"""
+        return await self.is_ancestor(subject, base)
+
+    async def branch_statuses(self, branches: List[str], target: str,
+                              counts: bool = True) -> Dict[str, BranchStatus]:
+        """Status of every branch against target, as BranchStatusEngine.compute"""
+        if not branches:
+            return {}
+        engine = BranchStatusEngine(self.gitflow)
+        target_sha, tips, seeds, full = engine._seed(branches, target)
+        key = engine._cache_key(branches, target_sha, tips, counts)
+        cached = engine._cached(key)
+        if cached is not None:
+            return cached
+        common = None
+        painted = engine._paint_graph(seeds, full)
+        if painted is None:
+            common, painted = await self._paint_git(engine, seeds)
+        return engine._remember(key, engine._statuses(branches, target_sha, tips, full, painted, common, counts))
+
+    async def status_by_target(self, targets: Dict[str, List[str]],
+                               counts: bool = True) -> Dict[str, Dict[str, BranchStatus]]:
+        """Compute statuses for several targets (e.g. develop and main) concurrently"""
+        names = list(targets)
+        results = await asyncio.gather(*(self.branch_statuses(targets[name], name, counts) for name in names))
+        return dict(zip(names, results))
+
+    async def _paint_git(self, engine: BranchStatusEngine,
+                         seeds: Dict[str, int]) -> Tuple[Optional[str], List[Tuple[str, int]]]:
+        """Async version of BranchStatusEngine._paint_git"""
+        common = None
+        if len(seeds) > 1:
+            common = (await self._git_command(['merge-base', '--octopus'] + list(seeds), check=False)).strip() or None
+        revs = list(seeds) + ([f"^{common}"] if common else [])
+        output = await self._git_command(['rev-list', '--topo-order', '--parents', '--stdin'],
+                                         input='\n'.join(revs) + '\n')
+        return common, list(engine._masks(output, seeds))
+
+    async def _exit_ok(self, args: List[str]) -> bool:
+        """Run git and report whether it exited with status 0"""
+        try:
+            await self._git_command(args)
+            return True
+        except GitFlowError:
+            return False
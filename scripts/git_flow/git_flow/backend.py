@@ -0,0 +1,101 @@
+"""
+Git Backend Module
+
+Keeps a long-lived ``git cat-file --batch-command`` process open for the
+lifetime of a GitFlow instance. Read-only lookups such as rev-parse and
+branch existence checks are answered over its pipes instead of forking a
+new git process for every query. Mutating commands still go through
+one-shot subprocesses in GitFlow._git_command.
+"""
+
+import subprocess
+import time
+from typing import List, Optional
+from . import trace
+
+
+class GitBackendError(Exception):
+    pass
+
+
+class GitBackend:
+    """
+    Persistent git worker for read-only queries
+
+    The worker process is started lazily on the first query and restarted
+    if it dies. When git does not support ``--batch-command`` (git < 2.36)
+    the backend marks itself unavailable and callers fall back to one-shot
+    subprocesses.
+
+    Attributes:
+        repo_path (str): Repository working directory
+        available (bool): False once the worker could not be started
+    """
+
+    def __init__(self, repo_path: str):
+        self.repo_path = repo_path
+        self.available = True
+        self._process = None
+
+    def _ensure_process(self):
+        """Start the cat-file worker if it is not running"""
+        if self._process is not None and self._process.poll() is None:
+            return
+        if not self.available:
+            raise GitBackendError("Git backend is not available")
+        try:
+            self._process = subprocess.Popen(
+                ['git', 'cat-file', '--batch-command'],
+                cwd=self.repo_path,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            self.available = False
+            raise GitBackendError(f"Failed to start git backend: {str(e)}")
+
+    def _request(self, command: str) -> List[str]:
+        """Send one batch command and return the fields of its header line"""
+        self._ensure_process()
+        start = time.perf_counter()
+        try:
+            self._process.stdin.write(f"{command}\n".encode())
+            self._process.stdin.flush()
+            line = self._process.stdout.readline()
+        except (OSError, ValueError):
+            line = b''
+        trace.record_git(['cat-file', '--batch-command', command], start, 0 if line else 1, line)
+        if not line:
+            # The worker exited; an old git rejects --batch-command with usage
+            if self._process.wait() == 129:
+                self.available = False
+            self.close()
+            raise GitBackendError("Git backend terminated unexpectedly")
+        return line.decode().split()
+
+    def resolve(self, rev: str) -> Optional[str]:
+        """Resolve a revision to its object name, None if it does not exist"""
+        if not rev or '\n' in rev:
+            return None
+        fields = self._request(f"info {rev}")
+        if len(fields) != 3:
+            # "<rev> missing" or "<rev> ambiguous"
+            return None
+        return fields[0]
+
+    def close(self):
+        """Terminate the worker process"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
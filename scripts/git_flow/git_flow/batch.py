@@ -0,0 +1,264 @@
+"""
+Batch Module
+
+Runs many branch commands in one process on one shared GitFlow, so the
+interpreter start, imports, config parsing and ref snapshot are paid once
+instead of once per command, and each command reuses the caches the ones
+before it warmed. The fetches of all track and pull commands are coalesced
+into one per remote.
+
+Commands are read one per line, as plain text (``feature start login``,
+with ``--flag`` and ``--key=value`` options), as a JSON array of
+arguments, or as a JSON object with ``args`` (or a ``command`` string)
+and an ``options`` mapping. Blank lines and lines starting with ``#`` are
+skipped. With ``atomic`` the local branches, tags, HEAD and working tree
+are checkpointed first and restored if any command fails; pushes that
+already reached a remote cannot be taken back.
+"""
+
+import json
+import os
+import shlex
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .core import GitFlow, GitFlowError
+from .multi import format_output, run_branch_command
+
+# Namespaces a checkpoint covers; remote-tracking refs mirror the remote and are left alone
+CHECKPOINT_NAMESPACES = ('refs/heads/', 'refs/tags/')
+
+# Leading words accepted so lines can be pasted from shell scripts
+COMMAND_PREFIXES = ('git-flow', 'git', 'flow', 'branch')
+
+
+class BatchCommand:
+    """
+    One parsed input line
+
+    Attributes:
+        line (int): Line number in the input
+        args (List[str]): Branch command arguments, e.g. ['feature', 'start', 'login']
+        options (Dict[str, object]): Keyword arguments for the command method
+    """
+
+    def __init__(self, line: int, args: List[str], options: Optional[Dict[str, object]] = None):
+        self.line = line
+        self.args = args
+        self.options = options or {}
+
+
+class BatchResult:
+    """
+    Outcome of one command
+
+    Attributes:
+        command (BatchCommand): Command that ran
+        ok (bool): Whether it succeeded
+        output (str): Text rendered from its return value
+        error (str): Error message if it failed
+        duration (float): Seconds it took
+        skipped (bool): Whether it never ran because an earlier command failed
+    """
+
+    def __init__(self, command: BatchCommand, ok: bool, output: str = '', error: str = '',
+                 duration: float = 0.0, skipped: bool = False):
+        self.command = command
+        self.ok = ok
+        self.output = output
+        self.error = error
+        self.duration = duration
+        self.skipped = skipped
+
+    def to_dict(self) -> Dict[str, object]:
+        """Result as the JSON object written per command"""
+        return {
+            'line': self.command.line,
+            'args': self.command.args,
+            'options': self.command.options,
+            'ok': self.ok,
+            'skipped': self.skipped,
+            'output': self.output,
+            'error': self.error,
+            'duration': round(self.duration, 6),
+        }
+
+
+def _parse_option(word: str) -> Tuple[str, object]:
+    """Turn '--dry-run' into ('dry_run', True) and '--bump=minor' into ('bump', 'minor')"""
+    key, has_value, value = word[2:].partition('=')
+    return key.replace('-', '_'), value if has_value else True
+
+
+def parse_line(text: str, line: int) -> Optional[BatchCommand]:
+    """
+    Parse one input line, None for blank lines and comments
+
+    Raises:
+        ValueError: If the line is malformed
+    """
+    text = text.strip()
+    if not text or text.startswith('#'):
+        return None
+    if text[0] in '[{':
+        data = json.loads(text)
+        if isinstance(data, dict):
+            args = data.get('args')
+            if args is None:
+                args = shlex.split(str(data.get('command', '')))
+            options = data.get('options') or {}
+        else:
+            args, options = data, {}
+        if not isinstance(args, list) or not isinstance(options, dict):
+            raise ValueError(f"Line {line}: expected 'args' to be a list and 'options' an object")
+        words = [str(arg) for arg in args]
+    else:
+        words = shlex.split(text)
+        options = {}
+    args = []
+    for word in words:
+        if word.startswith('--'):
+            key, value = _parse_option(word)
+            options[key] = value
+        else:
+            args.append(word)
+    while args and args[0] in COMMAND_PREFIXES:
+        args.pop(0)
+    if len(args) < 2:
+        raise ValueError(f"Line {line}: expected '<type> <subcommand> [args...]', got {text!r}")
+    return BatchCommand(line, args, options)
+
+
+def parse_commands(lines: Iterable[str]) -> Iterator[BatchCommand]:
+    """
+    Parse input lazily, one command per non-blank line
+
+    Raises:
+        ValueError: If a line is malformed
+    """
+    for number, text in enumerate(lines, 1):
+        try:
+            command = parse_line(text, number)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON: {e}")
+        if command is not None:
+            yield command
+
+
+class RefCheckpoint:
+    """
+    Local branches, tags, HEAD and working tree at one point in time
+
+    Attributes:
+        refs (Dict[str, str]): SHA per refname in CHECKPOINT_NAMESPACES
+        head (Optional[str]): Branch HEAD pointed to, None if detached
+        head_sha (Optional[str]): Commit HEAD resolved to
+        clean (bool): Whether the working tree was clean, so it may be reset
+    """
+
+    def __init__(self, gitflow: GitFlow):
+        self.gitflow = gitflow
+        gitflow.invalidate()
+        refs = gitflow.refs
+        self.refs = {refname: refs.get(refname)
+                     for namespace in CHECKPOINT_NAMESPACES for refname in refs.scan(namespace)}
+        self.head = gitflow.get_current_branch() or None
+        self.head_sha = refs.get(f"refs/heads/{self.head}") if self.head else gitflow._resolve('HEAD')
+        self.clean = gitflow.is_clean_working_tree()
+
+    def restore(self) -> int:
+        """
+        Put refs, HEAD and (if it was clean) the working tree back
+
+        Returns:
+            int: Number of refs that were changed back
+
+        Raises:
+            GitFlowError: If the refs could not be restored
+        """
+        gitflow = self.gitflow
+        if os.path.exists(os.path.join(gitflow.git_dir, 'MERGE_HEAD')):
+            gitflow._git_command(['merge', '--abort'], check=False)
+        gitflow.invalidate()
+        refs = gitflow.refs
+        current = {refname: refs.get(refname)
+                   for namespace in CHECKPOINT_NAMESPACES for refname in refs.scan(namespace)}
+        updates = [(refname, self.refs.get(refname), current.get(refname))
+                   for refname in sorted(set(self.refs) | set(current))
+                   if self.refs.get(refname) != current.get(refname)]
+        if updates:
+            gitflow.update_refs_atomic(updates, message="flow: batch rollback")
+
+        if self.head:
+            gitflow._git_command(['symbolic-ref', 'HEAD', f"refs/heads/{self.head}"])
+        elif self.head_sha:
+            gitflow._git_command(['update-ref', '--no-deref', 'HEAD', self.head_sha])
+        if self.clean and self.head_sha:
+            # Anything the batch left in the index or files came from its own commands
+            gitflow._git_command(['read-tree', '--reset', '-u', self.head_sha])
+        return len(updates)
+
+
+def run_batch(gitflow: GitFlow, commands: Iterable[BatchCommand], fail_fast: bool = False,
+              atomic: bool = False, on_result: Optional[Callable[[BatchResult], None]] = None
+              ) -> Tuple[List[BatchResult], Optional[int]]:
+    """
+    Run commands in order on one GitFlow
+
+    The remote branches every track and pull needs are fetched first, in
+    one fetch per remote, so the commands themselves only touch local refs.
+    Branches the prefetch found missing, or that an earlier command pushed,
+    are fetched again when their command runs.
+
+    Args:
+        gitflow: Shared instance, whose caches carry over between commands
+        commands: Parsed commands
+        fail_fast: Skip the remaining commands after the first failure
+        atomic: Checkpoint local refs first and restore them if any command
+            fails; implies fail_fast
+        on_result: Called with each result as soon as it is available
+
+    Returns:
+        Tuple[List[BatchResult], Optional[int]]: Results in input order and,
+        if a rollback ran, the number of refs it restored
+
+    Raises:
+        GitFlowError: If the rollback failed, naming the command that failed first
+    """
+    checkpoint = RefCheckpoint(gitflow) if atomic else None
+    commands = list(commands)
+    planner = gitflow.fetch_planner
+    if sum(planner.add_command(command.args, command.options) for command in commands) > 1:
+        try:
+            planner.run()
+        except GitFlowError:
+            # Each track and pull then fetches on its own and reports the error
+            planner.pending.clear()
+    results = []
+    failed = False
+    for command in commands:
+        if failed and (fail_fast or atomic):
+            result = BatchResult(command, False, error='Skipped after an earlier failure', skipped=True)
+        else:
+            start = time.perf_counter()
+            try:
+                value = run_branch_command(gitflow, command.args, command.options)
+                result = BatchResult(command, True, output=format_output(value),
+                                     duration=time.perf_counter() - start)
+            except Exception as e:
+                # Any failure, e.g. NotImplementedError from 'develop start', is this line's result
+                result = BatchResult(command, False, error=str(e) or type(e).__name__,
+                                     duration=time.perf_counter() - start)
+                failed = True
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    restored = None
+    if checkpoint is not None and failed:
+        first = next(result for result in results if not result.ok and not result.skipped)
+        try:
+            restored = checkpoint.restore()
+        except GitFlowError as e:
+            raise GitFlowError(f"Line {first.command.line} failed: {first.error}; rollback failed: {str(e)}")
+    return results, restored
@@ -0,0 +1,22 @@
+"""
+Benchmark Package
+
+Measures git-flow at scale: generates synthetic repositories with
+``git fast-import``, times every command path against them and compares
+the results with a stored baseline. Run it with ``python -m git_flow.bench``.
+"""
+
+from .cases import BenchCase, default_cases
+from .generate import RepoSpec, generate_repo
+from .runner import compare, load_results, run_benchmarks, write_results
+
+__all__ = [
+    'BenchCase',
+    'RepoSpec',
+    'compare',
+    'default_cases',
+    'generate_repo',
+    'load_results',
+    'run_benchmarks',
+    'write_results'
+]
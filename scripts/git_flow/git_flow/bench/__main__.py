@@ -0,0 +1,99 @@
+"""
+Benchmark command line
+
+    python -m git_flow.bench [--repo DIR] [--features N ...] [--case GLOB ...]
+                             [--output results.json] [--baseline baseline.json]
+
+Without --repo a repository is generated from the size options into the
+work directory. Exits with status 1 if a case failed, went over its time
+budget or regressed against the baseline.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .cases import default_cases
+from .generate import RepoSpec, generate_repo
+from .runner import (DEFAULT_MIN_DELTA, DEFAULT_THRESHOLD, compare, format_row, header,
+                     load_results, over_budget, run_benchmarks, select_cases, write_results)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    defaults = RepoSpec()
+    parser = argparse.ArgumentParser(prog='python -m git_flow.bench', description='Benchmark git-flow commands')
+    parser.add_argument('--repo', help='Benchmark an existing repository (default prefixes) instead of generating one')
+    parser.add_argument('--workdir', help='Directory for the generated repository and per-case copies')
+    parser.add_argument('--keep', action='store_true', help='Keep the work directory')
+    for field in ('features', 'releases', 'hotfixes', 'supports', 'tags', 'commits', 'files'):
+        parser.add_argument(f'--{field}', type=int, default=getattr(defaults, field),
+                            help=f'Number of {field} to generate (default {getattr(defaults, field)})')
+    parser.add_argument('--no-commit-graph', action='store_true', help='Do not write a commit-graph')
+    parser.add_argument('--case', action='append', dest='cases', help='Only run cases matching this glob')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed iterations per case')
+    parser.add_argument('--output', help='Write results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with results from an earlier run')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown counted as a regression')
+    parser.add_argument('--min-delta', type=float, default=DEFAULT_MIN_DELTA,
+                        help='Absolute slowdown in seconds a regression must also exceed')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    cases = select_cases(default_cases(), args.cases)
+    if not cases:
+        print('No cases match', file=sys.stderr)
+        return 1
+    baseline = load_results(args.baseline) if args.baseline else None
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='git-flow-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        spec = None
+        repo = os.path.abspath(args.repo) if args.repo else None
+        if repo is None:
+            spec = RepoSpec(args.features, args.releases, args.hotfixes, args.supports,
+                            args.tags, args.commits, args.files)
+            repo = os.path.join(workdir, 'repo')
+            start = time.perf_counter()
+            generate_repo(repo, spec, commit_graph=not args.no_commit_graph)
+            print(f"Generated {repo} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+        failed = []
+        regressed = []
+        slow = []
+
+        def on_result(name, result):
+            comparison = compare({name: result}, baseline, args.threshold, args.min_delta) if baseline else []
+            if 'error' in result:
+                failed.append(name)
+            if comparison and comparison[0].regressed:
+                regressed.append(name)
+            if over_budget(result):
+                slow.append(name)
+            print(format_row(name, result, comparison[0] if comparison else None), flush=True)
+
+        print(header(baseline is not None))
+        results = run_benchmarks(repo, cases, os.path.join(workdir, 'cases'), args.repeat, on_result)
+        if args.output:
+            write_results(args.output, results, spec.to_dict() if spec else None)
+    finally:
+        if not args.keep and not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if failed:
+        print(f"Failed: {', '.join(failed)}", file=sys.stderr)
+    if regressed:
+        print(f"Regressed: {', '.join(regressed)}", file=sys.stderr)
+    if slow:
+        print(f"Over budget: {', '.join(slow)}", file=sys.stderr)
+    return 1 if failed or regressed or slow else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Benchmark Cases
+
+Every command path worth timing, as a BenchCase. Cases construct their
+own GitFlow inside the timed region, as each CLI invocation does. Cases
+that change the repository run in a private copy of it, and prepare what
+each iteration needs (e.g. a branch with a commit to finish) outside the
+timed region with plumbing commands.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Callable, List, Optional
+
+from ..core import GitFlow
+
+
+class BenchCase:
+    """
+    One timed command path
+
+    Attributes:
+        name (str): Case name, e.g. 'feature.finish'
+        run (Callable[[str, int], None]): Timed body, called with the repository path and iteration
+        before (Optional[Callable[[str, int], None]]): Untimed setup run before each iteration
+        mutates (bool): Whether the case changes the repository and needs its own copy
+        budget (Optional[float]): Median in seconds the case must stay under, None for no limit
+    """
+
+    def __init__(self, name: str, run: Callable[[str, int], None],
+                 before: Optional[Callable[[str, int], None]] = None, mutates: bool = False,
+                 budget: Optional[float] = None):
+        self.name = name
+        self.run = run
+        self.before = before
+        self.mutates = mutates
+        self.budget = budget
+
+
+def _git(repo: str, *args: str, input: Optional[str] = None) -> str:
+    """Run git in repo and return its output"""
+    return subprocess.run(['git'] + list(args), cwd=repo, check=True, capture_output=True,
+                          text=True, input=input).stdout.strip()
+
+
+def branch_with_commit(repo: str, branch: str, base: str):
+    """Create branch as base plus one commit adding a file, without touching the working tree"""
+    blob = _git(repo, 'hash-object', '-w', '--stdin', input=f"{branch}\n")
+    entries = _git(repo, 'ls-tree', base)
+    path = f"bench-{branch.replace('/', '-')}.txt"
+    tree = _git(repo, 'mktree', input=f"{entries}\n100644 blob {blob}\t{path}\n")
+    commit = _git(repo, 'commit-tree', tree, '-p', base, '-m', f"Work on {branch}")
+    _git(repo, 'update-ref', f"refs/heads/{branch}", commit)
+
+
+def delete_branches(repo: str, prefix: str):
+    """Check develop out and delete every local branch starting with prefix"""
+    _git(repo, 'checkout', '-q', 'develop')
+    refs = _git(repo, 'for-each-ref', '--format=%(refname)', f"refs/heads/{prefix}*")
+    if refs:
+        _git(repo, 'update-ref', '--stdin', input=''.join(f"delete {ref}\n" for ref in refs.splitlines()))
+
+
+def _command(class_name: str, method: str, *args, **kwargs) -> Callable[[str, int], None]:
+    """Timed body constructing GitFlow and calling a branch command, with {i} in args formatted"""
+    def run(repo: str, i: int):
+        from ..commands import branch
+        with GitFlow(repo) as gitflow:
+            command = getattr(branch, class_name)(gitflow)
+            getattr(command, method)(*(arg.format(i=i) for arg in args), **kwargs)
+    return run
+
+
+def _cli(*args: str) -> Callable[[str, int], None]:
+    """Timed body starting the CLI with args in a fresh interpreter"""
+    def run(repo: str, i: int):
+        package_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get('PYTHONPATH')])))
+        subprocess.run([sys.executable, '-m', 'git_flow'] + list(args), cwd=repo, env=env,
+                       check=True, capture_output=True)
+    return run
+
+
+def _prompt(repo: str, i: int):
+    """Prompt string for the checked-out branch, as status --prompt prints it"""
+    from ..prompt import prompt_status
+    prompt_status(repo)
+
+
+def _load_refs(repo: str, i: int):
+    """Load the ref snapshot"""
+    with GitFlow(repo) as gitflow:
+        gitflow.refs
+
+
+def _clean_tree(repo: str, i: int):
+    """Check the working tree with one git status"""
+    with GitFlow(repo) as gitflow:
+        gitflow.is_clean_working_tree()
+
+
+def _compare(repo: str, i: int):
+    """Compare a feature branch with develop"""
+    with GitFlow(repo) as gitflow:
+        gitflow.compare_branches(f"{gitflow.prefix['feature']}f0", gitflow.develop_branch)
+
+
+def _init(repo: str, i: int):
+    """Initialize git-flow with the default configuration"""
+    from ..commands.setup import InitCommand
+    with GitFlow(repo) as gitflow:
+        InitCommand(gitflow).init(defaults=True)
+
+
+def _remove_config(repo: str, i: int):
+    """Drop the configuration so init starts from scratch"""
+    os.remove(os.path.join(repo, '.git_flow', 'config.yaml'))
+
+
+def default_cases() -> List[BenchCase]:
+    """Every benchmark case, read-only ones first"""
+    return [
+        # A fresh interpreter alone takes about 10 ms and importing typer about 80 ms,
+        # so these budgets catch the fast paths starting to load the CLI module
+        BenchCase('cli.version', _cli('--version'), budget=0.05),
+        BenchCase('cli.status_prompt', _cli('status', '--prompt'), budget=0.05),
+        # The prompt logic alone, in process, without interpreter start
+        BenchCase('status.prompt', _prompt, budget=0.005),
+        BenchCase('core.gitflow', lambda repo, i: GitFlow(repo).close()),
+        BenchCase('core.refs', _load_refs),
+        BenchCase('core.is_clean_working_tree', _clean_tree),
+        BenchCase('core.compare_branches', _compare),
+        BenchCase('feature.list', _command('FeatureCommand', 'list')),
+        BenchCase('feature.list_verbose', _command('FeatureCommand', 'list', verbose=True)),
+        BenchCase('release.list_verbose', _command('ReleaseCommand', 'list', verbose=True)),
+        BenchCase('hotfix.list_verbose', _command('HotfixCommand', 'list', verbose=True)),
+        BenchCase('overview', _command('OverviewCommand', 'overview')),
+        BenchCase('feature.start', _command('FeatureCommand', 'start', 'bench{i}'), mutates=True),
+        BenchCase('feature.finish', _command('FeatureCommand', 'finish', 'fin{i}'),
+                  before=lambda repo, i: branch_with_commit(repo, f"feature-fin{i}", 'develop'), mutates=True),
+        BenchCase('feature.publish', _command('FeatureCommand', 'publish', 'pub{i}'),
+                  before=lambda repo, i: branch_with_commit(repo, f"feature-pub{i}", 'develop'), mutates=True),
+        BenchCase('release.start', _command('ReleaseCommand', 'start', '900.{i}.0'),
+                  before=lambda repo, i: delete_branches(repo, 'release-'), mutates=True),
+        BenchCase('release.finish', _command('ReleaseCommand', 'finish', 'bench{i}'),
+                  before=lambda repo, i: branch_with_commit(repo, f"release-bench{i}", 'develop'), mutates=True),
+        BenchCase('hotfix.start', _command('HotfixCommand', 'start', '900.0.{i}'),
+                  before=lambda repo, i: delete_branches(repo, 'hotfix-'), mutates=True),
+        BenchCase('hotfix.finish', _command('HotfixCommand', 'finish', 'bench{i}'),
+                  before=lambda repo, i: branch_with_commit(repo, f"hotfix-bench{i}", 'main'), mutates=True),
+        BenchCase('setup.init', _init, before=_remove_config, mutates=True),
+    ]
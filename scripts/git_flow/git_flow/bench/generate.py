@@ -0,0 +1,153 @@
+"""
+Synthetic Repository Generator
+
+Builds benchmark repositories with a single ``git fast-import`` stream:
+a linear history on main, develop on top of it, flow branches of every
+type each carrying one commit, annotated version tags spread over the
+history and a working tree of configurable size. A bare repository next
+to it serves as the origin remote.
+"""
+
+import os
+import shutil
+import subprocess
+from typing import Dict, Iterator, Optional
+
+IDENT = 'Benchmark <bench@example.com>'
+EPOCH = 1700000000
+
+# Files per directory of the generated working tree
+FILES_PER_DIR = 100
+
+
+class RepoSpec:
+    """
+    Shape of a generated repository
+
+    Attributes:
+        features (int): Feature branches, based on develop
+        releases (int): Release branches, based on develop
+        hotfixes (int): Hotfix branches, based on main
+        supports (int): Support branches, based on main
+        tags (int): Annotated version tags on main's history
+        commits (int): Commits on main
+        files (int): Files in the working tree
+    """
+
+    def __init__(self, features: int = 1000, releases: int = 10, hotfixes: int = 10,
+                 supports: int = 10, tags: int = 1000, commits: int = 10000, files: int = 10000):
+        self.features = features
+        self.releases = releases
+        self.hotfixes = hotfixes
+        self.supports = supports
+        self.tags = tags
+        self.commits = max(1, commits)
+        self.files = files
+
+    def to_dict(self) -> Dict[str, int]:
+        """Spec as a plain dict, as stored with the results"""
+        return dict(vars(self))
+
+
+def _data(text: str) -> str:
+    """fast-import data block, ending in the optional LF that separates it from the next command"""
+    return f"data {len(text.encode())}\n{text}\n"
+
+
+def _commit(ref: str, mark: int, message: str, parent: Optional[str], changes: str = '') -> str:
+    """fast-import commit command"""
+    header = f"commit {ref}\nmark :{mark}\ncommitter {IDENT} {EPOCH + mark} +0000\n{_data(message)}"
+    return header + (f"from {parent}\n" if parent else '') + changes
+
+
+def _file(path: str, content: str) -> str:
+    """fast-import change setting a file inline"""
+    return f"M 100644 inline {path}\n{_data(content)}"
+
+
+def fast_import_stream(spec: RepoSpec, prefixes: Dict[str, str]) -> Iterator[str]:
+    """Yield the fast-import stream describing a repository of shape spec"""
+    files = ''.join(_file(f"src/d{i // FILES_PER_DIR}/f{i}.txt", f"file {i}\n") for i in range(spec.files))
+    yield _commit('refs/heads/main', 1, 'Initial commit', None, files + _file('CHANGELOG', 'commit 1\n'))
+    for mark in range(2, spec.commits + 1):
+        yield _commit('refs/heads/main', mark, f"Change {mark}", f":{mark - 1}", _file('CHANGELOG', f"commit {mark}\n"))
+
+    main = spec.commits
+    develop = main + 1
+    yield _commit('refs/heads/develop', develop, 'Start develop', f":{main}", _file('DEVELOP', 'develop\n'))
+
+    mark = develop
+    branches = [('feature', spec.features, develop), ('release', spec.releases, develop),
+                ('hotfix', spec.hotfixes, main), ('support', spec.supports, main)]
+    for branch_type, count, base in branches:
+        for i in range(count):
+            mark += 1
+            name = f"{prefixes[branch_type]}{branch_type[0]}{i}"
+            yield _commit(f"refs/heads/{name}", mark, f"Work on {name}", f":{base}",
+                          _file(f"{branch_type}/{name}.txt", f"{name}\n"))
+
+    # Tags go on main's history, newest versions on the newest commits
+    for i in range(spec.tags):
+        target = 1 + (i * spec.commits) // max(1, spec.tags)
+        version = f"{i // 10000}.{i // 100 % 100}.{i % 100}"
+        yield (f"tag {prefixes['version']}{version}\nfrom :{target}\n"
+               f"tagger {IDENT} {EPOCH + target} +0000\n{_data(f'Release {version}')}")
+
+
+def generate_repo(path: str, spec: RepoSpec, commit_graph: bool = True) -> str:
+    """
+    Create a repository of shape spec at path, with a bare origin at path + '.origin'
+
+    Args:
+        path: Directory for the repository, replaced if it exists
+        spec: Repository shape
+        commit_graph: Write a commit-graph, as git gc and fetch do on real clones
+
+    Returns:
+        str: Path of the bare origin repository
+    """
+    import yaml
+    from ..settings import DEFAULT_CONFIG
+
+    origin = f"{path.rstrip(os.sep)}.origin"
+    for directory in (path, origin):
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def git(*args, **kwargs):
+        return subprocess.run(['git'] + list(args), cwd=path, check=True, capture_output=True, **kwargs)
+
+    os.makedirs(path)
+    git('init', '-q', '-b', 'main')
+    git('config', 'user.name', IDENT.split(' <')[0])
+    git('config', 'user.email', IDENT.split('<')[1].rstrip('>'))
+
+    prefixes = {branch_type: DEFAULT_CONFIG['branch'][branch_type]['prefix']
+                for branch_type in ('feature', 'release', 'hotfix', 'support', 'version')}
+    process = subprocess.Popen(['git', 'fast-import', '--quiet', '--done'], cwd=path,
+                               stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        for chunk in fast_import_stream(spec, prefixes):
+            process.stdin.write(chunk.encode())
+        process.stdin.write(b'done\n')
+        process.stdin.close()
+    except BrokenPipeError:
+        pass
+    if process.wait() != 0:
+        raise RuntimeError(f"fast-import failed: {process.stderr.read().decode(errors='replace')}")
+    process.stderr.close()
+
+    git('checkout', '-q', '-f', 'develop')
+    git('pack-refs', '--all')
+    if commit_graph:
+        git('commit-graph', 'write', '--reachable')
+
+    os.makedirs(os.path.join(path, '.git_flow'))
+    with open(os.path.join(path, '.git_flow', 'config.yaml'), 'w') as f:
+        yaml.safe_dump(DEFAULT_CONFIG, f, sort_keys=False)
+    with open(os.path.join(path, '.git', 'info', 'exclude'), 'a') as f:
+        f.write('.git_flow\n')
+
+    subprocess.run(['git', 'init', '-q', '--bare', origin], check=True, capture_output=True)
+    git('remote', 'add', 'origin', origin)
+    git('push', '-q', 'origin', 'main', 'develop')
+    return origin
@@ -0,0 +1,211 @@
+"""
+Benchmark Runner
+
+Times benchmark cases against a repository, writes the results as JSON
+and compares them with a baseline from an earlier run. A case counts as
+a regression when its median is both relatively and absolutely slower
+than the baseline's, so noise on millisecond-scale cases does not fail
+a run.
+"""
+
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional
+
+from .cases import BenchCase
+
+RESULTS_FORMAT = 1
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA = 0.005
+
+
+def select_cases(cases: List[BenchCase], patterns: Optional[List[str]]) -> List[BenchCase]:
+    """Keep the cases whose name matches any of the glob patterns, all of them without patterns"""
+    if not patterns:
+        return cases
+    return [case for case in cases if any(fnmatch.fnmatchcase(case.name, pattern) for pattern in patterns)]
+
+
+def time_case(case: BenchCase, repo: str, repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """
+    Time repeat iterations of a case after warmup untimed ones
+
+    Returns:
+        Dict[str, float]: min, median, mean and max in seconds, plus runs
+        and the case's budget if it has one
+    """
+    timings = []
+    for i in range(warmup + repeat):
+        if case.before:
+            case.before(repo, i)
+        # Commands echo progress; keep it out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            case.run(repo, i)
+            elapsed = time.perf_counter() - start
+        if i >= warmup:
+            timings.append(elapsed)
+    result = {
+        'runs': len(timings),
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+    }
+    if case.budget is not None:
+        result['budget'] = case.budget
+    return result
+
+
+def over_budget(result: Dict[str, float]) -> bool:
+    """Whether a successful result's median exceeds the case's budget"""
+    return 'budget' in result and 'error' not in result and result['median'] > result['budget']
+
+
+def run_benchmarks(repo: str, cases: List[BenchCase], workdir: str, repeat: int = 5,
+                   on_result: Optional[Callable[[str, Dict[str, float]], None]] = None) -> Dict[str, Dict[str, float]]:
+    """
+    Time every case, giving each case that mutates the repository its own copy
+
+    Args:
+        repo: Repository to benchmark, left untouched by mutating cases
+        cases: Cases to run
+        workdir: Directory for the per-case copies
+        repeat: Timed iterations per case
+        on_result: Called with each case name and result as soon as it is available
+
+    Returns:
+        Dict[str, Dict[str, float]]: Results by case name; failed cases get an 'error'
+    """
+    results = {}
+    for case in cases:
+        target = repo
+        if case.mutates:
+            target = os.path.join(workdir, case.name)
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(repo, target, symlinks=True)
+        try:
+            results[case.name] = time_case(case, target, repeat)
+        except Exception as e:
+            results[case.name] = {'error': str(e)}
+        finally:
+            if target != repo:
+                shutil.rmtree(target, ignore_errors=True)
+        if on_result:
+            on_result(case.name, results[case.name])
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """Versions and host details stored with the results"""
+    git_version = subprocess.run(['git', '--version'], capture_output=True, text=True).stdout.strip()
+    return {
+        'python': platform.python_version(),
+        'git': git_version,
+        'platform': platform.platform(),
+        'cpus': str(os.cpu_count()),
+    }
+
+
+def write_results(path: str, results: Dict[str, Dict[str, float]], spec: Optional[Dict[str, int]] = None):
+    """Write results as JSON together with the repository spec and environment"""
+    document = {
+        'format': RESULTS_FORMAT,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'environment': environment(),
+        'spec': spec,
+        'results': results,
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_results(path: str) -> Dict[str, Dict[str, float]]:
+    """Read the per-case results of a file written by write_results"""
+    with open(path) as f:
+        document = json.load(f)
+    if document.get('format') != RESULTS_FORMAT:
+        raise ValueError(f"Unsupported results format in {path}")
+    return document['results']
+
+
+class Comparison:
+    """
+    One case compared with its baseline
+
+    Attributes:
+        name (str): Case name
+        median (float): Median of this run in seconds
+        baseline (Optional[float]): Baseline median, None for a new case
+        regressed (bool): Whether the case is slower beyond the thresholds
+    """
+
+    def __init__(self, name: str, median: float, baseline: Optional[float], regressed: bool):
+        self.name = name
+        self.median = median
+        self.baseline = baseline
+        self.regressed = regressed
+
+    @property
+    def change(self) -> Optional[float]:
+        """Relative change against the baseline, e.g. 0.3 for 30% slower"""
+        if not self.baseline:
+            return None
+        return self.median / self.baseline - 1
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            threshold: float = DEFAULT_THRESHOLD, min_delta: float = DEFAULT_MIN_DELTA) -> List[Comparison]:
+    """
+    Compare medians with a baseline
+
+    Args:
+        results: Results of this run
+        baseline: Results of the baseline run
+        threshold: Relative slowdown that counts as a regression
+        min_delta: Absolute slowdown in seconds a regression must also exceed
+
+    Returns:
+        List[Comparison]: One entry per successful case of this run
+    """
+    comparisons = []
+    for name, result in results.items():
+        if 'error' in result:
+            continue
+        base = baseline.get(name, {}).get('median')
+        regressed = (base is not None and result['median'] > base * (1 + threshold)
+                     and result['median'] - base > min_delta)
+        comparisons.append(Comparison(name, result['median'], base, regressed))
+    return comparisons
+
+
+def format_row(name: str, result: Dict[str, float], comparison: Optional[Comparison] = None) -> str:
+    """One report line: case, median and min in milliseconds, and the change against the baseline"""
+    if 'error' in result:
+        return f"{name:<28} error: {result['error']}"
+    line = f"{name:<28}{result['median'] * 1000:>10.1f}{result['min'] * 1000:>10.1f}"
+    if comparison is not None and comparison.baseline is not None:
+        line += f"{comparison.baseline * 1000:>10.1f}{comparison.change * 100:>+9.1f}%"
+        if comparison.regressed:
+            line += '  REGRESSION'
+    if over_budget(result):
+        line += f"  OVER BUDGET ({result['budget'] * 1000:.1f} ms)"
+    return line
+
+
+def header(baseline: bool = False) -> str:
+    """Column headings matching format_row"""
+    line = f"{'case':<28}{'median ms':>10}{'min ms':>10}"
+    if baseline:
+        line += f"{'base ms':>10}{'change':>10}"
+    return line
@@ -0,0 +1,117 @@
+"""
+Branch Classifier Module
+
+Maps branch names to git-flow branch types using the configured prefixes.
+Prefixes are stored in a character trie, so classifying a name costs one
+walk over its characters regardless of how many branch types are configured,
+and the longest matching prefix wins when one prefix extends another.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+# Branch types that are single named branches or tags rather than prefixes
+NON_PREFIX_TYPES = ('main', 'develop', 'version', 'default')
+
+# Task branches live under their feature: <feature prefix><feature>/task/<task>
+TASK_SEPARATOR = '/task/'
+
+# Order branch types are reported in
+TYPE_ORDER = ['main', 'develop', 'feature', 'task', 'bugfix', 'release', 'hotfix', 'support', 'setup']
+
+_TERMINAL = ''
+
+
+def config_prefixes(config: dict) -> Dict[str, str]:
+    """Get the prefix of every branch.* entry of a config that names a prefixed branch type"""
+    prefixes = {
+        branch_type: (values or {}).get('prefix', '')
+        for branch_type, values in config.get('branch', {}).items()
+        if branch_type not in NON_PREFIX_TYPES
+    }
+    # SetupCommand falls back to this prefix when none is configured
+    prefixes.setdefault('setup', 'setup/')
+    return prefixes
+
+
+class PrefixTrie:
+    """Character trie mapping prefixes to values"""
+
+    def __init__(self):
+        self._root: Dict[str, dict] = {}
+
+    def insert(self, prefix: str, value):
+        """Add a prefix, replacing any value already stored for it"""
+        node = self._root
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[_TERMINAL] = (prefix, value)
+
+    def longest_match(self, key: str) -> Optional[Tuple[str, object]]:
+        """Get (prefix, value) for the longest stored prefix of key, None if none matches"""
+        node = self._root
+        match = node.get(_TERMINAL)
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                break
+            match = node.get(_TERMINAL, match)
+        return match
+
+
+class BranchClassifier:
+    """
+    Classifies branch names as main, develop or a prefixed flow type
+
+    Attributes:
+        prefixes (Dict[str, str]): Branch type to prefix, empty prefixes dropped
+        main_branch (str): Name of the main branch
+        develop_branch (str): Name of the develop branch
+    """
+
+    def __init__(self, prefixes: Dict[str, str], main_branch: str, develop_branch: str):
+        self.prefixes = {branch_type: prefix for branch_type, prefix in prefixes.items() if prefix}
+        self.main_branch = main_branch
+        self.develop_branch = develop_branch
+        self._trie = PrefixTrie()
+        for branch_type, prefix in self.prefixes.items():
+            self._trie.insert(prefix, branch_type)
+
+    @classmethod
+    def from_gitflow(cls, gitflow) -> 'BranchClassifier':
+        """Build a classifier from every branch.*.prefix entry of the GitFlow settings"""
+        return cls(config_prefixes(gitflow.settings.config), gitflow.main_branch, gitflow.develop_branch)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'BranchClassifier':
+        """Build a classifier straight from a config dict, with GitFlow's defaults for main and develop"""
+        branch_config = config.get('branch', {})
+        return cls(config_prefixes(config),
+                   branch_config.get('main', {}).get('default', 'main'),
+                   branch_config.get('develop', {}).get('default', 'develop'))
+
+    def classify(self, branch: str) -> Optional[str]:
+        """Get the branch type of a local branch name, None if it is not a flow branch"""
+        if branch == self.main_branch:
+            return 'main'
+        if branch == self.develop_branch:
+            return 'develop'
+        match = self._trie.longest_match(branch)
+        if match is None:
+            return None
+        prefix, branch_type = match
+        if branch_type == 'feature' and TASK_SEPARATOR in branch[len(prefix):]:
+            return 'task'
+        return branch_type
+
+    def classify_remote(self, branch: str) -> Tuple[str, Optional[str]]:
+        """Split a remote-tracking name such as 'origin/feature-x' into (remote, branch type)"""
+        remote, _, name = branch.partition('/')
+        return remote, self.classify(name)
+
+    def types(self) -> List[str]:
+        """Get every branch type this classifier can report, in display order"""
+        extra = sorted(branch_type for branch_type in self.prefixes if branch_type not in TYPE_ORDER)
+        known = [branch_type for branch_type in TYPE_ORDER
+                 if branch_type in ('main', 'develop') or branch_type in self.prefixes
+                 or (branch_type == 'task' and 'feature' in self.prefixes)]
+        return known + extra
@@ -18,18 +18,18 @@ Usage:
     etc.
 """
 
+import sys
+from abc import ABC, abstractmethod
 import typer
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, List, Optional
 from . import __version__
-from . import GitFlow
-from .commands.branch import (
-    FeatureCommand, ReleaseCommand, HotfixCommand, 
-    SupportCommand, BugfixCommand, DevelopCommand, MainCommand,
-    SetupCommand, TaskCommand  
-)
-from .commands.setup import (
-    InitCommand, ConfigCommand
-)
+
+if TYPE_CHECKING:
+    from .core import GitFlow
+
+# Command modules (and the rich/yaml imports behind them) are loaded inside
+# each command body, so --help, --version and shell completion only pay for
+# typer itself and never construct a GitFlow.
 
 COMMAND_HELP = {
     'setup': {
@@ -42,16 +42,46 @@ COMMAND_HELP = {
         'bugfix': {'args': ['start/finish/publish/track/list', 'name', '[base]'], 'help': 'Manage bugfix branches'},
         'develop': {'args': ['checkout/pull/push/sync', '--rebase'], 'help': 'Manage develop branch'},
         'feature': {'args': ['start/finish/publish/track/list', 'name', '[base]'], 'help': 'Manage feature branches'},
-        'hotfix': {'args': ['start/finish/publish/track/list', 'name', '[base]'], 'help': 'Manage hotfix branches'},
+        'hotfix': {'args': ['start/finish/publish/track/list', '[name]', '[base]', '--bump'], 'help': 'Manage hotfix branches'},
         'main': {'args': ['checkout/pull/push', '--rebase'], 'help': 'Manage main branch'},
-        'release': {'args': ['start/finish/publish/track/list', 'name', '[base]'], 'help': 'Manage release branches'},
+        'overview': {'args': [], 'help': 'Summarize all branches by type'},
+        'prune': {'args': ['--merged', '--remote', '--type', '--dry-run'], 'help': 'Delete merged flow branches'},
+        'release': {'args': ['start/finish/publish/track/list/notes', '[name]', '[base]', '--bump', '--notes'], 'help': 'Manage release branches'},
         'setup': {'args': ['start/finish/list', 'name', '[base]'], 'help': 'Manage setup branches'},
         'support': {'args': ['start/finish/list', 'name', '[base]'], 'help': 'Manage support branches'},
         'task': {'args': ['start/finish', 'feature', 'name', '[base]'], 'help': 'Manage task branches'}
     }
 }
 
-class SetupCommands:
+def _print_version(value: bool):
+    """Print the version and stop, for --version"""
+    if value:
+        typer.echo(f"git-flow {__version__}")
+        raise typer.Exit()
+
+class CommandGroup(ABC):
+    """
+    Base for CLI command groups
+
+    Holds a factory rather than a GitFlow instance, so the repository is
+    only located and its config parsed once a command actually runs.
+    """
+
+    def __init__(self, get_gitflow: Callable[[], 'GitFlow']):
+        self._get_gitflow = get_gitflow
+        self.app = typer.Typer(no_args_is_help=True)
+        self._register_commands()
+
+    @property
+    def gitflow(self) -> 'GitFlow':
+        """GitFlow instance, constructed on first use"""
+        return self._get_gitflow()
+
+    @abstractmethod
+    def _register_commands(self):
+        """Add the group's commands to self.app"""
+
+class SetupCommands(CommandGroup):
     """
     Setup Command Handler
     
@@ -62,15 +92,10 @@ class SetupCommands:
     - Remote repository setup
     
     Attributes:
-        gitflow (GitFlow): Instance of GitFlow for git operations
+        gitflow (GitFlow): Instance of GitFlow for git operations, created lazily
         app (typer.Typer): Typer instance for CLI commands
     """
 
-    def __init__(self, gitflow: GitFlow):
-        self.gitflow = gitflow
-        self.app = typer.Typer(no_args_is_help=True)
-        self._register_commands()
-
     def _register_commands(self):
         """Register all setup-related commands with the CLI in alphabetical order"""
 
@@ -86,6 +111,7 @@ class SetupCommands:
                 branch_type: Type of branch (feature/release/hotfix/etc)
                 prefix: New prefix to set for the branch type
             """
+            from .commands.setup import ConfigCommand
             cmd = ConfigCommand(self.gitflow)
             if prefix:
                 cmd.set("branch", branch_type, {"prefix": prefix})
@@ -100,6 +126,7 @@ class SetupCommands:
             value: Optional[str] = typer.Argument(None, help="Config value")
         ):
             """Manage git-flow configuration"""
+            from .commands.setup import ConfigCommand
             cmd = ConfigCommand(self.gitflow)
             
             if action == "init":
@@ -130,6 +157,7 @@ class SetupCommands:
                 force: Force reinitialization even if already initialized
                 non_interactive: Skip interactive configuration
             """
+            from .commands.setup import ConfigCommand, InitCommand
             cmd = InitCommand(self.gitflow)
             config_cmd = ConfigCommand(self.gitflow)
             
@@ -149,13 +177,14 @@ class SetupCommands:
             url: Optional[str] = typer.Argument(None, help="Remote URL")
         ):
             """Configure remote repositories"""
+            from .commands.setup import ConfigCommand
             cmd = ConfigCommand(self.gitflow)
             if url:
                 cmd.set("remote", name, {"url": url})
             else:
                 typer.echo(cmd.get("remote", name))
 
-class BranchCommands:
+class BranchCommands(CommandGroup):
     """
     Branch Command Handler
     
@@ -169,6 +198,7 @@ class BranchCommands:
     - Support branches
     - Task branches
     - Develop/Main management
+    - Overview of all branches by type
     
     Each branch type supports standard operations:
     - start: Create new branch
@@ -177,11 +207,6 @@ class BranchCommands:
     - track: Track remote branch
     """
 
-    def __init__(self, gitflow: GitFlow):
-        self.gitflow = gitflow
-        self.app = typer.Typer(no_args_is_help=True)
-        self._register_commands()
-
     def _register_commands(self):
         """Register all branch-related commands with the CLI in alphabetical order"""
 
@@ -192,6 +217,7 @@ class BranchCommands:
             base: Optional[str] = typer.Argument(None, help="Base branch")
         ):
             """Manage bugfix branches"""
+            from .commands.branch import BugfixCommand
             cmd = BugfixCommand(self.gitflow)
             self._handle_branch_command(cmd, subcommand, name, base)
 
@@ -201,6 +227,7 @@ class BranchCommands:
             rebase: bool = typer.Option(False, help="Use rebase when pulling")
         ):
             """Manage develop branch"""
+            from .commands.branch import DevelopCommand
             cmd = DevelopCommand(self.gitflow)
             self._handle_develop_command(cmd, subcommand, rebase)
 
@@ -211,18 +238,24 @@ class BranchCommands:
             base: Optional[str] = typer.Argument(None, help="Base branch")
         ):
             """Manage feature branches"""
+            from .commands.branch import FeatureCommand
             cmd = FeatureCommand(self.gitflow)
             self._handle_branch_command(cmd, subcommand, name, base)
 
         @self.app.command()
         def hotfix(
             subcommand: str = typer.Argument(..., help="Subcommand: start/finish/publish/track/list"),
-            name: str = typer.Argument(..., help="Hotfix version"),
-            base: Optional[str] = typer.Argument(None, help="Base branch")
+            name: Optional[str] = typer.Argument(None, help="Hotfix version"),
+            base: Optional[str] = typer.Argument(None, help="Base branch"),
+            dry_run: bool = typer.Option(False, "--dry-run", help="Print the ref changes finish would make"),
+            push: bool = typer.Option(False, "--push", help="Push the refs finish changed in one atomic push"),
+            bump: Optional[str] = typer.Option(None, "--bump",
+                                               help="Start the next major/minor/patch version after the latest tag")
         ):
             """Manage hotfix branches"""
+            from .commands.branch import HotfixCommand
             cmd = HotfixCommand(self.gitflow)
-            self._handle_branch_command(cmd, subcommand, name, base)
+            self._handle_branch_command(cmd, subcommand, name, base, dry_run=dry_run, push=push, bump=bump)
 
         @self.app.command()
         def main(
@@ -230,18 +263,87 @@ class BranchCommands:
             rebase: bool = typer.Option(False, help="Use rebase when pulling")
         ):
             """Manage main branch"""
+            from .commands.branch import MainCommand
             cmd = MainCommand(self.gitflow)
             self._handle_main_command(cmd, subcommand, rebase)
 
+        @self.app.command()
+        def overview():
+            """
+            Summarize every local and remote branch by type
+
+            Shows per-type branch counts and how local branches relate to
+            develop (or main for develop, hotfix and support branches)
+            """
+            from .commands.branch import OverviewCommand
+            from .status import SAME, BEHIND, AHEAD, DIVERGED, UNRELATED
+            cmd = OverviewCommand(self.gitflow)
+            try:
+                rows = cmd.overview()
+            except Exception as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+            states = [SAME, BEHIND, AHEAD, DIVERGED, UNRELATED]
+            typer.echo(f"{'type':<10}{'local':>7}{'remote':>8}" + "".join(f"{state:>11}" for state in states))
+            for branch_type, local, remote, counts in rows:
+                typer.echo(f"{branch_type:<10}{local:>7}{remote:>8}"
+                           + "".join(f"{counts.get(state, 0):>11}" for state in states))
+
+        @self.app.command()
+        def prune(
+            merged: bool = typer.Option(False, "--merged", help="Delete branches merged into develop or main"),
+            remote: bool = typer.Option(False, "--remote", help="Also delete them on the default remote"),
+            types: Optional[str] = typer.Option(None, "--type", help="Comma-separated branch types, e.g. feature,bugfix"),
+            dry_run: bool = typer.Option(False, "--dry-run", help="Show what would be deleted without deleting")
+        ):
+            """
+            Delete flow branches that are already merged
+
+            Support branches are kept unless named with --type, as are
+            branches checked out in a worktree or still at develop's or
+            main's tip.
+            """
+            from .commands.branch import PruneCommand
+            try:
+                if not merged:
+                    raise ValueError("Only merged branches can be pruned, pass --merged")
+                type_list = [t.strip() for t in types.split(',') if t.strip()] if types else None
+                result = PruneCommand(self.gitflow).prune(types=type_list, remote=remote, dry_run=dry_run)
+            except Exception as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+            verb = "Would delete" if dry_run else "Deleted"
+            for branch, target in result.local.items():
+                typer.echo(f"{verb} {branch} (merged into {target})")
+            origin = self.gitflow.origin
+            rejected = {push.refname for push in result.pushed if not push.ok}
+            for branch, target in result.remote.items():
+                if f"refs/heads/{branch}" not in rejected:
+                    typer.echo(f"{verb} {origin}/{branch} (merged into {target})")
+            for push in result.pushed:
+                if not push.ok:
+                    typer.echo(f"Error: {push.describe()}")
+            typer.echo(f"{len(result.local)} local, {len(result.remote) - len(rejected)} remote branches "
+                       f"{'to delete' if dry_run else 'deleted'}")
+            if rejected:
+                raise typer.Exit(code=1)
+
         @self.app.command()
         def release(
-            subcommand: str = typer.Argument(..., help="Subcommand: start/finish/publish/track/list"),
-            name: str = typer.Argument(..., help="Release version"),
-            base: Optional[str] = typer.Argument(None, help="Base branch")
+            subcommand: str = typer.Argument(..., help="Subcommand: start/finish/publish/track/list/notes"),
+            name: Optional[str] = typer.Argument(None, help="Release version"),
+            base: Optional[str] = typer.Argument(None, help="Base branch"),
+            dry_run: bool = typer.Option(False, "--dry-run", help="Print the ref changes finish would make"),
+            push: bool = typer.Option(False, "--push", help="Push the refs finish changed in one atomic push"),
+            bump: Optional[str] = typer.Option(None, "--bump",
+                                               help="Start the next major/minor/patch version after the latest tag"),
+            notes: bool = typer.Option(False, "--notes", help="Append release notes to the finish tag message")
         ):
             """Manage release branches"""
+            from .commands.branch import ReleaseCommand
             cmd = ReleaseCommand(self.gitflow)
-            self._handle_branch_command(cmd, subcommand, name, base)
+            self._handle_branch_command(cmd, subcommand, name, base, dry_run=dry_run, push=push, bump=bump,
+                                        notes=notes)
 
         @self.app.command()
         def setup(
@@ -254,6 +356,7 @@ class BranchCommands:
             
             Used for repository setup and configuration changes
             """
+            from .commands.branch import SetupCommand
             cmd = SetupCommand(self.gitflow)
             self._handle_branch_command(cmd, subcommand, name, base)
 
@@ -264,6 +367,7 @@ class BranchCommands:
             base: Optional[str] = typer.Argument(None, help="Base branch")
         ):
             """Manage long-term support branches"""
+            from .commands.branch import SupportCommand
             cmd = SupportCommand(self.gitflow)
             self._handle_branch_command(cmd, subcommand, name, base)
 
@@ -279,6 +383,7 @@ class BranchCommands:
             
             Tasks are sub-branches of features for smaller work items
             """
+            from .commands.branch import TaskCommand
             cmd = TaskCommand(self.gitflow)
             try:
                 if subcommand == "start":
@@ -292,13 +397,31 @@ class BranchCommands:
                 typer.echo(f"Error: {str(e)}")
                 raise typer.Exit(code=1)
 
-    def _handle_branch_command(self, cmd, subcommand: str, name: str, base: Optional[str] = None):
+    def _handle_branch_command(self, cmd, subcommand: str, name: Optional[str], base: Optional[str] = None,
+                               dry_run: bool = False, push: bool = False, bump: Optional[str] = None,
+                               notes: bool = False):
         """Handle common branch commands"""
         try:
-            if subcommand == "start":
+            if name is None and not (subcommand == "list" or (subcommand == "start" and bump)):
+                raise ValueError(f"Missing name for {subcommand}")
+            options = {'notes': True} if notes else {}
+            if subcommand == "start" and bump:
+                typer.echo(f"Starting version {cmd.start(name, base, bump=bump)}")
+            elif subcommand == "start":
                 cmd.start(name, base)
+            elif subcommand == "finish" and dry_run:
+                plan = cmd.finish(name, dry_run=True, **options)
+                for line in plan.describe():
+                    typer.echo(line)
+            elif subcommand == "finish" and push:
+                plan = cmd.finish(name, push=True, **options)
+                for result in plan.pushed:
+                    typer.echo(result.describe())
             elif subcommand == "finish":
-                cmd.finish(name)
+                cmd.finish(name, **options)
+            elif subcommand == "notes":
+                for line in cmd.notes(name):
+                    typer.echo(line)
             elif subcommand == "publish":
                 cmd.publish(name)
             elif subcommand == "track":
@@ -364,18 +487,34 @@ class CLI:
     
     Attributes:
         app (typer.Typer): Main Typer application instance
-        gitflow (GitFlow): GitFlow instance for git operations
+        gitflow (GitFlow): GitFlow instance for git operations, created on first use
         setup (SetupCommands): Setup command handler
     """
 
     def __init__(self):
         """Initialize CLI with necessary components"""
         self.app = typer.Typer(help=self._generate_help_text(), no_args_is_help=True, )
-        self.gitflow = GitFlow()
-        self.setup = SetupCommands(self.gitflow)
-        self.branch = BranchCommands(self.gitflow)
+        self._gitflow = None
+        self.setup = SetupCommands(self.get_gitflow)
+        self.branch = BranchCommands(self.get_gitflow)
         self._register_commands()
 
+    @property
+    def gitflow(self) -> 'GitFlow':
+        """GitFlow instance for git operations"""
+        return self.get_gitflow()
+
+    def get_gitflow(self) -> 'GitFlow':
+        """Construct GitFlow on first use"""
+        if self._gitflow is None:
+            from .core import GitFlow, GitFlowError
+            try:
+                self._gitflow = GitFlow()
+            except GitFlowError as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+        return self._gitflow
+
     def _generate_help_text(self) -> str:
         """Generate comprehensive help text including command listing"""
         help_text = [
@@ -408,6 +547,7 @@ class CLI:
         Organizes commands into logical groups:
         - Setup commands (init, config)
         - Branch commands (feature, release, hotfix, etc.)
+        - Multi-repository runs of branch commands
         - Project commands
         - Tool commands
         """
@@ -416,6 +556,157 @@ class CLI:
         self.app.add_typer(self.setup.app, name="setup", help="Setup commands")
         self.app.add_typer(self.branch.app, name="branch", help="Branch management commands")
 
+        @self.app.command(context_settings={"allow_extra_args": True, "ignore_unknown_options": True})
+        def multi(
+            command: List[str] = typer.Argument(..., help="Command to run, e.g. 'feature start login'"),
+            manifest: Optional[str] = typer.Option(None, "--manifest", help="YAML file listing repositories"),
+            pattern: List[str] = typer.Option([], "--glob", help="Glob matching repository directories"),
+            jobs: Optional[int] = typer.Option(None, "--jobs", "-j", help="Worker processes (default: CPU count)"),
+            fail_fast: bool = typer.Option(False, "--fail-fast/--continue", help="Stop at the first failing repository")
+        ):
+            """
+            Run a branch command in many repositories in parallel
+
+            Repositories come from --manifest and/or --glob; each runs in its
+            own worker process.
+            """
+            from .multi import discover_repos, run_multi
+            try:
+                repos = discover_repos(manifest, pattern)
+            except (OSError, ValueError) as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+            if not repos:
+                typer.echo("Error: No repositories found")
+                raise typer.Exit(code=1)
+
+            def report(result):
+                if result.ok:
+                    typer.echo(f"{result.repo}: ok ({result.duration:.2f}s)")
+                    for line in result.output.splitlines():
+                        typer.echo(f"  {line}")
+                else:
+                    typer.echo(f"{result.repo}: Error: {result.error}")
+
+            results = run_multi(repos, command, jobs=jobs, fail_fast=fail_fast, on_result=report)
+            failed = sum(1 for result in results if not result.ok and not result.skipped)
+            skipped = sum(1 for result in results if result.skipped)
+            typer.echo(f"{len(results) - failed - skipped} succeeded, {failed} failed, {skipped} skipped")
+            if failed:
+                raise typer.Exit(code=1)
+
+        @self.app.command()
+        def batch(
+            file: str = typer.Argument("-", help="File of commands, one per line ('-' for stdin)"),
+            fail_fast: bool = typer.Option(False, "--fail-fast/--continue", help="Skip the remaining commands after a failure"),
+            atomic: bool = typer.Option(False, "--atomic", help="Restore local branches, tags and HEAD if any command fails")
+        ):
+            """
+            Run many branch commands in one process
+
+            Each line is a command such as 'feature start login', a JSON
+            array of arguments, or a JSON object with 'args' and 'options'.
+            One JSON result per command is written to stdout.
+            """
+            import json
+            from .batch import parse_commands, run_batch
+            from .core import GitFlowError
+            try:
+                if file == "-":
+                    commands = list(parse_commands(sys.stdin))
+                else:
+                    with open(file) as f:
+                        commands = list(parse_commands(f))
+            except (OSError, ValueError) as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+
+            try:
+                results, restored = run_batch(self.gitflow, commands, fail_fast=fail_fast, atomic=atomic,
+                                              on_result=lambda result: typer.echo(json.dumps(result.to_dict())))
+            except GitFlowError as e:
+                typer.echo(f"Error: {str(e)}", err=True)
+                raise typer.Exit(code=1)
+            failed = sum(1 for result in results if not result.ok and not result.skipped)
+            skipped = sum(1 for result in results if result.skipped)
+            summary = f"{len(results) - failed - skipped} succeeded, {failed} failed, {skipped} skipped"
+            if restored is not None:
+                summary += f"; rolled back {restored} refs"
+            typer.echo(summary, err=True)
+            if failed:
+                raise typer.Exit(code=1)
+
+        @self.app.command()
+        def status(
+            prompt: bool = typer.Option(False, "--prompt", help="Print only 'type:name', for shell prompts")
+        ):
+            """
+            Show the checked-out branch and its flow type
+
+            'git-flow status --prompt' is answered without loading the CLI,
+            so it is cheap enough to run from a shell prompt.
+            """
+            from .prompt import head_status, prompt_status
+            try:
+                if prompt:
+                    line = prompt_status()
+                    if line:
+                        typer.echo(line)
+                    return
+                current = head_status()
+                if current is None:
+                    raise ValueError("Not a git repository")
+                branch, branch_type, name = current
+                if branch_type == 'detached':
+                    typer.echo(f"HEAD detached at {branch}")
+                elif branch_type is None:
+                    typer.echo(f"On branch {branch} (not a flow branch)")
+                else:
+                    typer.echo(f"On {branch_type} branch {name} ({branch})")
+            except (OSError, ValueError) as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+
+        @self.app.command()
+        def daemon(
+            action: str = typer.Argument(..., help="Action: run/start/stop/status"),
+            idle: float = typer.Option(1800, "--idle", help="Seconds without a request before the daemon exits"),
+            socket: Optional[str] = typer.Option(None, "--socket", help="Socket path (default: per-user runtime directory)")
+        ):
+            """
+            Keep repositories warm for prompt and editor queries
+
+            While a daemon runs, read-only commands (branch list, overview and
+            release notes) are answered by it instead of a fresh process. Set
+            GIT_FLOW_NO_DAEMON=1 to bypass it.
+            """
+            from .daemon import DaemonError, DaemonServer, request, socket_path
+            path = socket or socket_path()
+            try:
+                if action == "run":
+                    DaemonServer(path, idle_timeout=idle).serve()
+                elif action == "start":
+                    self._start_daemon(path, idle)
+                elif action == "stop":
+                    if request({'op': 'stop'}, path) is None:
+                        typer.echo("Daemon is not running")
+                    else:
+                        typer.echo("Daemon stopped")
+                elif action == "status":
+                    answer = request({'op': 'ping'}, path)
+                    if answer is None:
+                        typer.echo("Daemon is not running")
+                        raise typer.Exit(code=1)
+                    typer.echo(f"Daemon running on {path} (pid {answer['pid']}, up {answer['uptime']:.0f}s)")
+                    for repo in answer['repos']:
+                        typer.echo(f"  {repo}")
+                else:
+                    typer.echo(f"Unknown subcommand: {action}")
+                    raise typer.Exit(code=1)
+            except (DaemonError, OSError) as e:
+                typer.echo(f"Error: {str(e)}")
+                raise typer.Exit(code=1)
+
         # @self.app.command(name="commands")
         # def list_commands():
         #     """List all available commands and their usage"""
@@ -423,10 +714,15 @@ class CLI:
 
         @self.app.callback()
         def main(
+            ctx: typer.Context,
             version: bool = typer.Option(
                 None, "--version",
-                callback=lambda value: typer.echo(f"git-flow {__version__}") if value else None,
+                callback=_print_version,
                 is_eager=True
+            ),
+            profile: bool = typer.Option(False, "--profile", help="Print time spent per git subcommand to stderr"),
+            trace_file: Optional[str] = typer.Option(
+                None, "--trace", metavar="FILE", help="Write a Chrome/Perfetto trace of flow steps and git calls"
             )
         ):
             """
@@ -435,12 +731,57 @@ class CLI:
             Provides structured branching model operations through command-line interface.
             Use --help with any command for detailed usage information.
             """
-            pass
+            if profile or trace_file:
+                self._start_trace(ctx, profile, trace_file)
+
+    def _start_daemon(self, path: str, idle: float):
+        """Spawn 'daemon run' detached from the terminal and wait until it answers"""
+        import subprocess
+        import time
+        from .daemon import DaemonError, request
+        if request({'op': 'ping'}, path) is not None:
+            typer.echo(f"Daemon already running on {path}")
+            return
+        process = subprocess.Popen(
+            [sys.executable, '-m', 'git_flow', 'daemon', 'run', '--idle', str(idle), '--socket', path],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if request({'op': 'ping'}, path) is not None:
+                typer.echo(f"Daemon started on {path} (pid {process.pid})")
+                return
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        raise DaemonError("Daemon did not start")
+
+    def _start_trace(self, ctx: typer.Context, profile: bool, trace_file: Optional[str]):
+        """Record git calls for the rest of the command and report them when it exits"""
+        from . import trace
+        tracer = trace.enable()
+        ctx.with_resource(trace.span(' '.join(['git-flow'] + sys.argv[1:])))
+
+        def report():
+            if profile:
+                for line in tracer.format_summary():
+                    typer.echo(line, err=True)
+            if trace_file:
+                tracer.write_chrome_trace(trace_file)
+                typer.echo(f"Trace written to {trace_file}", err=True)
+            trace.disable()
+
+        ctx.call_on_close(report)
 
     def run(self):
         """Execute the CLI application"""
         self.app()
 
-if __name__ == "__main__":
+def main():
+    """Run the CLI; git_flow.__main__.main answers --version before this module is imported"""
     cli = CLI()
     cli.run()
+
+if __name__ == "__main__":
+    main()
@@ -18,3 +18,18 @@ class BaseCommand:
 
     def publish(self, name: str) -> None:
         raise NotImplementedError
+
+    def _start_version(self, version: Optional[str], bump: Optional[str]) -> str:
+        """Version to start: as given, or the latest version tag bumped by major/minor/patch"""
+        if bump:
+            if version:
+                raise ValueError("Give either a version or a bump, not both")
+            version = str(self.gitflow.versions.next(bump))
+        if not version:
+            raise ValueError("A version or a bump is required")
+        # 1.2 and 1.2.0 are the same version even though their tags differ
+        tagged = self.gitflow.versions.find(version)
+        version_tag = self.gitflow.versions.tag(tagged or version)
+        if tagged is not None or self.gitflow.tag_exists(version_tag):
+            raise ValueError(f"Tag {version_tag} already exists")
+        return version
@@ -3,6 +3,8 @@ from .develop import DevelopCommand
 from .feature import FeatureCommand
 from .hotfix import HotfixCommand
 from .main import MainCommand
+from .overview import OverviewCommand
+from .prune import PruneCommand
 from .release import ReleaseCommand
 from .setup import SetupCommand
 from .support import SupportCommand
@@ -14,6 +16,8 @@ __all__ = [
     'FeatureCommand',
     'HotfixCommand',
     'MainCommand',
+    'OverviewCommand',
+    'PruneCommand',
     'ReleaseCommand',
     'SetupCommand',
     'SupportCommand',
@@ -1,4 +1,5 @@
 from ..base import BaseCommand
+from ...finish import FinishEngine
 
 class BugfixCommand(BaseCommand):
     def __init__(self, gitflow):
@@ -26,6 +27,4 @@ class BugfixCommand(BaseCommand):
         if not self.gitflow.branch_exists(bugfix_branch):
             raise ValueError(f"Bugfix branch '{bugfix_branch}' does not exist")
             
-        self.gitflow._git_command(['checkout', self.gitflow.develop_branch])
-        self.gitflow.merge_branch(bugfix_branch)
-        self.gitflow.delete_branch(bugfix_branch)
+        FinishEngine(self.gitflow).finish(bugfix_branch, [self.gitflow.develop_branch])
@@ -33,16 +33,14 @@ class DevelopCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        self.gitflow._git_command(['checkout', self.gitflow.develop_branch])
-        self.gitflow.merge_branch(branch, no_ff=no_ff)
+        self.gitflow.merge_branch(branch, no_ff=no_ff, target=self.gitflow.develop_branch)
         
     def sync(self):
         """Sync develop with main"""
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        self.gitflow._git_command(['checkout', self.gitflow.develop_branch])
-        self.gitflow.merge_branch(self.gitflow.main_branch, no_ff=True)
+        self.gitflow.merge_branch(self.gitflow.main_branch, no_ff=True, target=self.gitflow.develop_branch)
 
     def start(self, name: str, base: Optional[str] = None):
         raise NotImplementedError("Develop branch does not support start")
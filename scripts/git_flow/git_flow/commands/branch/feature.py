@@ -1,5 +1,8 @@
-from typing import Optional, List
+from typing import Optional, List, Union
 from ..base import BaseCommand
+from ...fetch import BranchUpdate
+from ...finish import FinishEngine
+from ...status import BranchStatusEngine, SAME, BEHIND, AHEAD, UNRELATED
 
 class FeatureCommand(BaseCommand):
     def start(self, name: str, base: Optional[str] = None):
@@ -27,32 +30,30 @@ class FeatureCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        # Switch to develop and merge feature
-        self.gitflow.merge_branch(branch)
-        self.gitflow.delete_branch(branch)
+        # Merge feature into develop and delete it without checking develop out
+        FinishEngine(self.gitflow).finish(branch, [self.gitflow.develop_branch])
 
     def list(self, verbose: bool = False) -> List[str]:
         """List all feature branches"""
         feature_branches = []
         current = self.gitflow.get_current_branch()
+        branches = self.gitflow.get_branches(prefix=self.gitflow.prefix['feature'])
+        statuses = BranchStatusEngine(self.gitflow).compute(branches, self.gitflow.develop_branch) if verbose else {}
         
-        for branch in self.gitflow.get_branches():
-            if not branch.startswith(self.gitflow.prefix['feature']):
-                continue
-                
+        for branch in branches:
             name = branch[len(self.gitflow.prefix['feature']):]
             if verbose:
-                base = self.gitflow._git_command(['merge-base', branch, self.gitflow.develop_branch]).strip()
-                develop_sha = self.gitflow._git_command(['rev-parse', self.gitflow.develop_branch]).strip()
-                branch_sha = self.gitflow._git_command(['rev-parse', branch]).strip()
+                state = statuses[branch].state
                 
                 status = ""
-                if branch_sha == develop_sha:
+                if state == SAME:
                     status = "(no commits yet)"
-                elif base == branch_sha:
+                elif state == BEHIND:
                     status = "(is behind develop, may ff)"
-                elif base == develop_sha:
+                elif state == AHEAD:
                     status = "(based on latest develop)"
+                elif state == UNRELATED:
+                    status = "(unknown base)"
                 else:
                     status = "(may be rebased)"
                     
@@ -72,12 +73,12 @@ class FeatureCommand(BaseCommand):
         if not self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} does not exist")
             
-        # Check if remote branch exists
-        if self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        # Ask the remote, not the possibly stale remote-tracking ref
+        if self.gitflow.remote_branch(branch, recheck=True) is not None:
             raise ValueError(f"Remote branch {branch} already exists")
             
         # Push to remote and set up tracking
-        self.gitflow._git_command(['push', self.gitflow.origin, f"{branch}:refs/heads/{branch}"])
+        self.gitflow.push_branch(branch)
         self.gitflow._git_command(['config', f"branch.{branch}.remote", self.gitflow.origin])
         self.gitflow._git_command(['config', f"branch.{branch}.merge", f"refs/heads/{branch}"])
 
@@ -91,9 +92,11 @@ class FeatureCommand(BaseCommand):
         if self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} already exists")
             
-        if not self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        sha = self.gitflow.remote_branch(branch, recheck=False)
+        if sha is None:
             raise ValueError(f"Remote branch {branch} does not exist")
             
+        self.gitflow.fetch_planner.fetch(self.gitflow.origin, [branch])
         self.gitflow._git_command(['checkout', '-b', branch, f"{self.gitflow.origin}/{branch}"])
 
     def diff(self, name: Optional[str] = None):
@@ -134,28 +137,32 @@ class FeatureCommand(BaseCommand):
         self.gitflow._git_command(['checkout', branch])
         self.gitflow._git_command(args)
 
-    def pull(self, remote: str, name: Optional[str] = None, rebase: bool = False):
-        """Pull feature branch from remote"""
-        if name:
-            branch = f"{self.gitflow.prefix['feature']}{name}"
+    def pull(self, remote: str, name: Optional[str] = None, rebase: bool = False, *,
+             names: Union[List[str], str, None] = None, prune: bool = False) -> List[BranchUpdate]:
+        """Pull feature branches from remote
+
+        name and any further names (a list, or a comma-separated string from
+        batch input) all come in one fetch; the local branches are then
+        created or fast-forwarded from the fetched refs, and the current one
+        merged or rebased. A single branch that had to be created is checked
+        out. Without names the current feature branch is pulled; with prune
+        the tracking refs of branches gone from the remote are dropped.
+        """
+        if isinstance(names, str):
+            names = [part for part in names.split(',') if part]
+        names = ([name] if name else []) + list(names or [])
+        if names:
+            branches = [f"{self.gitflow.prefix['feature']}{name}" for name in names]
         else:
             current = self.gitflow.get_current_branch()
             if not current.startswith(self.gitflow.prefix['feature']):
                 raise ValueError("Not on a feature branch")
-            branch = current
+            branches = [current]
             
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        # Create branch if it doesn't exist
-        if not self.gitflow.branch_exists(branch):
-            self.gitflow._git_command(['fetch', remote, branch])
-            self.gitflow._git_command(['branch', '--no-track', branch, 'FETCH_HEAD'])
-            self.gitflow._git_command(['checkout', branch])
-        else:
-            # Pull changes
-            args = ['pull']
-            if rebase:
-                args.append('--rebase')
-            args.extend([remote, branch])
-            self.gitflow._git_command(args)
+        updates = self.gitflow.fetch_planner.update_branches(remote, branches, rebase=rebase, prune=prune)
+        if len(updates) == 1 and updates[0].status == 'created':
+            self.gitflow._git_command(['checkout', updates[0].branch])
+        return updates
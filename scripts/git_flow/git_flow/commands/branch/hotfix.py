@@ -1,14 +1,17 @@
 from typing import Optional, List
 from ..base import BaseCommand
+from ...finish import FinishEngine, FinishPlan
+from ...status import BranchStatusEngine, SAME, UNRELATED
 
 class HotfixCommand(BaseCommand):
-    def start(self, version: str, base: Optional[str] = None):
-        """Start a new hotfix branch"""
+    def start(self, version: Optional[str] = None, base: Optional[str] = None,
+              bump: Optional[str] = None) -> str:
+        """Start a new hotfix branch, named after the next version if bump is given"""
         if base is None:
             base = self.gitflow.main_branch
             
+        version = self._start_version(version, bump)
         branch = f"{self.gitflow.prefix['hotfix']}{version}"
-        version_tag = f"{self.gitflow.prefix['version']}{version}"
         
         # Sanity checks
         if not self.gitflow.is_clean_working_tree():
@@ -17,24 +20,26 @@ class HotfixCommand(BaseCommand):
         if self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} already exists")
             
-        # Check if version tag already exists
-        if version_tag in self.gitflow.get_all_tags():
-            raise ValueError(f"Tag {version_tag} already exists")
-            
         # Check if base is on main
-        if not self.gitflow._git_command(['branch', '--contains', base]).strip().split('\n')[0].endswith(self.gitflow.main_branch):
+        if not self.gitflow.is_ancestor(base, self.gitflow.main_branch):
             raise ValueError(f"Base {base} is not a valid commit on {self.gitflow.main_branch}")
             
         # Check for existing hotfix branches
-        for existing in self.gitflow.get_branches():
-            if existing.startswith(self.gitflow.prefix['hotfix']):
-                raise ValueError(f"There is an existing hotfix branch ({existing}). Finish that one first.")
+        for existing in self.gitflow.get_branches(prefix=self.gitflow.prefix['hotfix']):
+            raise ValueError(f"There is an existing hotfix branch ({existing}). Finish that one first.")
                 
         self.gitflow.create_branch(branch, base)
+        return version
         
     def finish(self, version: str, tag_message: Optional[str] = None, sign: bool = False, 
-              push: bool = False, keep: bool = False, no_tag: bool = False):
-        """Finish a hotfix branch"""
+              push: bool = False, keep: bool = False, no_tag: bool = False,
+              dry_run: bool = False) -> FinishPlan:
+        """Finish a hotfix branch
+
+        Merges into main and develop, the tag and the branch deletion are
+        applied as one ref transaction. With dry_run the plan is returned
+        without changing anything.
+        """
         branch = f"{self.gitflow.prefix['hotfix']}{version}"
         version_tag = f"{self.gitflow.prefix['version']}{version}"
         
@@ -44,62 +49,39 @@ class HotfixCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        # Try to merge into main
-        if not self.gitflow.is_branch_merged_into(branch, self.gitflow.main_branch):
-            self.gitflow._git_command(['checkout', self.gitflow.main_branch])
-            self.gitflow.merge_branch(branch)
-            
-        # Create tag if requested
-        if not no_tag:
-            tag_args = ['tag', '-a']
-            if sign:
-                tag_args.append('-s')
-            if tag_message:
-                tag_args.extend(['-m', tag_message])
-            tag_args.extend([version_tag, branch])
-            self.gitflow._git_command(tag_args)
+        engine = FinishEngine(self.gitflow)
+        plan = engine.finish(branch, [self.gitflow.main_branch, self.gitflow.develop_branch],
+                             dry_run=dry_run, tag=None if no_tag else version_tag,
+                             tag_message=tag_message, sign=sign, keep=keep)
+        if dry_run:
+            return plan
             
-        # Try to merge into develop
-        if not self.gitflow.is_branch_merged_into(branch, self.gitflow.develop_branch):
-            self.gitflow._git_command(['checkout', self.gitflow.develop_branch])
-            self.gitflow.merge_branch(branch)
-            
-        # Delete branch if not keeping
-        if not keep:
-            self.gitflow.delete_branch(branch)
-            
-        # Push if requested
+        # Push every changed ref, and nothing else, in one atomic push
         if push:
-            self.gitflow._git_command(['push', self.gitflow.origin, self.gitflow.develop_branch])
-            self.gitflow._git_command(['push', self.gitflow.origin, self.gitflow.main_branch])
-            if not no_tag:
-                self.gitflow._git_command(['push', '--tags', self.gitflow.origin])
+            engine.push(plan, self.gitflow.origin)
+        return plan
 
     def list(self, verbose: bool = False) -> List[tuple]:
         """List all hotfix branches"""
         hotfix_branches = []
         current = self.gitflow.get_current_branch()
+        branches = self.gitflow.get_branches(prefix=self.gitflow.prefix['hotfix'])
+        engine = BranchStatusEngine(self.gitflow)
+        statuses = engine.compute(branches, self.gitflow.main_branch) if verbose else {}
+        names = engine.describe([s.base for s in statuses.values() if s.state != SAME])
         
-        for branch in self.gitflow.get_branches():
-            if not branch.startswith(self.gitflow.prefix['hotfix']):
-                continue
-                
+        for branch in branches:
             name = branch[len(self.gitflow.prefix['hotfix']):]
             if verbose:
-                base = self.gitflow._git_command(['merge-base', branch, self.gitflow.main_branch]).strip()
-                master_sha = self.gitflow._git_command(['rev-parse', self.gitflow.main_branch]).strip()
-                branch_sha = self.gitflow._git_command(['rev-parse', branch]).strip()
+                branch_status = statuses[branch]
                 
                 status = ""
-                if branch_sha == master_sha:
+                if branch_status.state == SAME:
                     status = "(no commits yet)"
+                elif branch_status.state == UNRELATED:
+                    status = "(unknown base)"
                 else:
-                    try:
-                        tagname = self.gitflow._git_command(['name-rev', '--tags', '--no-undefined', '--name-only', base]).strip()
-                        status = f"(based on {tagname})"
-                    except:
-                        short_sha = self.gitflow._git_command(['rev-parse', '--short', base]).strip()
-                        status = f"(based on {short_sha})"
+                    status = f"(based on {names.get(branch_status.base)})"
                         
                 hotfix_branches.append((branch, name, status, branch == current))
             else:
@@ -117,12 +99,12 @@ class HotfixCommand(BaseCommand):
         if not self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} does not exist")
             
-        # Check if remote branch exists
-        if self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        # Ask the remote, not the possibly stale remote-tracking ref
+        if self.gitflow.remote_branch(branch, recheck=True) is not None:
             raise ValueError(f"Remote branch {branch} already exists")
             
         # Push to remote and set up tracking
-        self.gitflow._git_command(['push', self.gitflow.origin, f"{branch}:refs/heads/{branch}"])
+        self.gitflow.push_branch(branch)
         self.gitflow._git_command(['config', f"branch.{branch}.remote", self.gitflow.origin])
         self.gitflow._git_command(['config', f"branch.{branch}.merge", f"refs/heads/{branch}"])
 
@@ -136,7 +118,9 @@ class HotfixCommand(BaseCommand):
         if self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} already exists")
             
-        if not self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        sha = self.gitflow.remote_branch(branch, recheck=False)
+        if sha is None:
             raise ValueError(f"Remote branch {branch} does not exist")
             
+        self.gitflow.fetch_planner.fetch(self.gitflow.origin, [branch])
         self.gitflow._git_command(['checkout', '-b', branch, f"{self.gitflow.origin}/{branch}"])
@@ -35,8 +35,7 @@ class MainCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        self.gitflow._git_command(['checkout', self.gitflow.main_branch])
-        self.gitflow.merge_branch(branch, no_ff=no_ff)
+        self.gitflow.merge_branch(branch, no_ff=no_ff, target=self.gitflow.main_branch)
 
     def start(self, name: str, base: Optional[str] = None):
         raise NotImplementedError("Main branch does not support start")
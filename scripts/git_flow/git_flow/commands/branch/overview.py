@@ -0,0 +1,84 @@
+import asyncio
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+from ..base import BaseCommand
+from ...aio import AsyncGitFlow
+from ...status import BranchStatus, BranchStatusEngine
+
+# Branch types compared against main; every other flow type is compared against develop
+MAIN_BASED_TYPES = ('develop', 'hotfix', 'support')
+
+class OverviewCommand(BaseCommand):
+    def overview(self) -> List[Tuple[str, int, int, Dict[str, int]]]:
+        """Classify every local and remote branch in one pass
+
+        Called from a thread that is running an event loop, where
+        asyncio.run cannot start another one, the status walks run one
+        after the other; coroutines can await overview_async() instead.
+
+        Returns:
+            List of tuples containing (branch_type, local_count, remote_count,
+            state_counts) in display order, where state_counts maps a status
+            state to the number of local branches in it. Branches matching no
+            configured prefix are reported under 'other'.
+        """
+        local, remote, targets, types = self._group()
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # Walks against develop and main run concurrently when they need git
+            by_target = asyncio.run(AsyncGitFlow(gitflow=self.gitflow).status_by_target(targets, counts=False))
+        else:
+            engine = BranchStatusEngine(self.gitflow)
+            by_target = {target: engine.compute(refnames, target, counts=False)
+                         for target, refnames in targets.items()}
+        return self._rows(local, remote, types, by_target)
+
+    async def overview_async(self) -> List[Tuple[str, int, int, Dict[str, int]]]:
+        """overview() for callers in an event loop, awaiting the walks against develop and main together"""
+        local, remote, targets, types = self._group()
+        by_target = await AsyncGitFlow(gitflow=self.gitflow).status_by_target(targets, counts=False)
+        return self._rows(local, remote, types, by_target)
+
+    def _group(self) -> Tuple[Dict[str, List[str]], Counter, Dict[str, List[str]], Dict[str, str]]:
+        """Local branches and remote counts per type, refnames per status target and type per refname"""
+        classifier = self.gitflow.classifier
+        refs = self.gitflow.refs
+
+        local = defaultdict(list)
+        for branch in refs.names('refs/heads/'):
+            local[classifier.classify(branch) or 'other'].append(branch)
+        remote = Counter()
+        for branch in refs.names('refs/remotes/'):
+            remote[classifier.classify_remote(branch)[1] or 'other'] += 1
+
+        # One status walk per target covers every branch type compared against it
+        targets = {self.gitflow.main_branch: [], self.gitflow.develop_branch: []}
+        types = {}
+        for branch_type, branches in local.items():
+            if branch_type in ('main', 'other'):
+                continue
+            target = self.gitflow.main_branch if branch_type in MAIN_BASED_TYPES else self.gitflow.develop_branch
+            for branch in branches:
+                refname = f"refs/heads/{branch}"
+                types[refname] = branch_type
+                targets[target].append(refname)
+
+        targets = {target: refnames for target, refnames in targets.items()
+                   if refnames and self.gitflow.branch_exists(target)}
+        return local, remote, targets, types
+
+    def _rows(self, local: Dict[str, List[str]], remote: Counter, types: Dict[str, str],
+              by_target: Dict[str, Dict[str, BranchStatus]]) -> List[Tuple[str, int, int, Dict[str, int]]]:
+        """Overview rows in display order from the grouped branches and their statuses"""
+        states = defaultdict(Counter)
+        for statuses in by_target.values():
+            for refname, status in statuses.items():
+                states[types[refname]][status.state] += 1
+
+        branch_types = self.gitflow.classifier.types() + ['other']
+        return [
+            (branch_type, len(local.get(branch_type, [])), remote.get(branch_type, 0), dict(states.get(branch_type, {})))
+            for branch_type in branch_types
+            if branch_type != 'other' or local.get('other') or remote.get('other')
+        ]
@@ -0,0 +1,125 @@
+from typing import Dict, List, Optional
+from ..base import BaseCommand
+from ...remote import PushResult
+
+# Long-lived branch types, only pruned when asked for by type
+DEFAULT_EXCLUDED_TYPES = ('main', 'develop', 'support')
+
+MERGED_FORMAT = '%(refname)%00%(objectname)%00%(worktreepath)'
+
+# Deletions per git push, keeping the command line well under ARG_MAX
+PUSH_BATCH_SIZE = 1000
+
+
+class PruneResult:
+    """
+    Branches a prune deleted, or would delete in a dry run
+
+    Attributes:
+        local (Dict[str, str]): Local branch to the target it is merged into
+        remote (Dict[str, str]): Branch on the remote to the target it is merged into
+        pushed (List[PushResult]): Per-ref results of the remote deletions
+    """
+
+    def __init__(self):
+        self.local: Dict[str, str] = {}
+        self.remote: Dict[str, str] = {}
+        self.pushed: List[PushResult] = []
+
+
+class PruneCommand(BaseCommand):
+    def prune(self, types: Optional[List[str]] = None, remote: bool = False,
+              dry_run: bool = False) -> PruneResult:
+        """Delete flow branches already merged into develop or main
+
+        One for-each-ref --merged query per target finds them, local
+        branches go in a single update-ref transaction and remote ones in
+        one push of ':<ref>' refspecs. Branches checked out in any worktree
+        and branches still at a target's tip (just started, nothing to
+        merge yet) are kept.
+
+        Remote branches are found merged through their remote-tracking
+        refs, which may be older than the remote. Each deletion is pushed
+        with --force-with-lease on the SHA found merged, so the remote
+        rejects it for a branch someone pushed to since the last fetch.
+        Only the remote-tracking refs of deletions the remote accepted are
+        dropped.
+
+        Args:
+            types: Branch types to prune, default every type but main,
+                develop and support
+            remote: Also delete merged branches on the default remote
+            dry_run: Only report what would be deleted
+
+        Returns:
+            PruneResult: The deleted branches
+
+        Raises:
+            ValueError: If a type is not a configured branch type
+            GitFlowError: If the deletion failed; no local branch is deleted then
+        """
+        classifier = self.gitflow.classifier
+        known = classifier.types()
+        if types:
+            unknown = [branch_type for branch_type in types if branch_type not in known]
+            if unknown:
+                raise ValueError(f"Unknown branch type: {', '.join(unknown)} (known: {', '.join(known)})")
+            allowed = set(types) - {'main', 'develop'}
+        else:
+            allowed = set(known) - set(DEFAULT_EXCLUDED_TYPES)
+
+        refs = self.gitflow.refs
+        targets = [target for target in (self.gitflow.develop_branch, self.gitflow.main_branch)
+                   if f"refs/heads/{target}" in refs]
+        target_tips = {refs.get(f"refs/heads/{target}") for target in targets}
+        remote_namespace = f"refs/remotes/{self.gitflow.origin}/"
+        namespaces = ['refs/heads/'] + ([remote_namespace] if remote else [])
+
+        result = PruneResult()
+        deletions = {}
+        for target in targets:
+            output = self.gitflow._git_command(['for-each-ref', f"--merged=refs/heads/{target}",
+                                                f"--format={MERGED_FORMAT}"] + namespaces)
+            for line in output.splitlines():
+                refname, sha, worktree = line.split('\0', 2)
+                if worktree or sha in target_tips:
+                    continue
+                if refname.startswith('refs/heads/'):
+                    branch, found = refname[len('refs/heads/'):], result.local
+                else:
+                    branch, found = refname[len(remote_namespace):], result.remote
+                if branch in found or classifier.classify(branch) not in allowed:
+                    continue
+                found[branch] = target
+                deletions[refname] = sha
+
+        if dry_run:
+            return result
+        local = [(refname, None, sha) for refname, sha in deletions.items() if refname.startswith('refs/heads/')]
+        if local:
+            self.gitflow.update_refs_atomic(local, message="flow: prune merged branches")
+        branches = list(result.remote)
+        for i in range(0, len(branches), PUSH_BATCH_SIZE):
+            leases = {f"refs/heads/{branch}": deletions[f"{remote_namespace}{branch}"]
+                      for branch in branches[i:i + PUSH_BATCH_SIZE]}
+            result.pushed.extend(self.gitflow.push_refs(self.gitflow.origin, [f":{ref}" for ref in leases],
+                                                        atomic=False, leases=leases))
+        self._drop_tracking_refs(remote_namespace, result.pushed)
+        return result
+
+    def _drop_tracking_refs(self, remote_namespace: str, pushed: List[PushResult]):
+        """Delete the remote-tracking refs of remote branches the push deleted
+
+        git push already drops them when the remote's fetch refspec maps
+        onto them, so only the ones still there are deleted.
+        """
+        refs = self.gitflow.refs
+        stale = []
+        for push in pushed:
+            if push.ok and push.flag == '-':
+                tracking = f"{remote_namespace}{push.refname[len('refs/heads/'):]}"
+                sha = refs.get(tracking)
+                if sha is not None:
+                    stale.append((tracking, None, sha))
+        if stale:
+            self.gitflow.update_refs_atomic(stale, message="flow: prune merged branches")
@@ -1,14 +1,18 @@
-from typing import Optional, List, Tuple
+from typing import Iterator, Optional, List, Tuple
 from ..base import BaseCommand
+from ...finish import FinishEngine, FinishPlan
+from ...notes import ReleaseNotes
+from ...status import BranchStatusEngine, SAME, UNRELATED
 
 class ReleaseCommand(BaseCommand):
-    def start(self, version: str, base: Optional[str] = None):
-        """Start a new release branch"""
+    def start(self, version: Optional[str] = None, base: Optional[str] = None,
+              bump: Optional[str] = None) -> str:
+        """Start a new release branch, named after the next version if bump is given"""
         if base is None:
             base = self.gitflow.develop_branch
             
+        version = self._start_version(version, bump)
         branch = f"{self.gitflow.prefix['release']}{version}"
-        version_tag = f"{self.gitflow.prefix['version']}{version}"
         
         # Sanity checks
         if not self.gitflow.is_clean_working_tree():
@@ -18,20 +22,23 @@ class ReleaseCommand(BaseCommand):
             raise ValueError(f"Branch {branch} already exists")
             
         # Check for existing release branches
-        for existing in self.gitflow.get_branches():
-            if existing.startswith(self.gitflow.prefix['release']):
-                raise ValueError(f"There is an existing release branch ({existing}). Finish that one first.")
+        for existing in self.gitflow.get_branches(prefix=self.gitflow.prefix['release']):
+            raise ValueError(f"There is an existing release branch ({existing}). Finish that one first.")
                 
-        # Check if version tag exists
-        if version_tag in self.gitflow.get_all_tags():
-            raise ValueError(f"Tag {version_tag} already exists")
-            
         self.gitflow.create_branch(branch, base)
+        return version
 
     def finish(self, version: str, tag_message: Optional[str] = None, sign: bool = False, 
               push: bool = False, keep: bool = False, squash: bool = False, 
-              signing_key: Optional[str] = None, no_tag: bool = False):
-        """Finish a release branch"""
+              signing_key: Optional[str] = None, no_tag: bool = False,
+              dry_run: bool = False, notes: bool = False) -> FinishPlan:
+        """Finish a release branch
+
+        Merges into main and develop, the tag and the branch deletion are
+        applied as one ref transaction. With dry_run the plan is returned
+        without changing anything. With notes the release notes are appended
+        to the tag message.
+        """
         branch = f"{self.gitflow.prefix['release']}{version}"
         version_tag = f"{self.gitflow.prefix['version']}{version}"
         
@@ -41,71 +48,46 @@ class ReleaseCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        # Merge into main
-        if not self.gitflow.is_branch_merged_into(branch, self.gitflow.main_branch):
-            self.gitflow._git_command(['checkout', self.gitflow.main_branch])
-            if squash:
-                self.gitflow._git_command(['merge', '--squash', branch])
-                self.gitflow._git_command(['commit'])
-            else:
-                self.gitflow.merge_branch(branch)
-                
-        # Create tag
-        if not no_tag and not version_tag in self.gitflow.get_all_tags():
-            tag_args = ['tag', '-a']
-            if sign:
-                tag_args.append('-s')
-            if signing_key:
-                tag_args.extend(['-u', signing_key])
-            if tag_message:
-                tag_args.extend(['-m', tag_message])
-            tag_args.extend([version_tag, branch])
-            self.gitflow._git_command(tag_args)
-            
-        # Merge into develop
-        if not self.gitflow.is_branch_merged_into(branch, self.gitflow.develop_branch):
-            self.gitflow._git_command(['checkout', self.gitflow.develop_branch])
-            if squash:
-                self.gitflow._git_command(['merge', '--squash', branch])
-                self.gitflow._git_command(['commit'])
-            else:
-                self.gitflow.merge_branch(branch)
-                
-        # Delete branch
-        if not keep:
-            if self.gitflow.get_current_branch() == branch:
-                self.gitflow._git_command(['checkout', self.gitflow.main_branch])
-            self.gitflow.delete_branch(branch)
+        tag = None if no_tag or self.gitflow.tag_exists(version_tag) else version_tag
+        if tag and notes:
+            tag_message = '\n'.join([tag_message or tag, ''] + list(self.notes(version)))
+        engine = FinishEngine(self.gitflow)
+        plan = engine.finish(branch, [self.gitflow.main_branch, self.gitflow.develop_branch],
+                             dry_run=dry_run, tag=tag, tag_message=tag_message, sign=sign,
+                             signing_key=signing_key, squash=squash, keep=keep)
+        if dry_run:
+            return plan
             
-        # Push changes
+        # Push every changed ref, and nothing else, in one atomic push
         if push:
-            self.gitflow._git_command(['push', self.gitflow.origin, self.gitflow.develop_branch])
-            self.gitflow._git_command(['push', self.gitflow.origin, self.gitflow.main_branch])
-            if not no_tag:
-                self.gitflow._git_command(['push', '--tags', self.gitflow.origin])
-            self.gitflow._git_command(['push', self.gitflow.origin, f":{branch}"])
+            engine.push(plan, self.gitflow.origin)
+        return plan
+
+    def notes(self, version: str) -> Iterator[str]:
+        """Release notes since the previous version tag, grouped by branch type"""
+        return ReleaseNotes(self.gitflow).generate(version)
 
     def list(self, verbose: bool = False) -> List[Tuple[str, str, str, bool]]:
         """List all release branches"""
         release_branches = []
         current = self.gitflow.get_current_branch()
+        branches = self.gitflow.get_branches(prefix=self.gitflow.prefix['release'])
+        engine = BranchStatusEngine(self.gitflow)
+        statuses = engine.compute(branches, self.gitflow.develop_branch) if verbose else {}
+        names = engine.describe([s.base for s in statuses.values() if s.state != SAME], tags=False)
         
-        for branch in self.gitflow.get_branches():
-            if not branch.startswith(self.gitflow.prefix['release']):
-                continue
-                
+        for branch in branches:
             name = branch[len(self.gitflow.prefix['release']):]
             if verbose:
-                base = self.gitflow._git_command(['merge-base', branch, self.gitflow.develop_branch]).strip()
-                develop_sha = self.gitflow._git_command(['rev-parse', self.gitflow.develop_branch]).strip()
-                branch_sha = self.gitflow._git_command(['rev-parse', branch]).strip()
+                branch_status = statuses[branch]
                 
                 status = ""
-                if branch_sha == develop_sha:
+                if branch_status.state == SAME:
                     status = "(no commits yet)"
+                elif branch_status.state == UNRELATED:
+                    status = "(unknown base)"
                 else:
-                    base_sha = self.gitflow._git_command(['rev-parse', '--short', base]).strip()
-                    status = f"(based on {base_sha})"
+                    status = f"(based on {names.get(branch_status.base)})"
                     
                 release_branches.append((branch, name, status, branch == current))
             else:
@@ -123,12 +105,12 @@ class ReleaseCommand(BaseCommand):
         if not self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} does not exist")
             
-        # Check if remote branch exists
-        if self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        # Ask the remote, not the possibly stale remote-tracking ref
+        if self.gitflow.remote_branch(branch, recheck=True) is not None:
             raise ValueError(f"Remote branch {branch} already exists")
             
         # Push to remote and set up tracking
-        self.gitflow._git_command(['push', self.gitflow.origin, f"{branch}:refs/heads/{branch}"])
+        self.gitflow.push_branch(branch)
         self.gitflow._git_command(['config', f"branch.{branch}.remote", self.gitflow.origin])
         self.gitflow._git_command(['config', f"branch.{branch}.merge", f"refs/heads/{branch}"])
 
@@ -142,7 +124,9 @@ class ReleaseCommand(BaseCommand):
         if self.gitflow.branch_exists(branch):
             raise ValueError(f"Branch {branch} already exists")
             
-        if not self.gitflow.branch_exists(f"{self.gitflow.origin}/{branch}"):
+        sha = self.gitflow.remote_branch(branch, recheck=False)
+        if sha is None:
             raise ValueError(f"Remote branch {branch} does not exist")
             
+        self.gitflow.fetch_planner.fetch(self.gitflow.origin, [branch])
         self.gitflow._git_command(['checkout', '-b', branch, f"{self.gitflow.origin}/{branch}"])
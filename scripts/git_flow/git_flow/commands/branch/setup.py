@@ -1,5 +1,6 @@
 from typing import Optional
 from ..base import BaseCommand
+from ...finish import FinishEngine
 
 class SetupCommand(BaseCommand):
     def start(self, name: str, base: Optional[str] = None):
@@ -28,9 +29,8 @@ class SetupCommand(BaseCommand):
         if not self.gitflow.is_clean_working_tree():
             raise ValueError("Working tree is not clean")
             
-        # Merge setup branch back to base branch and delete it
-        self.gitflow.merge_branch(branch)
-        self.gitflow.delete_branch(branch)
+        # Merge setup branch back to develop and delete it
+        FinishEngine(self.gitflow).finish(branch, [self.gitflow.develop_branch])
         
     def list(self) -> list:
         """List all setup branches"""
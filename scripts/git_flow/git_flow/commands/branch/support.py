@@ -1,5 +1,6 @@
 from typing import Optional, List, Tuple
 from ..base import BaseCommand
+from ...status import BranchStatusEngine, SAME, UNRELATED
 
 class SupportCommand(BaseCommand):
     def start(self, version: str, base: str):
@@ -19,8 +20,7 @@ class SupportCommand(BaseCommand):
             raise ValueError(f"Branch {branch} already exists")
             
         # Verify base is on main
-        master_commits = self.gitflow._git_command(['branch', '--no-color', '--contains', base]).splitlines()
-        if not any(b.strip() == self.gitflow.main_branch for b in master_commits):
+        if not self.gitflow.is_ancestor(base, self.gitflow.main_branch):
             raise ValueError(f"Base {base} is not a valid commit on {self.gitflow.main_branch}")
             
         # Create branch
@@ -37,29 +37,23 @@ class SupportCommand(BaseCommand):
         """
         support_branches = []
         current = self.gitflow.get_current_branch()
+        branches = self.gitflow.get_branches(prefix=self.gitflow.prefix['support'])
+        engine = BranchStatusEngine(self.gitflow)
+        statuses = engine.compute(branches, self.gitflow.main_branch) if verbose else {}
+        names = engine.describe([s.base for s in statuses.values() if s.state != SAME])
         
-        for branch in self.gitflow.get_branches():
-            if not branch.startswith(self.gitflow.prefix['support']):
-                continue
-                
+        for branch in branches:
             name = branch[len(self.gitflow.prefix['support']):]
             if verbose:
-                base = self.gitflow._git_command(['merge-base', branch, self.gitflow.main_branch]).strip()
-                master_sha = self.gitflow._git_command(['rev-parse', self.gitflow.main_branch]).strip()
-                branch_sha = self.gitflow._git_command(['rev-parse', branch]).strip()
+                branch_status = statuses[branch]
                 
                 status = ""
-                if branch_sha == master_sha:
+                if branch_status.state == SAME:
                     status = "(no commits yet)"
+                elif branch_status.state == UNRELATED:
+                    status = "(unknown base)"
                 else:
-                    try:
-                        # Try to get tag name
-                        tag = self.gitflow._git_command(['name-rev', '--tags', '--no-undefined', '--name-only', base]).strip()
-                        status = f"(based on {tag})"
-                    except:
-                        # Fall back to short SHA
-                        short_sha = self.gitflow._git_command(['rev-parse', '--short', base]).strip()
-                        status = f"(based on {short_sha})"
+                    status = f"(based on {names.get(branch_status.base)})"
                         
                 support_branches.append((branch, name, status, branch == current))
             else:
@@ -1,5 +1,6 @@
 from typing import Optional
 from ..base import BaseCommand
+from ...finish import FinishEngine
 
 class TaskCommand(BaseCommand):
     def start(self, feature_name: str, task_name: str, base: Optional[str] = None):
@@ -30,7 +31,5 @@ class TaskCommand(BaseCommand):
         if not self.gitflow.branch_exists(task_branch):
             raise ValueError(f"Task branch {task_branch} does not exist")
             
-        # Switch to feature branch and merge task
-        self.gitflow._git_command(['checkout', feature_branch])
-        self.gitflow.merge_branch(task_branch)
-        self.gitflow.delete_branch(task_branch)
+        # Merge task into its feature and delete it without checking the feature out
+        FinishEngine(self.gitflow).finish(task_branch, [feature_branch])
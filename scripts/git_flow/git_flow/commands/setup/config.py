@@ -1,8 +1,6 @@
 from typing import Dict, Any, Optional
 import re
 import typer
-from rich.prompt import Prompt, Confirm
-from ...settings import Settings
 from ..base import BaseCommand
 
 class GitFlowError(Exception):
@@ -13,7 +11,7 @@ class GitFlowError(Exception):
 class ConfigCommand(BaseCommand):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self.settings = Settings(self.gitflow.config_path)
+        self.settings = self.gitflow.settings
 
     def validate_section_key(self, section: str, key: str) -> bool:
         """Validate section and key names"""
@@ -22,6 +20,7 @@ class ConfigCommand(BaseCommand):
 
     def init(self, initial_values: Optional[Dict[str, Any]] = None, interactive: bool = True) -> None:
         """Initialize config file interactively"""
+        from rich.prompt import Prompt, Confirm
         config = {}
         
         if interactive:
@@ -1,63 +1,255 @@
 import os
 import subprocess
 import re
-from typing import List, Optional, Tuple
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
 from .settings import Settings
+from .backend import GitBackend, GitBackendError
+from .repo import find_repo_root, resolve_git_dir
+from .refs import HEX_RE, FileRefReader, RefFormatError, RefIndex
+from .graph import CommitGraph, CommitGraphError
+from .classify import BranchClassifier
+from .versions import VersionIndex
+from .remote import REMOTE_REFS_TTL, PushResult, RemoteRefs, branch_patterns, parse_ls_remote, parse_push_porcelain
+from . import trace
+
+# Git subcommands that may create, move or delete refs
+REF_MUTATING_COMMANDS = {
+    'am', 'branch', 'checkout', 'cherry-pick', 'commit', 'fetch', 'init', 'merge',
+    'pack-refs', 'pull', 'push', 'rebase', 'remote', 'reset', 'revert', 'stash',
+    'switch', 'symbolic-ref', 'tag', 'update-ref', 'worktree'
+}
+
+# Git subcommands that may change the index or working tree
+WORKTREE_MUTATING_COMMANDS = {
+    'add', 'am', 'apply', 'checkout', 'checkout-index', 'cherry-pick', 'clean', 'commit',
+    'merge', 'mv', 'pull', 'read-tree', 'rebase', 'reset', 'restore', 'revert', 'rm',
+    'stash', 'switch', 'update-index', 'worktree'
+}
+
+# Branch types whose branches are looked up on remotes, and so listed in the remote ref cache
+REMOTE_BRANCH_TYPES = ('feature', 'bugfix', 'release', 'hotfix', 'support')
+
+# Bytes read from a streamed git command at a time
+STREAM_CHUNK_SIZE = 65536
+
+# Revisions that may name an object without being a ref (abbreviated SHAs, rev syntax)
+NON_REF_REVISION_RE = re.compile(r'^[0-9a-fA-F]{4,64}$|[~^:@{}]')
 
 class GitFlow:
     def __init__(self, repo_path: str = '.'):
         # Find workspace root by traversing up until we find .git
-        current_path = os.path.abspath(repo_path)
-        while current_path != os.path.dirname(current_path):
-            if os.path.exists(os.path.join(current_path, '.git')):
-                self.repo_path = current_path
-                break
-            current_path = os.path.dirname(current_path)
-        else:
+        self.repo_path = find_repo_root(repo_path)
+        if self.repo_path is None:
             raise GitFlowError("Not a git repository")
 
         self.git_dir = self._get_git_dir()
+        self._backend = GitBackend(self.repo_path)
+        self._refs = None
+        self._ref_reader = FileRefReader(self.git_dir)
+        self._ancestry = {}
+        self._commit_graph = False
+        self._tree_status = None
+        self._versions = None
+        self._status_cache = {}
+        self._remote_refs: Dict[str, RemoteRefs] = {}
+        self._fetch_planner = None
         self.config_path = os.path.join(self.repo_path, '.git_flow', 'config.yaml')
-        self.settings = Settings(self.config_path)
+        self.settings = Settings(self.config_path, os.path.join(self.git_dir, 'git_flow', 'config.cache'))
         self._load_settings()
 
     def _get_git_dir(self) -> str:
         """Get .git directory path"""
-        git_path = os.path.join(self.repo_path, '.git')
-        if os.path.isfile(git_path):
-            # Handle git worktree case
-            with open(git_path) as f:
-                content = f.read().strip()
-                if content.startswith('gitdir: '):
-                    return os.path.abspath(os.path.join(self.repo_path, content[8:]))
-        return os.path.abspath(git_path)
+        return resolve_git_dir(self.repo_path)
 
     def _load_settings(self):
         """Load settings from config file"""
-        config = self.settings.read_config()
+        config = self.settings.config
         branch_config = config.get('branch', {})
         
         self.main_branch = branch_config.get('main', {}).get('default', 'main')
         self.develop_branch = branch_config.get('develop', {}).get('default', 'develop')
         self.origin = config.get('remote', {}).get('default', 'origin')
+        self.remote_refs_ttl = float(config.get('remote', {}).get('refs_ttl', REMOTE_REFS_TTL))
+        self.untracked_dirty = bool(config.get('config', {}).get('untracked_dirty', False))
         
         self.prefix = {}
         for branch_type in ['feature', 'release', 'hotfix', 'support', 'bugfix', 'version']:
             self.prefix[branch_type] = branch_config.get(branch_type, {}).get('prefix', '')
+        self._classifier = None
 
-    def _git_command(self, args: List[str], check: bool = True) -> str:
+    def _git_command(self, args: List[str], check: bool = True, input: Optional[str] = None) -> str:
         """Execute git command and return output"""
+        result = self._run_git(args, input=input)
+        if check and result.returncode != 0:
+            raise GitFlowError(f"Git command failed: {result.stderr}")
+        return result.stdout
+
+    def _run_git(self, args: List[str], input: Optional[str] = None) -> subprocess.CompletedProcess:
+        """Run git without checking its exit code, dropping state the command may invalidate"""
+        if args and args[0] in REF_MUTATING_COMMANDS:
+            self._refs = None
+        if args and args[0] in WORKTREE_MUTATING_COMMANDS:
+            self._tree_status = None
+        start = time.perf_counter()
+        result = subprocess.run(
+            ['git'] + args,
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True,
+            input=input
+        )
+        trace.record_git(args, start, result.returncode, result.stdout, result.stderr)
+        return result
+
+    def _stream_git(self, args: List[str], separator: str = '\0') -> Iterator[str]:
+        """Run git and yield its output record by record as it is produced
+
+        Output is read in fixed-size chunks and split on separator, so memory
+        stays bounded by the largest record however much git prints. Stopping
+        the iteration early terminates git.
+
+        Raises:
+            GitFlowError: If git exits with an error
+        """
+        start = time.perf_counter()
+        process = subprocess.Popen(['git'] + args, cwd=self.repo_path,
+                                   stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        delimiter = separator.encode()
+        pending = b''
+        size = 0
         try:
-            result = subprocess.run(
-                ['git'] + args,
-                cwd=self.repo_path,
-                capture_output=True,
-                text=True,
-                check=check
-            )
-            return result.stdout
-        except subprocess.CalledProcessError as e:
-            raise GitFlowError(f"Git command failed: {e.stderr}")
+            while True:
+                chunk = process.stdout.read1(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                records = (pending + chunk).split(delimiter)
+                pending = records.pop()
+                for record in records:
+                    yield record.decode(errors='replace')
+            if pending:
+                yield pending.decode(errors='replace')
+            if process.wait() != 0:
+                raise GitFlowError(f"Git command failed: {process.stderr.read().decode(errors='replace')}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            trace.record_git(args, start, process.returncode, size)
+            process.stdout.close()
+            process.stderr.close()
+
+    def invalidate(self):
+        """Drop state read from the repository so the next query reloads it
+
+        Forgets the ref snapshot, the commit-graph mapping and the working
+        tree status. Results keyed by commit (ancestry, branch statuses)
+        cannot go stale and are kept.
+        """
+        self._refs = None
+        self._commit_graph = False
+        self._tree_status = None
+
+    def close(self):
+        """Release the persistent git backend"""
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def refs(self) -> RefIndex:
+        """Ref snapshot, loaded on first use and dropped after ref mutations"""
+        if self._refs is None:
+            if self._ref_reader.supported:
+                try:
+                    self._refs = RefIndex(*self._ref_reader.read_all())
+                    return self._refs
+                except (OSError, RefFormatError):
+                    pass
+            self._refs = RefIndex.load(self._git_command)
+        return self._refs
+
+    @property
+    def fetch_planner(self):
+        """FetchPlanner shared by every command in the process, so fetches coalesce across a batch"""
+        if self._fetch_planner is None:
+            from .fetch import FetchPlanner
+            self._fetch_planner = FetchPlanner(self)
+        return self._fetch_planner
+
+    @property
+    def commit_graph(self) -> Optional[CommitGraph]:
+        """Memory-mapped commit-graph, None if the repository has none"""
+        if self._commit_graph is False:
+            self._commit_graph = CommitGraph.open(os.path.join(self._ref_reader.common_dir, 'objects'))
+        return self._commit_graph
+
+    @property
+    def classifier(self) -> BranchClassifier:
+        """Branch type classifier built from the configured prefixes"""
+        if self._classifier is None:
+            self._classifier = BranchClassifier.from_gitflow(self)
+        return self._classifier
+
+    @property
+    def versions(self) -> VersionIndex:
+        """Version tags sorted by semver, rebuilt only when the ref snapshot changed"""
+        refs = self.refs
+        prefix = self.prefix['version']
+        cached = self._versions
+        if cached is None or cached[0] is not refs or cached[1] != (refs.generation, prefix):
+            cached = self._versions = (refs, (refs.generation, prefix),
+                                       VersionIndex(refs.names('refs/tags/', prefix), prefix))
+        return cached[2]
+
+    def _update_refs(self, args: List[str], refnames: List[str]) -> str:
+        """Run a ref-mutating git command and patch the index for refnames"""
+        refs = self._refs
+        output = self._git_command(args)
+        if refs is not None:
+            for refname in refnames:
+                refs.set(refname, self._resolve_object(refname))
+            self._refs = refs
+        return output
+
+    def _resolve(self, rev: str) -> Optional[str]:
+        """Resolve revision to object name, None if it does not exist"""
+        if self._refs is not None:
+            sha = self._refs.resolve(rev)
+            if sha is not None:
+                return sha
+        elif self._ref_reader.supported:
+            try:
+                sha = self._ref_reader.resolve(rev)
+                if sha is not None or not NON_REF_REVISION_RE.search(rev):
+                    return sha
+            except (OSError, RefFormatError):
+                pass
+        return self._resolve_object(rev)
+
+    def _resolve_object(self, rev: str) -> Optional[str]:
+        """Resolve revision through git, bypassing the ref index"""
+        if self._backend.available:
+            try:
+                return self._backend.resolve(rev)
+            except GitBackendError:
+                pass
+        try:
+            return self._git_command(['rev-parse', '--quiet', '--verify', rev]).strip() or None
+        except GitFlowError:
+            return None
+
+    def rev_parse(self, rev: str) -> str:
+        """Resolve revision to object name"""
+        sha = self._resolve(rev)
+        if sha is None:
+            raise GitFlowError(f"Unknown revision: {rev}")
+        return sha
 
     def _git_config_get(self, key: str) -> Optional[str]:
         """Get git config value"""
@@ -72,33 +264,90 @@ class GitFlow:
 
     def get_current_branch(self) -> str:
         """Get current branch name"""
+        if self._ref_reader.supported:
+            try:
+                target = self._ref_reader.read_symref('HEAD')
+                if target is None:
+                    return ''
+                return target[len('refs/heads/'):] if target.startswith('refs/heads/') else ''
+            except OSError:
+                pass
         result = self._git_command(['branch', '--show-current'])
         return result.strip()
 
-    def is_clean_working_tree(self) -> bool:
-        """Check if working tree is clean"""
-        try:
-            self._git_command(['diff', '--no-ext-diff', '--quiet'])
-            self._git_command(['diff-index', '--cached', '--quiet', 'HEAD', '--'])
-            return True
-        except GitFlowError:
-            return False
+    def is_clean_working_tree(self, untracked: Optional[bool] = None) -> bool:
+        """Check if working tree and index match HEAD
+
+        The result is remembered until a git command that may touch the index
+        or working tree runs through this GitFlow, so repeated checks within a
+        command cost one ``git status``.
+
+        Args:
+            untracked: Whether untracked files make the tree dirty. Defaults to
+                the config.untracked_dirty setting, which is off like git diff.
+        """
+        if untracked is None:
+            untracked = self.untracked_dirty
+        status = self._tree_status
+        if status is None or (untracked and status[1] is None):
+            try:
+                status = self._tree_status = self._read_tree_status(untracked)
+            except GitFlowError:
+                return False
+        tracked_changes, has_untracked = status
+        return not tracked_changes and not (untracked and has_untracked)
+
+    def _read_tree_status(self, untracked: bool) -> Tuple[bool, Optional[bool]]:
+        """Run one git status, returning (tracked changes, untracked files or None if not scanned)
+
+        git status honours core.fsmonitor and the untracked cache when the
+        repository enables them; when untracked files do not matter it runs
+        with --untracked-files=no and skips the untracked scan entirely.
+        """
+        return self._parse_tree_status(self._git_command(self._tree_status_args(untracked)), untracked)
+
+    @staticmethod
+    def _tree_status_args(untracked: bool) -> List[str]:
+        """Arguments of the git status call behind is_clean_working_tree"""
+        return ['status', '--porcelain=v2', '--branch', '-z', '--ignored=no',
+                f"--untracked-files={'normal' if untracked else 'no'}"]
+
+    @staticmethod
+    def _parse_tree_status(output: str, untracked: bool) -> Tuple[bool, Optional[bool]]:
+        """Parse status --porcelain=v2 --branch -z into (tracked changes, untracked files or None if not scanned)
+
+        An unborn HEAD counts as a tracked change: there is no commit the
+        tree could be clean against.
+        """
+        fields = iter(output.split('\0'))
+        tracked_changes = False
+        has_untracked = False
+        for field in fields:
+            kind = field[:1]
+            if field == '# branch.oid (initial)':
+                tracked_changes = True
+            elif kind == '?':
+                has_untracked = True
+            elif kind in ('1', '2', 'u'):
+                tracked_changes = True
+                if kind == '2':
+                    # Renames and copies carry their original path as an extra field
+                    next(fields, None)
+        return tracked_changes, has_untracked if untracked else None
 
     def branch_exists(self, branch: str) -> bool:
         """Check if branch exists"""
-        try:
-            self._git_command(['rev-parse', '--verify', branch], check=False)
-            return True
-        except GitFlowError:
-            return False
+        return self._resolve(branch) is not None
+
+    def tag_exists(self, tag: str) -> bool:
+        """Check if tag exists"""
+        return f"refs/tags/{tag}" in self.refs
 
-    def get_branches(self, remote: bool = False) -> List[str]:
-        """Get list of branches"""
-        args = ['branch', '--no-color']
+    def get_branches(self, remote: bool = False, prefix: str = '') -> List[str]:
+        """Get list of branches, optionally only those starting with prefix"""
         if remote:
-            args.append('-r')
-        result = self._git_command(args)
-        return [b.strip() for b in result.splitlines()]
+            return self.refs.names('refs/remotes/', prefix)
+        return self.refs.names('refs/heads/', prefix)
 
     def validate_branch_name(self, branch: str) -> bool:
         """Validate branch name"""
@@ -111,24 +360,91 @@ class GitFlow:
         if not self.validate_branch_name(base):
             raise GitFlowError(f"Invalid base branch name: {base}")
         try:
-            self._git_command(['checkout', '-b', branch, base])
+            self._update_refs(['checkout', '-b', branch, base], [f"refs/heads/{branch}"])
         except GitFlowError as e:
             raise GitFlowError(f"Failed to create branch: {str(e)}")
 
-    def merge_branch(self, branch: str, no_ff: bool = True):
-        """Merge branch"""
+    def merge_branch(self, branch: str, no_ff: bool = True, target: Optional[str] = None,
+                     squash: bool = False):
+        """Merge branch into target, the current branch by default
+
+        The merge commit is built with merge-tree and commit-tree and target
+        is moved with update-ref, so the working tree is only updated when
+        target is checked out. Merges with conflicts fall back to git merge
+        in a checkout of target, where the conflicts can be resolved.
+        """
         if not self.validate_branch_name(branch):
             raise GitFlowError(f"Invalid branch name: {branch}")
         if not self.is_clean_working_tree():
             raise GitFlowError("Working tree is not clean")
+        current = self.get_current_branch()
+        target = target or current
+        if not target:
+            raise GitFlowError("Merge failed: HEAD is detached and no target branch was given")
+        with trace.span(f"merge {branch} into {target}"):
+            old = self.rev_parse(target)
+            try:
+                new = self.merge_commit(branch, target, no_ff=no_ff, squash=squash)
+            except MergeConflictError:
+                self.merge_with_checkout(branch, target, no_ff=no_ff, squash=squash)
+                return
+            if new == old:
+                return
+            # The working tree goes first: read-tree refuses, e.g. over an
+            # untracked file the merge adds, before target has moved
+            if target == current:
+                self._git_command(['read-tree', '-m', '-u', old, new])
+            try:
+                self.update_refs_atomic([(f"refs/heads/{target}", new, old)], message=f"flow: merge {branch}")
+            except GitFlowError:
+                if target == current:
+                    self._git_command(['read-tree', '-m', '-u', new, old])
+                raise
+
+    def merge_commit(self, branch: str, target: str, no_ff: bool = True, squash: bool = False) -> str:
+        """Commit target would point to after merging branch, without moving any ref
+
+        Returns target's tip if branch is already merged, or when squashing
+        would not change target's tree (e.g. a squash finish run again), and
+        branch's tip for a fast-forward; otherwise writes a merge commit (a
+        single-parent commit when squashing) with the message git merge
+        would use.
+
+        Raises:
+            MergeConflictError: If the merge has conflicts
+        """
+        branch_sha = self.rev_parse(branch)
+        target_sha = self.rev_parse(target)
+        if self.is_ancestor(branch_sha, target_sha):
+            return target_sha
+        if not no_ff and not squash and self.is_ancestor(target_sha, branch_sha):
+            return branch_sha
+        tree = self.merge_tree(target_sha, branch_sha)
+        if tree is None:
+            raise MergeConflictError(branch, target)
+        if squash:
+            if tree == self.rev_parse(f"{target_sha}^{{tree}}"):
+                return target_sha
+            return self.commit_tree(tree, [target_sha], f"Squashed commit of branch '{branch}'")
+        return self.commit_tree(tree, [target_sha, branch_sha], merge_message(branch, target))
+
+    def merge_with_checkout(self, branch: str, target: str, no_ff: bool = True, squash: bool = False):
+        """Check target out and run git merge, leaving any conflicts to be resolved there"""
+        if self.get_current_branch() != target:
+            self._git_command(['checkout', target])
         args = ['merge']
-        if no_ff:
+        if squash:
+            args.append('--squash')
+        elif no_ff:
             args.append('--no-ff')
         args.append(branch)
         try:
-            self._git_command(args)
+            self._update_refs(args, [f"refs/heads/{target}"])
+            if squash:
+                self._update_refs(['commit', '-m', f"Squashed commit of branch '{branch}'"],
+                                  [f"refs/heads/{target}"])
         except GitFlowError as e:
-            raise GitFlowError(f"Merge failed: {str(e)}")
+            raise GitFlowError(f"Merge failed, resolve the conflicts on {target} and commit: {str(e).strip()}")
 
     def delete_branch(self, branch: str, force: bool = False):
         """Delete branch"""
@@ -138,11 +454,234 @@ class GitFlow:
         else:
             args.append('-d')
         args.append(branch)
-        self._git_command(args)
+        self._update_refs(args, [f"refs/heads/{branch}"])
+
+    def create_tag(self, tag: str, target: str, message: Optional[str] = None,
+                   sign: bool = False, signing_key: Optional[str] = None):
+        """Create annotated tag"""
+        args = ['tag', '-a']
+        if sign:
+            args.append('-s')
+        if signing_key:
+            args.extend(['-u', signing_key])
+        if message:
+            args.extend(['-m', message])
+        args.extend([tag, target])
+        self._update_refs(args, [f"refs/tags/{tag}"])
+
+    def merge_tree(self, ours: str, theirs: str) -> Optional[str]:
+        """Merge two commits without touching refs, the index or the working tree
+
+        Returns:
+            Optional[str]: Tree of the merge result, None if the merge conflicts
+        """
+        output = self._git_command(['merge-tree', '--write-tree', '--no-messages', ours, theirs], check=False)
+        lines = output.splitlines()
+        if not lines or not HEX_RE.match(lines[0]):
+            raise GitFlowError(f"Failed to merge {theirs} into {ours} (merge-tree needs git 2.38 or newer)")
+        # Conflicted file entries follow the tree on conflict
+        return lines[0] if len(lines) == 1 else None
+
+    def commit_tree(self, tree: str, parents: List[str], message: str) -> str:
+        """Write a commit object for tree without moving any ref"""
+        args = ['commit-tree', tree]
+        for parent in parents:
+            args.extend(['-p', parent])
+        args.extend(['-F', '-'])
+        return self._git_command(args, input=message).strip()
+
+    def create_tag_object(self, tag: str, target: str, message: str, sign: bool = False,
+                          signing_key: Optional[str] = None) -> str:
+        """Write an annotated tag object for target without creating refs/tags/<tag>
+
+        Signed tags are made by git tag -s, so every gpg.format git supports
+        (openpgp, x509, ssh) works; the tag ref it creates is deleted again
+        right away, leaving only the object.
+        """
+        if sign or signing_key:
+            return self._signed_tag_object(tag, target, message, signing_key)
+        target_sha = self.rev_parse(target)
+        object_type = self._git_command(['cat-file', '-t', target_sha]).strip()
+        tagger = self._git_command(['var', 'GIT_COMMITTER_IDENT']).strip()
+        payload = f"object {target_sha}\ntype {object_type}\ntag {tag}\ntagger {tagger}\n\n{message.strip()}\n"
+        return self._git_command(['mktag'], input=payload).strip()
+
+    def _signed_tag_object(self, tag: str, target: str, message: str, signing_key: Optional[str]) -> str:
+        """Sign a tag object with git tag -s and drop the ref it created"""
+        refname = f"refs/tags/{tag}"
+        if refname in self.refs:
+            raise GitFlowError(f"Tag {tag} already exists")
+        args = ['tag', '-s']
+        if signing_key:
+            args.extend(['-u', signing_key])
+        args.extend(['-F', '-', tag, target])
+        try:
+            self._git_command(args, input=message)
+        except GitFlowError as e:
+            raise GitFlowError(f"Failed to sign tag: {str(e).strip()}")
+        tag_sha = self._git_command(['rev-parse', '--verify', refname]).strip()
+        self.update_refs_atomic([(refname, None, tag_sha)])
+        return tag_sha
+
+    def push_refs(self, remote: str, refspecs: List[str], atomic: bool = True,
+                  leases: Optional[Dict[str, str]] = None) -> List[PushResult]:
+        """Push several refspecs in one git push
+
+        Args:
+            remote: Remote to push to
+            refspecs: Refspecs to push, ':<ref>' deletes
+            atomic: Whether the remote must accept all refs or none
+            leases: SHA per remote refname the remote must still have for
+                that ref to be updated, passed as --force-with-lease
+
+        Returns:
+            List[PushResult]: One result per ref, including rejected ones
+        """
+        args = ['push', '--porcelain']
+        if atomic:
+            args.append('--atomic')
+        args.extend(f"--force-with-lease={refname}:{sha}" for refname, sha in (leases or {}).items())
+        args.append(remote)
+        args.extend(refspecs)
+        result = self._run_git(args)
+        results = parse_push_porcelain(result.stdout)
+        if not results and result.returncode != 0:
+            if atomic and 'does not support --atomic' in result.stderr:
+                return self.push_refs(remote, refspecs, atomic=False, leases=leases)
+            raise GitFlowError(f"Git command failed: {result.stderr}")
+        self._record_pushed(remote, results)
+        return results
+
+    def push_branch(self, branch: str, remote: Optional[str] = None) -> PushResult:
+        """Push a local branch to the same name on a remote
+
+        Raises:
+            GitFlowError: If the remote rejected it
+        """
+        refname = f"refs/heads/{branch}"
+        results = self.push_refs(remote or self.origin, [f"{refname}:{refname}"], atomic=False)
+        for result in results:
+            if not result.ok:
+                raise GitFlowError(f"Push rejected: {result.describe()}")
+        return results[0] if results else PushResult(refname, refname, '=', '')
+
+    def _remote_refs_path(self, remote: str) -> str:
+        """Cache file of a remote's ref listing, shared by all worktrees"""
+        name = remote.replace('%', '%25').replace('/', '%2F')
+        return os.path.join(self._ref_reader.common_dir, 'git_flow', 'remote-refs', f"{name}.json")
+
+    def remote_refs(self, remote: Optional[str] = None, refresh: bool = False) -> RemoteRefs:
+        """Flow branches on a remote, as the remote itself advertises them
+
+        One protocol v2 ls-remote lists the branches under the configured
+        flow prefixes; the listing is shared by every command in the process
+        and saved under the git dir, where later processes reuse it for
+        remote.refs_ttl seconds. Protocol v2 makes the remote send only
+        refs/heads/, not its tags and other refs. The prefix patterns are
+        matched by ls-remote itself, since git does not pass them on as ref
+        prefixes.
+
+        Args:
+            remote: Remote name, default the configured default remote
+            refresh: Ask the remote even if a fresh listing is cached
+
+        Raises:
+            GitFlowError: If the remote cannot be reached
+        """
+        remote = remote or self.origin
+        patterns = branch_patterns(self.prefix[branch_type] for branch_type in REMOTE_BRANCH_TYPES)
+        path = self._remote_refs_path(remote)
+        if not refresh:
+            cached = self._remote_refs.get(remote) or RemoteRefs.load(path, remote)
+            if cached is not None and cached.fresh(patterns, self.remote_refs_ttl):
+                self._remote_refs[remote] = cached
+                return cached
+        output = self._git_command(['-c', 'protocol.version=2', 'ls-remote', '--heads', remote] + patterns)
+        listing = self._remote_refs[remote] = RemoteRefs(remote, patterns, parse_ls_remote(output))
+        listing.save(path)
+        return listing
+
+    def remote_branch(self, branch: str, remote: Optional[str] = None,
+                      recheck: Optional[bool] = None) -> Optional[str]:
+        """SHA of a branch on a remote, None if the remote does not have it
+
+        Answers from remote_refs(); branches outside the flow prefixes are
+        looked up with their own ls-remote.
+
+        Args:
+            branch: Branch name
+            remote: Remote name, default the configured default remote
+            recheck: Whether existing (True) or missing (False) is the
+                answer a command fails on; that answer is confirmed with the
+                remote when it came from an earlier process's listing
+
+        Raises:
+            GitFlowError: If the remote cannot be reached
+        """
+        remote = remote or self.origin
+        refname = f"refs/heads/{branch}"
+        listing = self.remote_refs(remote)
+        if not listing.covers(refname):
+            output = self._git_command(['-c', 'protocol.version=2', 'ls-remote', remote, refname])
+            return parse_ls_remote(output).get(refname)
+        if recheck is not None and (refname in listing) == recheck and not listing.live:
+            listing = self.remote_refs(remote, refresh=True)
+        return listing.get(refname)
+
+    def _record_pushed(self, remote: str, results: List[PushResult]):
+        """Patch the remote ref listing, in memory and on disk, and the fetch planner with refs a push updated"""
+        if self._fetch_planner is not None:
+            self._fetch_planner.forget(remote, [result.refname[len('refs/heads/'):] for result in results
+                                                if result.ok and result.refname.startswith('refs/heads/')])
+        path = self._remote_refs_path(remote)
+        listing = self._remote_refs.get(remote) or RemoteRefs.load(path, remote)
+        if listing is None:
+            return
+        changed = False
+        for result in results:
+            if result.ok and result.flag != '=' and listing.covers(result.refname):
+                listing.update(result.refname, None if result.flag == '-' else self._resolve(result.source))
+                changed = True
+        if changed:
+            listing.save(path)
+
+    def update_refs_atomic(self, updates: List[Tuple[str, Optional[str], Optional[str]]],
+                           message: Optional[str] = None):
+        """Apply ref updates in one update-ref --stdin transaction
+
+        Args:
+            updates: (refname, new, old) triples. new=None deletes the ref and
+                old=None requires that it does not exist yet; otherwise the
+                ref must still point at old, so nothing changes if any ref
+                moved since the updates were planned.
+            message: Reflog message
+        """
+        lines = ['start']
+        for refname, new, old in updates:
+            if new is None:
+                lines.append(f"delete {refname} {old}")
+            elif old is None:
+                lines.append(f"create {refname} {new}")
+            else:
+                lines.append(f"update {refname} {new} {old}")
+        lines.extend(['prepare', 'commit'])
+        args = ['update-ref']
+        if message:
+            args.extend(['-m', message])
+        args.append('--stdin')
+        refs = self._refs
+        try:
+            self._git_command(args, input='\n'.join(lines) + '\n')
+        except GitFlowError as e:
+            raise GitFlowError(f"Ref transaction failed, no refs were changed: {str(e)}")
+        if refs is not None:
+            for refname, new, _ in updates:
+                refs.set(refname, new)
+            self._refs = refs
 
     def get_remote_branches(self) -> List[str]:
         """Get list of remote branches"""
-        return [b.strip() for b in self._git_command(['branch', '-r', '--no-color']).splitlines()]
+        return self.refs.names('refs/remotes/')
 
     def get_all_branches(self) -> List[str]:
         """Get list of all branches (local and remote)"""
@@ -152,15 +691,11 @@ class GitFlow:
 
     def get_all_tags(self) -> List[str]:
         """Get list of all tags"""
-        return self._git_command(['tag']).splitlines()
+        return self.refs.names('refs/tags/')
 
     def is_headless(self) -> bool:
         """Check if repository is headless"""
-        try:
-            self._git_command(['rev-parse', '--quiet', '--verify', 'HEAD'])
-            return False
-        except GitFlowError:
-            return True
+        return self._resolve('HEAD') is None
 
     def compare_branches(self, branch1: str, branch2: str) -> int:
         """Compare two branches and return their relationship
@@ -171,14 +706,16 @@ class GitFlow:
         3 - Branches need merging
         4 - No merge base (no common ancestors)
         """
-        commit1 = self._git_command(['rev-parse', branch1]).strip()
-        commit2 = self._git_command(['rev-parse', branch2]).strip()
+        commit1 = self.rev_parse(branch1)
+        commit2 = self.rev_parse(branch2)
         
         if commit1 == commit2:
             return 0
             
         try:
-            base = self._git_command(['merge-base', commit1, commit2]).strip()
+            base = self._graph_merge_base(commit1, commit2)
+            if base is None:
+                raise GitFlowError(f"No merge base for {branch1} and {branch2}")
             if commit1 == base:
                 return 1
             elif commit2 == base:
@@ -188,14 +725,90 @@ class GitFlow:
         except GitFlowError:
             return 4
 
+    def _graph_merge_base(self, commit1: str, commit2: str) -> Optional[str]:
+        """Merge base from the commit-graph, falling back to git merge-base"""
+        graph = self.commit_graph
+        if graph is not None and graph.contains([commit1, commit2]):
+            try:
+                return graph.merge_base(commit1, commit2)
+            except CommitGraphError:
+                pass
+        return self._git_command(['merge-base', commit1, commit2]).strip() or None
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check if ancestor is reachable from descendant
+
+        Results are memoized by commit SHA pair for the lifetime of the
+        instance; ancestry between two fixed commits never changes.
+        """
+        key = (self.rev_parse(ancestor), self.rev_parse(descendant))
+        if key[0] == key[1]:
+            return True
+        if key not in self._ancestry:
+            graph = self.commit_graph
+            if graph is not None and graph.contains(list(key)):
+                try:
+                    self._ancestry[key] = graph.is_ancestor(key[0], key[1])
+                    return self._ancestry[key]
+                except CommitGraphError:
+                    pass
+            try:
+                self._git_command(['merge-base', '--is-ancestor', key[0], key[1]])
+                self._ancestry[key] = True
+            except GitFlowError:
+                self._ancestry[key] = False
+        return self._ancestry[key]
+
+    def contains_many(self, commit: str, refs: List[str]) -> Dict[str, bool]:
+        """Check which of refs contain commit, using one for-each-ref call"""
+        commit_sha = self.rev_parse(commit)
+        result = {}
+        pending = {}
+        for ref in refs:
+            ref_sha = self.rev_parse(ref)
+            key = (commit_sha, ref_sha)
+            if commit_sha == ref_sha:
+                result[ref] = True
+            elif key in self._ancestry:
+                result[ref] = self._ancestry[key]
+            else:
+                refname = self.refs.full_name(ref)
+                if refname is None:
+                    result[ref] = self.is_ancestor(commit_sha, ref_sha)
+                else:
+                    pending.setdefault(refname, []).append(ref)
+        if pending:
+            output = self._git_command(['for-each-ref', '--contains', commit_sha,
+                                        '--format=%(refname)'] + list(pending))
+            containing = set(output.splitlines())
+            for refname, names in pending.items():
+                for ref in names:
+                    contained = refname in containing
+                    self._ancestry[(commit_sha, self.rev_parse(ref))] = contained
+                    result[ref] = contained
+        return result
+
     def is_branch_merged_into(self, subject: str, base: str) -> bool:
         """Check if subject branch is merged into base branch"""
         try:
-            merges = self._git_command(['branch', '--no-color', '--contains', subject])
-            merged_branches = [b.strip() for b in merges.splitlines()]
-            return base in merged_branches
+            return self.is_ancestor(subject, base)
         except GitFlowError:
             return False
 
+def merge_message(branch: str, target: str) -> str:
+    """Default message of git merge, which leaves out the target for main and master"""
+    if target in ('main', 'master'):
+        return f"Merge branch '{branch}'"
+    return f"Merge branch '{branch}' into {target}"
+
 class GitFlowError(Exception):
     pass
+
+class MergeConflictError(GitFlowError):
+    """Merging branch into target needs conflicts resolved in a working tree"""
+
+    def __init__(self, branch: str, target: str):
+        super().__init__(f"Merging {branch} into {target} has conflicts")
+        self.branch = branch
+        self.target = target
+
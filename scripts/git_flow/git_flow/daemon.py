@@ -0,0 +1,352 @@
+"""
+Daemon Module
+
+Keeps GitFlow instances warm for editor plugins and shell prompts that run
+read-only queries many times a minute. ``git-flow daemon run`` serves
+requests over a Unix domain socket, one newline-terminated JSON message
+each way per connection, and answers them with the regular CLI running in
+process against a cached GitFlow per repository (settings, ref snapshot,
+commit-graph and computed branch statuses).
+
+Before every request a stat fingerprint of the ref storage, HEAD and the
+commit-graph decides whether the ref-derived state is reloaded, and one of
+``.git_flow/config.yaml`` and the git config whether the instance is
+rebuilt. Git replaces refs by renaming lock files into place, which always
+changes the mtime of the directory holding them, so stat calls on the ref
+directories notice every ref update without reading any ref.
+
+The client side (route) runs on every CLI start, so this module imports
+only os at the top and loads the rest once a daemon is actually contacted.
+"""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+PROTOCOL = 1
+
+# Environment variables: socket location override, and opting out of the daemon
+SOCKET_ENV = 'GIT_FLOW_SOCKET'
+DISABLE_ENV = 'GIT_FLOW_NO_DAEMON'
+
+# Seconds without a request after which the daemon exits
+DEFAULT_IDLE_TIMEOUT = 1800
+
+# Seconds a client waits for an answer before running the command itself
+CLIENT_TIMEOUT = 5.0
+
+# Repositories kept warm at once; the least recently used is dropped
+MAX_REPOS = 32
+
+# Largest request the daemon reads
+MAX_REQUEST_BYTES = 1 << 20
+
+# Branch subcommands that only read the repository and may be answered by the daemon
+READ_ONLY_SUBCOMMANDS = ('list', 'notes')
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path() -> str:
+    """Socket of the current user's daemon: $GIT_FLOW_SOCKET, else under $XDG_RUNTIME_DIR or /tmp"""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'git-flow.sock')
+    return os.path.join(_tmp_socket_dir(), 'daemon.sock')
+
+
+def _tmp_socket_dir() -> str:
+    """Fallback socket directory; /tmp is shared, so another user could create it first"""
+    return os.path.join('/tmp', f"git-flow-{os.getuid()}")
+
+
+def _private_dir(path: str) -> bool:
+    """Whether path is a real directory owned by the current user that nobody else can use"""
+    import stat
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return stat.S_ISDIR(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def trusted_socket(path: str) -> bool:
+    """
+    Whether a socket may be talked to: owned by the current user and, in
+    the /tmp fallback directory, in a directory only the user can use
+
+    Another local user could otherwise create /tmp/git-flow-<uid> first and
+    answer this user's queries.
+    """
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if st.st_uid != os.getuid():
+        return False
+    directory = os.path.dirname(os.path.abspath(path))
+    return directory != _tmp_socket_dir() or _private_dir(directory)
+
+
+def is_read_only(argv: List[str]) -> bool:
+    """Whether a command line is a read-only query the daemon may answer"""
+    if len(argv) < 2 or argv[0] != 'branch' or any(arg.startswith('-') for arg in argv):
+        return False
+    return argv[1:] == ['overview'] or (len(argv) >= 3 and argv[2] in READ_ONLY_SUBCOMMANDS)
+
+
+def request(message: Dict[str, object], path: Optional[str] = None,
+            timeout: float = CLIENT_TIMEOUT) -> Optional[Dict[str, object]]:
+    """Send one message to the daemon and return its answer, None if no daemon answered"""
+    import json
+    import socket
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path or socket_path())
+            sock.sendall(json.dumps(dict(message, protocol=PROTOCOL)).encode() + b'\n')
+            with sock.makefile('rb') as stream:
+                answer = json.loads(stream.readline())
+    except (OSError, ValueError):
+        return None
+    return answer if isinstance(answer, dict) else None
+
+
+def route(argv: List[str], cwd: str) -> Optional[Dict[str, object]]:
+    """
+    Run a command line through the daemon if it is a read-only query and a daemon is up
+
+    Returns:
+        Optional[Dict[str, object]]: The command's stdout, stderr and exit
+        code, None when the caller should run the command itself
+    """
+    if os.environ.get(DISABLE_ENV) or not is_read_only(argv):
+        return None
+    path = socket_path()
+    if not os.path.exists(path) or not trusted_socket(path):
+        return None
+    answer = request({'op': 'run', 'argv': argv, 'cwd': cwd}, path)
+    if not answer or not answer.get('ok'):
+        return None
+    return answer
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int, int]]:
+    """Identity of a file's current version, None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def ref_fingerprint(gitflow) -> tuple:
+    """Stat fingerprint of everything the ref snapshot and commit-graph are read from"""
+    common_dir = gitflow._ref_reader.common_dir
+    info_dir = os.path.join(common_dir, 'objects', 'info')
+    keys = [
+        _stat_key(os.path.join(gitflow.git_dir, 'HEAD')),
+        _stat_key(os.path.join(common_dir, 'packed-refs')),
+        _stat_key(os.path.join(common_dir, 'reftable', 'tables.list')),
+        _stat_key(os.path.join(info_dir, 'commit-graph')),
+        _stat_key(os.path.join(info_dir, 'commit-graphs', 'commit-graph-chain')),
+    ]
+    for root, _, _ in os.walk(os.path.join(common_dir, 'refs')):
+        keys.append((root, _stat_key(root)))
+    return tuple(keys)
+
+
+def config_fingerprint(gitflow) -> tuple:
+    """Stat fingerprint of the flow configuration and the git config"""
+    return (_stat_key(gitflow.config_path),
+            _stat_key(os.path.join(gitflow._ref_reader.common_dir, 'config')))
+
+
+class RepoState:
+    """
+    Warm GitFlow of one repository
+
+    Attributes:
+        gitflow (GitFlow): Cached instance
+        refs_key (tuple): ref_fingerprint() the cached ref state was read at
+        config_key (tuple): config_fingerprint() the instance was built at
+    """
+
+    def __init__(self, gitflow):
+        self.gitflow = gitflow
+        self.refs_key = ref_fingerprint(gitflow)
+        self.config_key = config_fingerprint(gitflow)
+
+
+class DaemonServer:
+    """
+    Serves read-only CLI commands against warm GitFlow instances
+
+    Requests are handled one at a time: commands print through the
+    process-wide stdout, which is redirected per request, and a prompt or
+    editor query takes milliseconds once its repository is warm.
+
+    Attributes:
+        path (str): Socket path
+        idle_timeout (float): Seconds without a request before exiting
+    """
+
+    def __init__(self, path: Optional[str] = None, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.path = path or socket_path()
+        self.idle_timeout = idle_timeout
+        self.started = None
+        self._repos: Dict[str, RepoState] = {}
+        self._roots: Dict[str, str] = {}
+        self._cli = None
+        self._stopping = False
+
+    def serve(self):
+        """Listen on the socket until stopped, interrupted or idle for idle_timeout"""
+        import signal
+        import socket
+        import sys
+        import time
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            if os.path.abspath(directory) == _tmp_socket_dir() and not _private_dir(directory):
+                raise DaemonError(f"Refusing to listen in {directory}: it must be a directory owned "
+                                  f"by the current user with mode 0700")
+        if os.path.exists(self.path):
+            if request({'op': 'ping'}, self.path, timeout=1.0) is not None:
+                raise DaemonError(f"A daemon is already listening on {self.path}")
+            os.unlink(self.path)
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            sock.listen(16)
+            sock.settimeout(self.idle_timeout)
+            signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+            self.started = time.time()
+            while not self._stopping:
+                try:
+                    conn, _ = sock.accept()
+                except socket.timeout:
+                    break
+                with conn:
+                    self._serve_connection(conn)
+        finally:
+            sock.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            for state in self._repos.values():
+                state.gitflow.close()
+            self._repos.clear()
+
+    def _serve_connection(self, conn):
+        """Read one request from a connection and write the answer"""
+        import json
+
+        conn.settimeout(CLIENT_TIMEOUT)
+        try:
+            with conn.makefile('rb') as stream:
+                line = stream.readline(MAX_REQUEST_BYTES)
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("Request is not an object")
+            answer = self.handle(message)
+        except ValueError as e:
+            answer = {'ok': False, 'error': f"Invalid request: {e}"}
+        except OSError:
+            return
+        try:
+            conn.sendall(json.dumps(answer).encode() + b'\n')
+        except OSError:
+            pass
+
+    def handle(self, message: Dict[str, object]) -> Dict[str, object]:
+        """Answer one request; 'ok' is False for anything the client should run itself"""
+        import time
+        from . import __version__
+
+        if message.get('protocol') != PROTOCOL:
+            return {'ok': False, 'error': f"Unsupported protocol {message.get('protocol')}"}
+        op = message.get('op')
+        if op == 'ping':
+            return {'ok': True, 'pid': os.getpid(), 'version': __version__,
+                    'uptime': time.time() - self.started, 'repos': list(self._repos)}
+        if op == 'stop':
+            self._stopping = True
+            return {'ok': True}
+        if op == 'run':
+            argv, cwd = message.get('argv'), message.get('cwd')
+            if not isinstance(argv, list) or not isinstance(cwd, str) or not is_read_only(argv):
+                return {'ok': False, 'error': 'Not a read-only command'}
+            return self._run([str(arg) for arg in argv], cwd)
+        return {'ok': False, 'error': f"Unknown operation {op}"}
+
+    def _run(self, argv: List[str], cwd: str) -> Dict[str, object]:
+        """Run a command line with the CLI against the warm GitFlow for cwd"""
+        import io
+        from contextlib import redirect_stderr, redirect_stdout
+        from .cli import CLI
+        from .core import GitFlowError
+
+        try:
+            gitflow = self.gitflow_for(cwd)
+        except (GitFlowError, OSError) as e:
+            return {'ok': False, 'error': str(e)}
+        if self._cli is None:
+            self._cli = CLI()
+        self._cli._gitflow = gitflow
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = 0
+        try:
+            with redirect_stdout(stdout), redirect_stderr(stderr):
+                self._cli.app(args=argv, prog_name='git-flow')
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+        except Exception as e:
+            # Let the client run it and report the error itself
+            return {'ok': False, 'error': str(e)}
+        finally:
+            self._cli._gitflow = None
+        return {'ok': True, 'code': code, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+    def gitflow_for(self, cwd: str):
+        """
+        Warm GitFlow for the repository containing cwd, refreshed against the repository on disk
+
+        Raises:
+            GitFlowError: If cwd is not inside a git repository
+        """
+        from .core import GitFlow
+
+        root = self._roots.get(cwd)
+        state = self._repos.pop(root, None) if root else None
+        if state is not None and config_fingerprint(state.gitflow) != state.config_key:
+            state.gitflow.close()
+            state = None
+        if state is None:
+            state = RepoState(GitFlow(cwd))
+            root = self._roots[cwd] = state.gitflow.repo_path
+            if root in self._repos:
+                self._repos.pop(root).gitflow.close()
+        else:
+            refs_key = ref_fingerprint(state.gitflow)
+            if refs_key != state.refs_key:
+                state.gitflow.invalidate()
+                state.refs_key = refs_key
+            # The index and files change without touching any ref
+            state.gitflow._tree_status = None
+
+        # Most recently used last, so the first entry is the one to evict
+        self._repos[root] = state
+        while len(self._repos) > MAX_REPOS:
+            oldest = next(iter(self._repos))
+            self._repos.pop(oldest).gitflow.close()
+        return state.gitflow
@@ -0,0 +1,253 @@
+"""
+Fetch Planner Module
+
+Coalesces the fetches of track and pull into one negotiation per remote.
+Branches are collected first, from a single command or from every track
+and pull in a batch, and fetched with one ``git fetch --stdin`` of explicit
+``+refs/heads/<branch>:refs/remotes/<remote>/<branch>`` refspecs. Branches
+the remote ref listing says are missing are left out, so one vanished
+branch does not fail the whole fetch, and branches already fetched in this
+process or whose tracking ref matches a listing taken in this process are
+not fetched again. A push from this process forgets what was fetched for
+the refs it changed, and branches found missing are looked up again each
+time, so a branch published after an earlier fetch is fetched.
+
+Local branches are then moved to the fetched tips without touching the
+network: branches that are not checked out are created or fast-forwarded
+in one update-ref transaction, and the checked-out branch is merged or
+rebased onto its tracking ref.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from .core import GitFlowError
+from . import trace
+
+# Branch commands whose remote branches are fetched ahead of a batch
+FETCHING_SUBCOMMANDS = ('pull', 'track')
+
+# Branch command groups and the prefix type their names are under
+GROUP_PREFIXES = {
+    'bugfix': 'bugfix',
+    'feature': 'feature',
+    'hotfix': 'hotfix',
+    'release': 'release',
+    'support': 'support',
+}
+
+
+class BranchUpdate:
+    """
+    How one local branch was brought up to date with its remote branch
+
+    Attributes:
+        branch (str): Local branch
+        old (str): SHA before, None if the branch was created
+        new (str): SHA of the remote branch
+        status (str): 'created', 'fast-forward', 'merged', 'rebased', 'up to date' or 'diverged'
+    """
+
+    def __init__(self, branch: str, old: Optional[str], new: str, status: str):
+        self.branch = branch
+        self.old = old
+        self.new = new
+        self.status = status
+
+    @property
+    def ok(self) -> bool:
+        """Whether the local branch now contains the remote branch"""
+        return self.status != 'diverged'
+
+    def describe(self) -> str:
+        """Format the update as 'branch: old -> new (status)'"""
+        old = self.old[:7] if self.old else '(none)'
+        return f"{self.branch}: {old} -> {self.new[:7]} ({self.status})"
+
+
+class FetchPlanner:
+    """
+    Collects remote branches to fetch and fetches them in one call per remote
+
+    Attributes:
+        gitflow (GitFlow): Repository the fetches run in
+        pending (Dict[str, List[str]]): Branches per remote waiting to be fetched
+        fetched (Dict[Tuple[str, str], Optional[str]]): SHA per (remote,
+            branch) fetched by this process, None for branches the remote
+            did not have when last asked
+    """
+
+    def __init__(self, gitflow):
+        self.gitflow = gitflow
+        self.pending: Dict[str, List[str]] = {}
+        self.fetched: Dict[Tuple[str, str], Optional[str]] = {}
+
+    def add(self, remote: str, branches: Iterable[str]):
+        """Queue branches of a remote for the next run(), unless already fetched"""
+        queued = self.pending.setdefault(remote, [])
+        for branch in branches:
+            if branch not in queued and self.fetched.get((remote, branch)) is None:
+                queued.append(branch)
+
+    def forget(self, remote: str, branches: Iterable[str]):
+        """Drop what was fetched for branches a push from this process updated or deleted"""
+        for branch in branches:
+            self.fetched.pop((remote, branch), None)
+
+    def add_command(self, args: List[str], options: Optional[Dict[str, object]] = None) -> bool:
+        """
+        Queue the remote branches a '<group> track|pull ...' command will need
+
+        Returns:
+            bool: Whether the command fetches, so it was queued
+        """
+        if len(args) < 2 or args[1] not in FETCHING_SUBCOMMANDS or args[0] not in GROUP_PREFIXES:
+            return False
+        prefix = self.gitflow.prefix[GROUP_PREFIXES[args[0]]]
+        if args[1] == 'track':
+            names, remote = args[2:3], self.gitflow.origin
+        else:
+            remote, names = (args[2], args[3:4]) if len(args) > 2 else (self.gitflow.origin, [])
+            extra = (options or {}).get('names') or []
+            names = names + (str(extra).split(',') if isinstance(extra, str) else [str(name) for name in extra])
+            names = [name for name in names if name]
+        if not names:
+            current = self.gitflow.get_current_branch()
+            if not current.startswith(prefix):
+                return False
+            self.add(remote, [current])
+        else:
+            self.add(remote, [f"{prefix}{name}" for name in names])
+        return True
+
+    def run(self, prune: bool = False, tags: bool = False) -> Dict[Tuple[str, str], Optional[str]]:
+        """
+        Fetch every queued branch, one git fetch per remote
+
+        Args:
+            prune: Pass --prune and drop the remote-tracking refs of queued
+                branches the remote no longer has
+            tags: Fetch tags pointing into the fetched history, off by default
+
+        Returns:
+            Dict[Tuple[str, str], Optional[str]]: SHA per (remote, branch)
+            fetched by this run, None for branches the remote does not have
+
+        Raises:
+            GitFlowError: If a fetch failed
+        """
+        done = {}
+        while self.pending:
+            remote, branches = self.pending.popitem()
+            if branches:
+                done.update(self._fetch(remote, branches, prune, tags))
+        self.fetched.update(done)
+        if prune:
+            self._prune([key for key, sha in done.items() if sha is None])
+        return done
+
+    def fetch(self, remote: str, branches: List[str], prune: bool = False) -> Dict[str, Optional[str]]:
+        """
+        Fetch branches of a remote unless this process already did
+
+        Returns:
+            Dict[str, Optional[str]]: SHA per branch, None for branches the remote does not have
+        """
+        self.add(remote, branches)
+        self.run(prune=prune)
+        return {branch: self.fetched.get((remote, branch)) for branch in branches}
+
+    def _prune(self, missing: List[Tuple[str, str]]):
+        """Delete the remote-tracking refs of (remote, branch) pairs the remote no longer has"""
+        refs = self.gitflow.refs
+        stale = [(self._tracking(remote, branch), None, refs.get(self._tracking(remote, branch)))
+                 for remote, branch in missing]
+        stale = [update for update in stale if update[2] is not None]
+        if stale:
+            self.gitflow.update_refs_atomic(stale, message="flow: prune remote-tracking refs")
+
+    def _fetch(self, remote: str, branches: List[str], prune: bool,
+               tags: bool) -> Dict[Tuple[str, str], Optional[str]]:
+        """Fetch the branches of one remote that it has and whose tracking refs are behind"""
+        gitflow = self.gitflow
+        listing = gitflow.remote_refs(remote)
+        if not listing.live and any(f"refs/heads/{branch}" not in listing for branch in branches):
+            # A listing from an earlier process may predate the branches asked for
+            listing = gitflow.remote_refs(remote, refresh=True)
+        advertised = {branch: listing.get(f"refs/heads/{branch}") for branch in branches}
+
+        wanted = [branch for branch, sha in advertised.items()
+                  if sha is not None and not (listing.live and gitflow._resolve(self._tracking(remote, branch)) == sha)]
+        if wanted:
+            args = ['fetch', '--stdin', '--tags' if tags else '--no-tags']
+            if prune:
+                args.append('--prune')
+            refspecs = ''.join(f"+refs/heads/{branch}:{self._tracking(remote, branch)}\n" for branch in wanted)
+            with trace.span(f"fetch {len(wanted)} branches from {remote}"):
+                result = gitflow._run_git(args + [remote], input=refspecs)
+            if result.returncode != 0:
+                if listing.live or "couldn't find remote ref" not in result.stderr:
+                    raise GitFlowError(f"Git command failed: {result.stderr}")
+                # Branches deleted since the cached listing: ask the remote and retry once
+                gitflow.remote_refs(remote, refresh=True)
+                return self._fetch(remote, branches, prune, tags)
+
+        refs = gitflow.refs
+        return {(remote, branch): refs.get(self._tracking(remote, branch)) if sha is not None else None
+                for branch, sha in advertised.items()}
+
+    def _tracking(self, remote: str, branch: str) -> str:
+        """Remote-tracking refname of a remote branch"""
+        return f"refs/remotes/{remote}/{branch}"
+
+    def update_branches(self, remote: str, branches: List[str], rebase: bool = False,
+                        prune: bool = False) -> List[BranchUpdate]:
+        """
+        Bring local branches up to date with their fetched remote branches, without network calls
+
+        Branches that do not exist are created at the remote tip and
+        branches that are not checked out anywhere are fast-forwarded, all
+        in one update-ref transaction; a branch that has diverged is left
+        alone and reported. The checked-out branch is merged with its
+        remote branch, or rebased onto it.
+
+        Raises:
+            ValueError: If a branch does not exist on the remote
+            GitFlowError: If the merge or rebase of the checked-out branch failed
+        """
+        gitflow = self.gitflow
+        tips = self.fetch(remote, branches, prune=prune)
+        missing = [branch for branch, sha in tips.items() if sha is None]
+        if missing:
+            raise ValueError(f"Remote branch {', '.join(missing)} does not exist")
+
+        current = gitflow.get_current_branch()
+        output = gitflow._git_command(['for-each-ref', '--format=%(refname:lstrip=2)%00%(worktreepath)']
+                                      + [f"refs/heads/{branch}" for branch in branches])
+        checked_out = {line.split('\0')[0] for line in output.splitlines() if line.split('\0')[1]}
+
+        refs = gitflow.refs
+        updates, changes, merges = [], [], []
+        for branch in branches:
+            old, new = refs.get(f"refs/heads/{branch}"), tips[branch]
+            if old == new or (old is not None and gitflow.is_ancestor(new, old)):
+                updates.append(BranchUpdate(branch, old, old, 'up to date'))
+            elif branch == current:
+                merges.append(BranchUpdate(branch, old, new, 'rebased' if rebase else 'merged'))
+            elif old is None:
+                changes.append((f"refs/heads/{branch}", new, None))
+                updates.append(BranchUpdate(branch, old, new, 'created'))
+            elif branch not in checked_out and gitflow.is_ancestor(old, new):
+                changes.append((f"refs/heads/{branch}", new, old))
+                updates.append(BranchUpdate(branch, old, new, 'fast-forward'))
+            else:
+                updates.append(BranchUpdate(branch, old, new, 'diverged'))
+        if changes:
+            gitflow.update_refs_atomic(changes, message=f"flow: update from {remote}")
+        for update in merges:
+            tracking = self._tracking(remote, update.branch)
+            if gitflow.is_ancestor(update.old, update.new):
+                gitflow._git_command(['merge', '--ff-only', tracking])
+                update.status = 'fast-forward'
+            else:
+                gitflow._git_command(['rebase', tracking] if rebase else ['merge', '--no-edit', tracking])
+            updates.append(update)
+        return updates
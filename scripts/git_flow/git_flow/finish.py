@@ -0,0 +1,207 @@
+"""
+Finish Engine Module
+
+Finishes release and hotfix branches as one ref transaction. The merge
+commits are built with ``git merge-tree --write-tree`` and ``commit-tree``
+and the annotated tag with ``mktag``, none of which move a ref or touch the
+working tree. Only then are all ref changes (main, develop, the tag and the
+branch deletion) applied in a single ``update-ref --stdin`` transaction, so a
+failure at any step leaves the repository exactly as it was. Only a merge
+with conflicts falls back to a checkout of the target, where they can be
+resolved before the finish is run again.
+"""
+
+from typing import List, Optional
+from .core import GitFlowError, MergeConflictError
+from .remote import PushResult, push_refspec
+from . import trace
+
+
+class RefChange:
+    """
+    Planned transition of one ref
+
+    Attributes:
+        refname (str): Full refname
+        old (str): Current SHA, None if the ref does not exist yet
+        new (str): SHA after the change, None if the ref is deleted
+        reason (str): What the change does
+    """
+
+    def __init__(self, refname: str, old: Optional[str], new: Optional[str], reason: str):
+        self.refname = refname
+        self.old = old
+        self.new = new
+        self.reason = reason
+
+    def describe(self) -> str:
+        """Format the change as 'refname: old -> new (reason)'"""
+        old = self.old[:7] if self.old else '(none)'
+        new = self.new[:7] if self.new else '(deleted)'
+        return f"{self.refname}: {old} -> {new} ({self.reason})"
+
+
+class FinishPlan:
+    """
+    Every ref change of one finish, ready to be applied atomically
+
+    Attributes:
+        branch (str): Branch being finished
+        changes (List[RefChange]): Ref changes in application order
+        fallback (str): Branch to check out if the current branch is deleted
+        pushed (List[PushResult]): Per-ref results once the plan was pushed
+    """
+
+    def __init__(self, branch: str, changes: List[RefChange], fallback: str):
+        self.branch = branch
+        self.changes = changes
+        self.fallback = fallback
+        self.pushed: List[PushResult] = []
+
+    def describe(self) -> List[str]:
+        """Get one line per planned ref change"""
+        return [change.describe() for change in self.changes]
+
+
+class FinishEngine:
+    """Plans and applies release/hotfix finishes as one ref transaction"""
+
+    def __init__(self, gitflow):
+        self.gitflow = gitflow
+
+    def plan(self, branch: str, targets: List[str], tag: Optional[str] = None,
+             tag_message: Optional[str] = None, sign: bool = False,
+             signing_key: Optional[str] = None, squash: bool = False,
+             keep: bool = False) -> FinishPlan:
+        """
+        Build merge commits and tag objects for a finish without changing any ref
+
+        Args:
+            branch: Branch to finish
+            targets: Branches to merge it into, in order (e.g. main, develop)
+            tag: Tag to create on the branch tip, None for no tag
+            tag_message: Tag message, defaults to the tag name
+            sign: Whether to sign the tag
+            signing_key: Key to sign the tag with
+            squash: Squash the branch into a single-parent commit on each target
+            keep: Keep the branch instead of deleting it
+
+        Returns:
+            FinishPlan: The ref changes to apply
+
+        Raises:
+            MergeConflictError: If merging into a target has conflicts; no
+                ref was changed
+        """
+        branch_sha = self.gitflow.rev_parse(branch)
+        merged = self.gitflow.contains_many(branch, targets)
+        changes = []
+
+        for target in targets:
+            if merged[target]:
+                continue
+            with trace.span(f"merge into {target}"):
+                target_sha = self.gitflow.rev_parse(target)
+                commit = self.gitflow.merge_commit(branch, target, squash=squash)
+            if commit == target_sha:
+                continue
+            changes.append(RefChange(f"refs/heads/{target}", target_sha, commit,
+                                     f"squash {branch}" if squash else f"merge {branch}"))
+
+        if tag:
+            with trace.span("create tag", tag=tag):
+                if self.gitflow.tag_exists(tag):
+                    raise GitFlowError(f"Tag {tag} already exists")
+                tag_sha = self.gitflow.create_tag_object(tag, branch_sha, tag_message or tag,
+                                                         sign=sign, signing_key=signing_key)
+            changes.append(RefChange(f"refs/tags/{tag}", None, tag_sha, f"tag {branch}"))
+
+        if not keep:
+            changes.append(RefChange(f"refs/heads/{branch}", branch_sha, None, "delete branch"))
+
+        return FinishPlan(branch, changes, targets[0] if targets else self.gitflow.main_branch)
+
+    def finish(self, branch: str, targets: List[str], dry_run: bool = False, **options) -> FinishPlan:
+        """
+        Plan and apply a finish, see plan() for the options
+
+        If a target has conflicts the branch is merged into it in a checkout
+        instead, which stops for the conflicts to be resolved; the finish is
+        then run again and skips the targets that already contain the branch.
+        """
+        with trace.span(f"finish {branch}", dry_run=dry_run):
+            try:
+                plan = self.plan(branch, targets, **options)
+            except MergeConflictError as e:
+                if dry_run:
+                    raise
+                with trace.span(f"merge into {e.target} in a checkout"):
+                    self.gitflow.merge_with_checkout(e.branch, e.target, squash=options.get('squash', False))
+                # git merge resolved it on its own (e.g. with rerere), finish the rest
+                return self.finish(branch, targets, **options)
+            if not dry_run:
+                self.apply(plan)
+            return plan
+
+    def apply(self, plan: FinishPlan):
+        """Apply a plan in one transaction and bring the working tree along
+
+        When the checked-out branch changes, the index and files are
+        updated first: if read-tree refuses (e.g. over an untracked file the
+        merge adds) no ref has moved yet, and if the transaction then fails
+        the working tree is put back, so either way the repository is left
+        as it was.
+        """
+        if not plan.changes:
+            return
+        current = self.gitflow.get_current_branch()
+        moved = {change.refname: change.new for change in plan.changes}
+        refname = f"refs/heads/{current}" if current else None
+        head = new = None
+        if refname in moved:
+            head = self.gitflow.rev_parse('HEAD')
+            new = moved[refname]
+            if new is None:
+                fallback = f"refs/heads/{plan.fallback}"
+                new = moved[fallback] if fallback in moved else self.gitflow.rev_parse(plan.fallback)
+            with trace.span("update working tree"):
+                self.gitflow._git_command(['read-tree', '-m', '-u', head, new])
+
+        try:
+            with trace.span("update refs", refs=len(plan.changes)):
+                self.gitflow.update_refs_atomic([(change.refname, change.new, change.old)
+                                                 for change in plan.changes],
+                                                message=f"flow: finish {plan.branch}")
+        except GitFlowError:
+            if head is not None:
+                self.gitflow._git_command(['read-tree', '-m', '-u', new, head])
+            raise
+        if head is not None and moved[refname] is None:
+            self.gitflow._git_command(['symbolic-ref', 'HEAD', f"refs/heads/{plan.fallback}"])
+
+    def push(self, plan: FinishPlan, remote: str) -> List[PushResult]:
+        """
+        Push the refs an applied plan changed in one atomic push
+
+        Only refs the finish moved, created or deleted are sent, so the new
+        version tag goes out without every other local tag, and the branch
+        is deleted remotely only if it was published.
+
+        Raises:
+            GitFlowError: If the remote rejected the push
+        """
+        refspecs = []
+        for change in plan.changes:
+            if change.new is None:
+                tracking = f"refs/remotes/{remote}/{change.refname[len('refs/heads/'):]}"
+                if tracking not in self.gitflow.refs:
+                    continue
+            refspecs.append(push_refspec(change.refname, change.new))
+        if not refspecs:
+            return []
+        with trace.span(f"push to {remote}", refs=len(refspecs)):
+            plan.pushed = self.gitflow.push_refs(remote, refspecs, atomic=True)
+        rejected = [result.describe() for result in plan.pushed if not result.ok]
+        if rejected or not plan.pushed:
+            raise GitFlowError(f"Push to {remote} was rejected, local finish is kept: " + "; ".join(rejected))
+        return plan.pushed
@@ -0,0 +1,254 @@
+"""
+Commit Graph Module
+
+Pure-Python reader for git's commit-graph file (``objects/info/commit-graph``
+or a split chain under ``objects/info/commit-graphs``). The files are memory
+mapped and parent links and generation numbers are read in place, so
+merge-base and ancestry queries over many branches run in process without
+spawning git. Commits newer than the last ``git commit-graph write`` are not
+covered; callers check ``contains`` and fall back to git for those.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SIGNATURE = b'CGPH'
+HASH_LENGTHS = {1: 20, 2: 32}
+PARENT_NONE = 0x70000000
+PARENT_OCTOPUS = 0x80000000
+EDGE_LAST = 0x80000000
+
+CHUNK_FANOUT = b'OIDF'
+CHUNK_LOOKUP = b'OIDL'
+CHUNK_DATA = b'CDAT'
+CHUNK_EDGES = b'EDGE'
+
+
+class CommitGraphError(Exception):
+    pass
+
+
+class _GraphLayer:
+    """Single commit-graph file, with positions offset by the layers below it"""
+
+    def __init__(self, path: str, offset: int):
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self.data
+        if len(data) < 8 or data[:4] != SIGNATURE or data[4] != 1:
+            raise CommitGraphError(f"Unsupported commit-graph file: {path}")
+        if data[5] not in HASH_LENGTHS:
+            raise CommitGraphError(f"Unsupported commit-graph hash version: {path}")
+        self.hash_len = HASH_LENGTHS[data[5]]
+        self.offset = offset
+
+        chunks = {}
+        for i in range(data[6]):
+            chunk_id, chunk_offset = struct.unpack_from('>4sQ', data, 8 + 12 * i)
+            chunks[chunk_id] = chunk_offset
+        for required in (CHUNK_FANOUT, CHUNK_LOOKUP, CHUNK_DATA):
+            if required not in chunks:
+                raise CommitGraphError(f"Commit-graph is missing {required.decode()} chunk: {path}")
+        self.fanout = struct.unpack_from('>256I', data, chunks[CHUNK_FANOUT])
+        self.count = self.fanout[255]
+        self.lookup_start = chunks[CHUNK_LOOKUP]
+        self.data_start = chunks[CHUNK_DATA]
+        self.edges_start = chunks.get(CHUNK_EDGES)
+
+    def find(self, oid: bytes) -> Optional[int]:
+        """Binary search for a raw object id, returning its local position"""
+        lo = self.fanout[oid[0] - 1] if oid[0] else 0
+        hi = self.fanout[oid[0]]
+        width = self.hash_len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = self.lookup_start + mid * width
+            current = self.data[start:start + width]
+            if current == oid:
+                return mid
+            if current < oid:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+
+class CommitGraph:
+    """
+    Memory-mapped commit-graph, possibly split into a chain of layers
+
+    Commits are addressed by global position: positions in base layers come
+    first, matching how git numbers parents across a split chain.
+    """
+
+    def __init__(self, layers: List[_GraphLayer]):
+        self.layers = layers
+        self.hash_len = layers[0].hash_len
+
+    @classmethod
+    def open(cls, objects_dir: str) -> Optional['CommitGraph']:
+        """Open the commit-graph for an objects directory, None if there is none"""
+        info_dir = os.path.join(objects_dir, 'info')
+        chain_path = os.path.join(info_dir, 'commit-graphs', 'commit-graph-chain')
+        paths = []
+        if os.path.isfile(chain_path):
+            with open(chain_path) as f:
+                paths = [os.path.join(info_dir, 'commit-graphs', f"graph-{line.strip()}.graph")
+                         for line in f if line.strip()]
+        elif os.path.isfile(os.path.join(info_dir, 'commit-graph')):
+            paths = [os.path.join(info_dir, 'commit-graph')]
+        if not paths:
+            return None
+
+        layers = []
+        offset = 0
+        try:
+            for path in paths:
+                layer = _GraphLayer(path, offset)
+                layers.append(layer)
+                offset += layer.count
+        except (OSError, ValueError, struct.error, CommitGraphError):
+            return None
+        if len(set(layer.hash_len for layer in layers)) != 1:
+            return None
+        return cls(layers)
+
+    def _layer(self, pos: int) -> _GraphLayer:
+        for layer in reversed(self.layers):
+            if pos >= layer.offset:
+                return layer
+        raise CommitGraphError(f"Invalid commit-graph position {pos}")
+
+    def position(self, sha: str) -> Optional[int]:
+        """Get global position of a commit, None if it is not in the graph"""
+        try:
+            oid = bytes.fromhex(sha)
+        except ValueError:
+            return None
+        if len(oid) != self.hash_len:
+            return None
+        for layer in self.layers:
+            local = layer.find(oid)
+            if local is not None:
+                return layer.offset + local
+        return None
+
+    def contains(self, shas: List[str]) -> bool:
+        """Check that every commit is covered by the graph"""
+        return all(self.position(sha) is not None for sha in shas)
+
+    def sha(self, pos: int) -> str:
+        """Get hex object id at a global position"""
+        layer = self._layer(pos)
+        start = layer.lookup_start + (pos - layer.offset) * layer.hash_len
+        return layer.data[start:start + layer.hash_len].hex()
+
+    def _record(self, pos: int) -> Tuple[_GraphLayer, int]:
+        layer = self._layer(pos)
+        return layer, layer.data_start + (pos - layer.offset) * (layer.hash_len + 16) + layer.hash_len
+
+    def generation(self, pos: int) -> int:
+        """Get topological level (generation number v1) of a commit"""
+        layer, start = self._record(pos)
+        generation = struct.unpack_from('>I', layer.data, start + 8)[0] >> 2
+        if generation == 0:
+            raise CommitGraphError("Commit-graph was written without generation numbers")
+        return generation
+
+    def parents(self, pos: int) -> List[int]:
+        """Get global positions of a commit's parents"""
+        layer, start = self._record(pos)
+        first, second = struct.unpack_from('>II', layer.data, start)
+        parents = []
+        if first != PARENT_NONE:
+            parents.append(first)
+        if second == PARENT_NONE:
+            return parents
+        if not second & PARENT_OCTOPUS:
+            parents.append(second)
+            return parents
+        if layer.edges_start is None:
+            raise CommitGraphError("Commit-graph is missing EDGE chunk")
+        index = second & ~PARENT_OCTOPUS
+        while True:
+            edge = struct.unpack_from('>I', layer.data, layer.edges_start + 4 * index)[0]
+            parents.append(edge & ~EDGE_LAST)
+            if edge & EDGE_LAST:
+                return parents
+            index += 1
+
+    def paint(self, seeds: Dict[str, int], full: int) -> Iterator[Tuple[str, int]]:
+        """
+        Walk from seed commits in decreasing generation order
+
+        Each commit is yielded once with the union of the seed bits that
+        reach it; decreasing generation guarantees all of a commit's
+        children were yielded before it. The walk stops once every queued
+        commit carries all bits in full and at least one such commit was
+        yielded, since everything below is common to all seeds.
+        """
+        masks = {}
+        heap = []
+        partial = 0
+        for sha, bits in seeds.items():
+            pos = self.position(sha)
+            if pos is None:
+                raise CommitGraphError(f"Commit {sha} is not in the commit-graph")
+            if pos not in masks:
+                heapq.heappush(heap, (-self.generation(pos), pos))
+                masks[pos] = 0
+                partial += 1
+            masks[pos] |= bits
+        partial -= sum(1 for mask in masks.values() if mask == full)
+
+        seen_full = False
+        while heap:
+            if partial == 0 and seen_full:
+                return
+            _, pos = heapq.heappop(heap)
+            mask = masks.pop(pos)
+            if mask == full:
+                seen_full = True
+            else:
+                partial -= 1
+            yield self.sha(pos), mask
+            for parent in self.parents(pos):
+                current = masks.get(parent)
+                if current is None:
+                    heapq.heappush(heap, (-self.generation(parent), parent))
+                    masks[parent] = mask
+                    if mask != full:
+                        partial += 1
+                elif current != full:
+                    masks[parent] = current | mask
+                    if masks[parent] == full:
+                        partial -= 1
+
+    def merge_base(self, sha1: str, sha2: str) -> Optional[str]:
+        """Get a best common ancestor of two commits, None if there is none"""
+        for sha, mask in self.paint({sha1: 1, sha2: 2}, 3):
+            if mask == 3:
+                return sha
+        return None
+
+    def is_ancestor(self, ancestor: str, descendant: str) -> bool:
+        """Check if ancestor is reachable from descendant, pruning by generation"""
+        target = self.position(ancestor)
+        start = self.position(descendant)
+        if target is None or start is None:
+            raise CommitGraphError("Commit is not in the commit-graph")
+        floor = self.generation(target)
+        seen = {start}
+        stack = [start]
+        while stack:
+            pos = stack.pop()
+            if pos == target:
+                return True
+            for parent in self.parents(pos):
+                if parent not in seen and self.generation(parent) >= floor:
+                    seen.add(parent)
+                    stack.append(parent)
+        return False
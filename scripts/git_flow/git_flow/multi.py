@@ -0,0 +1,239 @@
+"""
+Multi-Repository Module
+
+Runs one flow command across many repositories. Repositories come from a
+manifest file and/or glob patterns, and each one is handled in a worker
+process of a bounded pool with its own GitFlow, so wall time grows with
+the number of repositories divided by the number of workers rather than
+with the number of repositories.
+"""
+
+import glob
+import inspect
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Branch command groups that can be run across repositories
+COMMAND_CLASSES = {
+    'bugfix': 'BugfixCommand',
+    'develop': 'DevelopCommand',
+    'feature': 'FeatureCommand',
+    'hotfix': 'HotfixCommand',
+    'main': 'MainCommand',
+    'release': 'ReleaseCommand',
+    'setup': 'SetupCommand',
+    'support': 'SupportCommand',
+    'task': 'TaskCommand',
+}
+
+
+class RepoResult:
+    """
+    Outcome of running a command in one repository
+
+    Attributes:
+        repo (str): Repository path
+        ok (bool): Whether the command succeeded
+        output (str): Text the command produced
+        error (str): Error message if it failed
+        duration (float): Seconds spent in the worker
+        skipped (bool): Whether the command never ran because of fail-fast
+    """
+
+    def __init__(self, repo: str, ok: bool, output: str = '', error: str = '',
+                 duration: float = 0.0, skipped: bool = False):
+        self.repo = repo
+        self.ok = ok
+        self.output = output
+        self.error = error
+        self.duration = duration
+        self.skipped = skipped
+
+
+def load_manifest(path: str) -> List[str]:
+    """
+    Read repository paths or globs from a manifest
+
+    The manifest is YAML holding either a list of entries or a mapping with
+    a 'repos' list; relative entries are resolved against the manifest's
+    directory.
+    """
+    import yaml
+    with open(path) as f:
+        data = yaml.safe_load(f) or []
+    entries = data.get('repos', []) if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        raise ValueError(f"Invalid manifest {path}: expected a list of repositories")
+    base = os.path.dirname(os.path.abspath(path))
+    return [os.path.join(base, str(entry)) for entry in entries]
+
+
+def discover_repos(manifest: Optional[str] = None, patterns: Optional[List[str]] = None) -> List[str]:
+    """Expand manifest entries and glob patterns into git repository roots, in order, without duplicates"""
+    candidates = []
+    if manifest:
+        candidates.extend(load_manifest(manifest))
+    candidates.extend(patterns or [])
+
+    repos = []
+    seen = set()
+    for candidate in candidates:
+        matches = sorted(glob.glob(candidate)) if glob.has_magic(candidate) else [candidate]
+        for match in matches:
+            path = os.path.abspath(match)
+            if path in seen or not os.path.exists(os.path.join(path, '.git')):
+                continue
+            seen.add(path)
+            repos.append(path)
+    return repos
+
+
+def format_output(value) -> str:
+    """Render a command's return value as text"""
+    if value is None:
+        return ''
+    if hasattr(value, 'describe'):
+        # Finish plans describe their ref changes
+        value = value.describe()
+    elif hasattr(value, '__next__'):
+        # Generators such as release notes
+        value = list(value)
+    if isinstance(value, list):
+        lines = []
+        for item in value:
+            if isinstance(item, tuple) and len(item) == 4:
+                branch, _, status, is_current = item
+                lines.append(f"{'* ' if is_current else '  '}{branch} {status}".rstrip())
+            elif hasattr(item, 'describe'):
+                lines.append(item.describe())
+            else:
+                lines.append(str(item))
+        return '\n'.join(lines)
+    return str(value)
+
+
+def parse_options(method: Callable, words: List[str]) -> Tuple[List[str], Dict[str, object]]:
+    """
+    Split command words into positional arguments and keyword options for method
+
+    Options are read the way the CLI reads them: '--dry-run' sets a boolean
+    parameter and '--no-<name>' clears one, while '--bump minor' and
+    '--bump=minor' pass the value of any other parameter. Words after '--'
+    are positional.
+
+    Raises:
+        ValueError: If an option is not a parameter of method, or has no value
+    """
+    parameters = inspect.signature(method).parameters
+    args: List[str] = []
+    options: Dict[str, object] = {}
+    words = iter(words)
+    for word in words:
+        if word == '--':
+            args.extend(words)
+            break
+        if not word.startswith('--'):
+            args.append(word)
+            continue
+        key, has_value, value = word[2:].partition('=')
+        key = key.replace('-', '_')
+        negated = key not in parameters and key.startswith('no_')
+        parameter = parameters.get(key[3:] if negated else key)
+        if parameter is None or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            raise ValueError(f"Unknown option: {word}")
+        if isinstance(parameter.default, bool) or parameter.annotation is bool:
+            flag = value.lower() not in ('0', 'false', 'no') if has_value else True
+            options[parameter.name] = not flag if negated else flag
+        elif negated:
+            raise ValueError(f"Unknown option: {word}")
+        else:
+            if not has_value:
+                value = next(words, None)
+                if value is None:
+                    raise ValueError(f"Option {word} requires a value")
+            options[parameter.name] = value
+    return args, options
+
+
+def run_branch_command(gitflow, args: List[str], options: Optional[Dict[str, object]] = None):
+    """
+    Run '<group> <subcommand> [args...]' through the branch command classes and return its value
+
+    Options among args, such as '--bump minor', are passed as keyword
+    arguments, as are options.
+
+    Raises:
+        ValueError: If args do not name a branch command and subcommand, or an option is unknown
+    """
+    from .commands import branch
+
+    if len(args) < 2 or args[0] not in COMMAND_CLASSES:
+        raise ValueError(f"Unsupported command: {' '.join(args)}")
+    group, subcommand, *rest = args
+    command_class = getattr(branch, COMMAND_CLASSES[group])
+    method = getattr(command_class, subcommand, None)
+    if subcommand.startswith('_') or not callable(method):
+        raise ValueError(f"Unknown subcommand: {group} {subcommand}")
+    bound = getattr(command_class(gitflow), subcommand)
+    rest, parsed = parse_options(bound, rest)
+    return bound(*rest, **parsed, **(options or {}))
+
+
+def run_in_repo(repo: str, args: List[str]) -> RepoResult:
+    """Run '<group> <subcommand> [args...]' in one repository; executed in a worker process"""
+    from .core import GitFlow
+
+    start = time.perf_counter()
+    try:
+        with GitFlow(repo) as gitflow:
+            value = run_branch_command(gitflow, args)
+        return RepoResult(repo, True, output=format_output(value), duration=time.perf_counter() - start)
+    except Exception as e:
+        return RepoResult(repo, False, error=str(e), duration=time.perf_counter() - start)
+
+
+def run_multi(repos: List[str], args: List[str], jobs: Optional[int] = None, fail_fast: bool = False,
+              on_result: Optional[Callable[[RepoResult], None]] = None) -> List[RepoResult]:
+    """
+    Run a command in every repository using a bounded process pool
+
+    Args:
+        repos: Repository paths
+        args: Command to run, e.g. ['feature', 'start', 'login']
+        jobs: Number of worker processes, defaults to the CPU count
+        fail_fast: Stop scheduling repositories after the first failure
+        on_result: Called with each result as soon as it is available
+
+    Returns:
+        List[RepoResult]: Results in the order of repos; repositories that
+        never ran because of fail_fast are marked skipped
+    """
+    results: Dict[str, RepoResult] = {}
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(repos) or 1))
+    queue = iter(repos)
+    failed = False
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Keep at most one repository per worker in flight, so fail-fast
+        # stops scheduling immediately instead of draining a queue
+        pending = {}
+        for repo in queue:
+            pending[pool.submit(run_in_repo, repo, args)] = repo
+            if len(pending) == jobs:
+                break
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                results[pending.pop(future)] = result
+                if on_result:
+                    on_result(result)
+                failed = failed or not result.ok
+                if failed and fail_fast:
+                    continue
+                repo = next(queue, None)
+                if repo is not None:
+                    pending[pool.submit(run_in_repo, repo, args)] = repo
+    return [results.get(repo) or RepoResult(repo, False, error='Skipped after an earlier failure', skipped=True)
+            for repo in repos]
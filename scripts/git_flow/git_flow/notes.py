@@ -0,0 +1,168 @@
+"""
+Release Notes Module
+
+Builds release notes from the history between the previous version tag and
+a release. The log is read as a NUL-delimited stream through a generator,
+so only one commit is held at a time however long the history is, and
+entries are spooled to one temporary file per group until the groups are
+rendered. Merged flow branches are grouped by the type their prefix maps
+to, and commits made directly on the mainline are listed as other changes.
+"""
+
+import re
+import tempfile
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from . import trace
+
+# Subjects of commits that bring a branch in: git merge, squash finishes
+# and pull request merges
+BRANCH_SUBJECT_RES = [
+    re.compile(r"^Merge (?:remote-tracking )?branch '([^']+)'"),
+    re.compile(r"^Squashed commit of branch '([^']+)'"),
+    re.compile(r"^Merge pull request #\d+ from [^/\s]+/(\S+)"),
+]
+
+# Section titles per branch type; other types get their name capitalized
+GROUP_TITLES = {
+    'feature': 'Features',
+    'task': 'Tasks',
+    'bugfix': 'Bug fixes',
+    'support': 'Support',
+    'setup': 'Setup',
+    'other': 'Other changes',
+}
+
+OTHER_GROUP = 'other'
+
+# Merges of these types are bookkeeping (syncing develop with main) or bring
+# in changes that shipped under their own version tag
+SKIPPED_TYPES = ('main', 'develop', 'release', 'hotfix')
+
+FIELD_SEPARATOR = '\x1f'
+
+# Bytes of entries a group keeps in memory before spilling to disk
+SPOOL_SIZE = 65536
+
+
+def iter_commits(gitflow, rev_range: List[str], reverse: bool = False) -> Iterator[Tuple[str, List[str], str]]:
+    """Yield (sha, parents, subject) along the first-parent history of rev_range, oldest first if reverse"""
+    log_format = FIELD_SEPARATOR.join(['%H', '%P', '%s'])
+    args = ['log', '-z', '--first-parent', f'--format={log_format}'] + (['--reverse'] if reverse else [])
+    for record in gitflow._stream_git(args + rev_range + ['--']):
+        if not record:
+            continue
+        sha, parents, subject = record.split(FIELD_SEPARATOR, 2)
+        yield sha, parents.split(), subject
+
+
+def merged_branch(subject: str) -> Optional[str]:
+    """Name of the branch a merge or squash commit brought in, None for other commits"""
+    for pattern in BRANCH_SUBJECT_RES:
+        match = pattern.match(subject)
+        if match:
+            return match.group(1)
+    return None
+
+
+class ReleaseNotes:
+    """Collects and renders release notes between two revisions"""
+
+    def __init__(self, gitflow):
+        self.gitflow = gitflow
+
+    def collect(self, end: str, start: Optional[str] = None) -> Dict[str, IO[str]]:
+        """
+        Group the changes between start (exclusive) and end by branch type
+
+        Entries are written to one spooled temporary file per group as the
+        log streams by, so memory does not grow with the number of
+        commits; only the names of merged branches are kept, so a branch
+        merged more than once is listed once, at its first merge.
+
+        Args:
+            end: Last revision of the release, e.g. the release branch
+            start: Previous release, None to go back to the root commit
+
+        Returns:
+            Dict[str, IO[str]]: Entries per branch type (or 'other'), one
+            per line, oldest first; groups without entries are left out.
+            The files are rewound, and closed by render().
+        """
+        classifier = self.gitflow.classifier
+        groups: Dict[str, IO[str]] = {}
+        seen = set()
+        rev_range = f"{start}..{end}" if start else end
+
+        def add(group: str, entry: str):
+            spool = groups.get(group)
+            if spool is None:
+                spool = groups[group] = tempfile.SpooledTemporaryFile(SPOOL_SIZE, mode='w+', encoding='utf-8')
+            spool.write(f"{entry}\n")
+
+        try:
+            with trace.span("release notes", range=rev_range):
+                for sha, parents, subject in iter_commits(self.gitflow, [rev_range], reverse=True):
+                    branch = merged_branch(subject)
+                    if branch is not None:
+                        branch = branch.split('/', 1)[1] if branch.startswith(f"{self.gitflow.origin}/") else branch
+                        branch_type = classifier.classify(branch)
+                        if branch_type in SKIPPED_TYPES:
+                            continue
+                        if branch_type is not None:
+                            if branch in seen:
+                                continue
+                            seen.add(branch)
+                            prefix = self.gitflow.prefix.get(branch_type, '')
+                            name = branch[len(prefix):] if branch.startswith(prefix) else branch
+                            add(branch_type, f"{name} ({sha[:7]})")
+                            continue
+                    elif len(parents) > 1:
+                        continue
+                    add(OTHER_GROUP, f"{subject} ({sha[:7]})")
+        except Exception:
+            for spool in groups.values():
+                spool.close()
+            raise
+        for spool in groups.values():
+            spool.seek(0)
+        return groups
+
+    def render(self, title: str, groups: Dict[str, IO[str]]) -> Iterator[str]:
+        """Yield markdown lines with one section per group, closing the group files"""
+        try:
+            yield f"## {title}"
+            types = self.gitflow.classifier.types()
+            extra = sorted(group for group in groups if group not in types and group != OTHER_GROUP)
+            for group in types + extra + [OTHER_GROUP]:
+                if group not in groups:
+                    continue
+                yield ''
+                yield f"### {GROUP_TITLES.get(group, group.capitalize())}"
+                for entry in groups[group]:
+                    yield '- ' + entry.rstrip('\n')
+        finally:
+            for spool in groups.values():
+                spool.close()
+
+    def generate(self, version: str, end: Optional[str] = None) -> Iterator[str]:
+        """
+        Yield the notes for version, starting after the previous release tag
+
+        Args:
+            version: Version being released
+            end: Revision the release ends at, defaults to the release
+                branch or, once finished, the version tag
+        """
+        versions = self.gitflow.versions
+        if end is None:
+            branch = f"{self.gitflow.prefix['release']}{version}"
+            tag = versions.tag(version)
+            if self.gitflow.branch_exists(branch):
+                end = branch
+            elif self.gitflow.tag_exists(tag):
+                end = tag
+            else:
+                raise ValueError(f"Neither branch {branch} nor tag {tag} exists")
+        previous = versions.previous(version)
+        start = versions.tag(previous) if previous is not None else None
+        return self.render(version, self.collect(end, start))
@@ -0,0 +1,85 @@
+"""
+Prompt Module
+
+Fast path behind ``git-flow status --prompt``, which shell prompts run on
+every command. It never starts git, constructs GitFlow or imports typer:
+the repository is located the way GitFlow locates it, HEAD is read
+straight from the git directory and the branch is classified with the
+prefixes from the compiled config sidecar Settings keeps, so a warm call
+costs a few stat and read calls.
+"""
+
+import os
+from typing import Optional, Tuple
+
+from .classify import BranchClassifier
+from .repo import find_repo_root, resolve_git_dir
+from .settings import Settings, load_compiled_config
+
+# Branch types printed by name alone, since the name says it all
+SINGLE_BRANCH_TYPES = ('main', 'develop')
+
+SHORT_SHA_LENGTH = 7
+
+
+def read_head(git_dir: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Read HEAD of a git directory
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: (branch, None) when a branch is
+        checked out, (None, sha) when HEAD is detached
+    """
+    with open(os.path.join(git_dir, 'HEAD')) as f:
+        head = f.read().strip()
+    if head.startswith('ref: '):
+        refname = head[5:]
+        return (refname[len('refs/heads/'):] if refname.startswith('refs/heads/') else refname), None
+    return None, head
+
+
+def load_classifier(repo_path: str, git_dir: str) -> BranchClassifier:
+    """Classifier for a repository's configured prefixes, from the compiled sidecar when it is current"""
+    config_path = os.path.join(repo_path, '.git_flow', 'config.yaml')
+    cache_path = os.path.join(git_dir, 'git_flow', 'config.cache')
+    config = load_compiled_config(config_path, cache_path)
+    if config is None:
+        # Parses the YAML, or reuses the sidecar if only the mtime changed,
+        # and records the current mtime in the sidecar for the next prompt
+        config = Settings(config_path, cache_path).config
+    return BranchClassifier.from_config(config)
+
+
+def head_status(path: str = '.') -> Optional[Tuple[str, Optional[str], str]]:
+    """
+    Classify the branch checked out in the repository containing path
+
+    Returns:
+        Optional[Tuple[str, Optional[str], str]]: (branch, branch type, name
+        without the type's prefix); the branch is the short SHA and the
+        type 'detached' when HEAD is detached, and the type is None for a
+        branch no prefix matches. None outside a repository.
+    """
+    repo_path = find_repo_root(path)
+    if repo_path is None:
+        return None
+    git_dir = resolve_git_dir(repo_path)
+    branch, sha = read_head(git_dir)
+    if branch is None:
+        return sha[:SHORT_SHA_LENGTH], 'detached', sha[:SHORT_SHA_LENGTH]
+    classifier = load_classifier(repo_path, git_dir)
+    branch_type = classifier.classify(branch)
+    prefix = classifier.prefixes.get('feature' if branch_type == 'task' else branch_type, '')
+    name = branch[len(prefix):] if prefix and branch.startswith(prefix) else branch
+    return branch, branch_type, name
+
+
+def prompt_status(path: str = '.') -> str:
+    """Compact 'type:name' for the checked-out branch, e.g. 'feature:login'; empty outside a repository"""
+    status = head_status(path)
+    if status is None:
+        return ''
+    branch, branch_type, name = status
+    if branch_type is None or branch_type in SINGLE_BRANCH_TYPES:
+        return branch
+    return f"{branch_type}:{name}"
@@ -0,0 +1,296 @@
+"""
+Ref Index Module
+
+In-memory snapshot of every ref in the repository, loaded once from a single
+``git for-each-ref`` call. Provides O(1) existence checks and ref to SHA
+lookups plus sorted prefix scans, and is patched in place by GitFlow when it
+creates, deletes or moves refs itself.
+"""
+
+import bisect
+import mmap
+import os
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+
+REF_FORMAT = '%(objectname)%00%(symref)%00%(refname)'
+
+# Order in which git resolves a short name (see gitrevisions(7))
+DWIM_RULES = ['{}', 'refs/{}', 'refs/tags/{}', 'refs/heads/{}', 'refs/remotes/{}', 'refs/remotes/{}/HEAD']
+
+# Refs stored per worktree rather than in the common directory
+PER_WORKTREE_REFS = ('refs/bisect/', 'refs/rewritten/', 'refs/worktree/')
+
+HEX_RE = re.compile(r'^(?:[0-9a-f]{40}|[0-9a-f]{64})$')
+PSEUDOREF_RE = re.compile(r'^[A-Z_]*HEAD$')
+MAX_SYMREF_DEPTH = 5
+
+
+class RefIndex:
+    """
+    Snapshot of refs keyed by full refname
+
+    Symbolic refs such as ``refs/remotes/origin/HEAD`` are resolved to the
+    object they point at but are left out of namespace listings, matching
+    what ``git branch -r`` shows without its ``->`` lines.
+    """
+
+    def __init__(self, refs: Dict[str, str], symrefs: Optional[Dict[str, str]] = None):
+        self._refs = dict(refs)
+        self._symrefs = dict(symrefs or {})
+        self._sorted = sorted(self._refs)
+        # Bumped on every patch, so indexes derived from the snapshot know when to rebuild
+        self.generation = 0
+
+    @classmethod
+    def load(cls, git_command: Callable[[List[str]], str]) -> 'RefIndex':
+        """Build an index from one for-each-ref call"""
+        output = git_command(['for-each-ref', f'--format={REF_FORMAT}'])
+        refs = {}
+        symrefs = {}
+        for line in output.splitlines():
+            sha, symref, refname = line.split('\0', 2)
+            refs[refname] = sha
+            if symref:
+                symrefs[refname] = symref
+        return cls(refs, symrefs)
+
+    def __contains__(self, refname: str) -> bool:
+        return refname in self._refs
+
+    def __len__(self) -> int:
+        return len(self._refs)
+
+    def get(self, refname: str) -> Optional[str]:
+        """Get SHA for a full refname"""
+        return self._refs.get(refname)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Resolve a short or full ref name the way git does"""
+        refname = self.full_name(name)
+        return self._refs[refname] if refname is not None else None
+
+    def full_name(self, name: str) -> Optional[str]:
+        """Get the full refname a short name resolves to"""
+        for rule in DWIM_RULES:
+            refname = rule.format(name)
+            if refname in self._refs:
+                return refname
+        return None
+
+    def scan(self, prefix: str) -> List[str]:
+        """Get all refnames starting with prefix, in sorted order"""
+        start = bisect.bisect_left(self._sorted, prefix)
+        result = []
+        for refname in self._sorted[start:]:
+            if not refname.startswith(prefix):
+                break
+            result.append(refname)
+        return result
+
+    def names(self, namespace: str, prefix: str = '') -> List[str]:
+        """Get short names under a namespace such as 'refs/heads/', optionally filtered by prefix"""
+        return [refname[len(namespace):] for refname in self.scan(namespace + prefix)
+                if refname not in self._symrefs]
+
+    def set(self, refname: str, sha: Optional[str]):
+        """Add, move or (with sha=None) remove a ref"""
+        self.generation += 1
+        if sha is None:
+            if self._refs.pop(refname, None) is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, refname)]
+            self._symrefs.pop(refname, None)
+            return
+        if refname not in self._refs:
+            bisect.insort(self._sorted, refname)
+        self._refs[refname] = sha
+
+
+class RefFormatError(ValueError):
+    pass
+
+
+class FileRefReader:
+    """
+    Subprocess-free reader for the files ref backend
+
+    Reads ``HEAD``, loose refs and ``packed-refs`` straight from the git
+    directory. Point lookups binary-search a memory-mapped ``packed-refs``
+    (git keeps it sorted), so a single branch or tag check costs a couple of
+    stat calls rather than a git process. Repositories using reftable or an
+    unexpected layout report ``supported = False`` and callers fall back to
+    git.
+
+    Attributes:
+        git_dir (str): Per-worktree git directory (holds HEAD)
+        common_dir (str): Shared git directory (holds refs and packed-refs)
+        supported (bool): Whether the layout can be read directly
+    """
+
+    def __init__(self, git_dir: str):
+        self.git_dir = git_dir
+        self.common_dir = git_dir
+        commondir_path = os.path.join(git_dir, 'commondir')
+        if os.path.isfile(commondir_path):
+            with open(commondir_path) as f:
+                self.common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+        self.supported = (
+            os.path.isfile(os.path.join(git_dir, 'HEAD'))
+            and os.path.isdir(os.path.join(self.common_dir, 'refs'))
+            and not os.path.exists(os.path.join(self.common_dir, 'reftable'))
+        )
+        self._packed_key = None
+        self._packed = b''
+        self._packed_sorted = True
+        self._packed_refs = None
+
+    def _ref_path(self, refname: str) -> str:
+        """Get on-disk location of a loose ref"""
+        if refname.startswith('refs/') and not refname.startswith(PER_WORKTREE_REFS):
+            return os.path.join(self.common_dir, refname)
+        return os.path.join(self.git_dir, refname)
+
+    def _read_loose(self, refname: str) -> Optional[str]:
+        """Read raw contents of a loose ref, None if there is no such file"""
+        try:
+            with open(self._ref_path(refname), 'rb') as f:
+                return f.read().decode().strip()
+        except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+            return None
+
+    def _load_packed(self):
+        """Map packed-refs into memory, reusing the mapping while the file is unchanged"""
+        path = os.path.join(self.common_dir, 'packed-refs')
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._packed_key = None
+            self._packed = b''
+            self._packed_refs = {}
+            return
+        key = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if key == self._packed_key:
+            return
+        if st.st_size == 0:
+            data = b''
+        else:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header_end = 0
+        self._packed_sorted = False
+        if data[:1] == b'#':
+            header_end = data.find(b'\n') + 1 or len(data)
+            self._packed_sorted = b' sorted' in data[:header_end]
+        self._packed_key = key
+        self._packed = data
+        self._packed_start = header_end
+        self._packed_refs = None if self._packed_sorted else self._parse_packed()
+
+    def _parse_packed(self) -> Dict[str, str]:
+        """Parse every packed-refs record, skipping header and peeled lines"""
+        refs = {}
+        for line in self._packed[self._packed_start:].split(b'\n'):
+            if not line or line[:1] in (b'#', b'^'):
+                continue
+            sha, _, refname = line.partition(b' ')
+            refs[refname.decode()] = sha.decode()
+        return refs
+
+    def _lookup_packed(self, refname: str) -> Optional[str]:
+        """Binary search packed-refs for refname"""
+        self._load_packed()
+        if self._packed_refs is not None:
+            return self._packed_refs.get(refname)
+        data = self._packed
+        target = refname.encode()
+        lo, hi = self._packed_start, len(data)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start = data.rfind(b'\n', lo, mid) + 1 or lo
+            if data[start:start + 1] == b'^':
+                # Peeled lines always follow a record; step back onto it
+                start = data.rfind(b'\n', lo, start - 1) + 1 or lo
+            end = data.find(b'\n', start, hi)
+            if end < 0:
+                end = hi
+            sha, _, name = data[start:end].partition(b' ')
+            if name == target:
+                return sha.decode()
+            if name < target:
+                lo = end + 1
+                while data[lo:lo + 1] == b'^':
+                    lo = data.find(b'\n', lo, hi) + 1 or hi
+            else:
+                hi = start
+        return None
+
+    def read_symref(self, refname: str) -> Optional[str]:
+        """Get the target of a symbolic ref, None if it is not symbolic"""
+        content = self._read_loose(refname)
+        if content and content.startswith('ref: '):
+            return content[5:].strip()
+        return None
+
+    def resolve_ref(self, refname: str) -> Optional[str]:
+        """Resolve a full refname (following symbolic refs) to its SHA"""
+        for _ in range(MAX_SYMREF_DEPTH):
+            content = self._read_loose(refname)
+            if content is None:
+                if not refname.startswith('refs/'):
+                    return None
+                return self._lookup_packed(refname)
+            if content.startswith('ref: '):
+                refname = content[5:].strip()
+                continue
+            sha = content.split(None, 1)[0] if content else ''
+            if not HEX_RE.match(sha):
+                raise RefFormatError(f"Unexpected contents in ref {refname}")
+            return sha
+        raise RefFormatError(f"Symbolic ref loop at {refname}")
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Resolve a short or full ref name the way git does"""
+        for rule in DWIM_RULES:
+            refname = rule.format(name)
+            if rule == '{}' and not (refname.startswith('refs/') or PSEUDOREF_RE.match(refname)):
+                continue
+            sha = self.resolve_ref(refname)
+            if sha is not None:
+                return sha
+        return None
+
+    def read_all(self) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Read every ref, returning (refs, symrefs) keyed by full refname"""
+        self._load_packed()
+        refs = dict(self._packed_refs if self._packed_refs is not None else self._parse_packed())
+        symrefs = {}
+        # Each loose file is opened once; only symbolic refs need a second lookup
+        pending = [(os.path.join(self.common_dir, 'refs'), 'refs/')]
+        while pending:
+            directory, namespace = pending.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    refname = namespace + entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (refname + '/').startswith(PER_WORKTREE_REFS):
+                            pending.append((entry.path, refname + '/'))
+                        continue
+                    if entry.name.endswith('.lock'):
+                        continue
+                    try:
+                        with open(entry.path, 'rb') as f:
+                            content = f.read().decode().strip()
+                    except (FileNotFoundError, IsADirectoryError):
+                        continue
+                    if content.startswith('ref: '):
+                        symrefs[refname] = content[5:].strip()
+                        sha = self.resolve_ref(symrefs[refname])
+                    else:
+                        sha = content.split(None, 1)[0] if content else ''
+                        if not HEX_RE.match(sha):
+                            raise RefFormatError(f"Unexpected contents in ref {refname}")
+                    if sha is None:
+                        refs.pop(refname, None)
+                    else:
+                        refs[refname] = sha
+        return refs, symrefs
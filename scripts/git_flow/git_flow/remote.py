@@ -0,0 +1,170 @@
+"""
+Remote Module
+
+Helpers for talking to remotes in as few round-trips as possible: parsing
+``git push --porcelain`` output into per-ref results so several refs can be
+pushed (atomically) in one call, and caching which flow branches a remote
+has so commands stop trusting possibly stale remote-tracking refs without
+asking the remote every time.
+"""
+
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+# Flags git push --porcelain prints in front of each ref
+PUSH_FLAGS = {
+    ' ': 'fast-forward',
+    '+': 'forced',
+    '-': 'deleted',
+    '*': 'new',
+    '!': 'rejected',
+    '=': 'up to date',
+}
+
+# Seconds a remote ref advertisement is reused before the remote is asked again
+REMOTE_REFS_TTL = 60
+
+REMOTE_REFS_FORMAT = 1
+
+
+class PushResult:
+    """
+    Outcome of pushing one ref
+
+    Attributes:
+        source (str): Local side of the refspec, empty for deletions
+        refname (str): Remote refname that was updated
+        flag (str): One-character status from git push --porcelain
+        summary (str): Summary git printed, e.g. 'abc123..def456' or '[rejected] (fetch first)'
+    """
+
+    def __init__(self, source: str, refname: str, flag: str, summary: str):
+        self.source = source
+        self.refname = refname
+        self.flag = flag
+        self.summary = summary
+
+    @property
+    def ok(self) -> bool:
+        """Whether the remote ref now has the pushed value"""
+        return self.flag != '!'
+
+    @property
+    def status(self) -> str:
+        """Readable status such as 'new', 'deleted' or 'rejected'"""
+        return PUSH_FLAGS.get(self.flag, self.flag)
+
+    def describe(self) -> str:
+        """Format the result as 'refname: status summary'"""
+        return f"{self.refname}: {self.status} {self.summary}".rstrip()
+
+
+def parse_push_porcelain(output: str) -> List[PushResult]:
+    """Parse the per-ref lines of git push --porcelain"""
+    results = []
+    for line in output.splitlines():
+        if len(line) < 2 or line[1] != '\t' or line[0] not in PUSH_FLAGS:
+            continue
+        _, refspec, summary = (line.split('\t', 2) + [''])[:3]
+        source, _, refname = refspec.rpartition(':')
+        results.append(PushResult(source, refname, line[0], summary))
+    return results
+
+
+def push_refspec(refname: str, new: Optional[str]) -> str:
+    """Refspec that pushes a local ref to the same name, or deletes it when new is None"""
+    return f":{refname}" if new is None else f"{refname}:{refname}"
+
+
+def branch_patterns(prefixes: Iterable[str]) -> List[str]:
+    """ls-remote patterns for the branches under the given prefixes, empty for all branches"""
+    prefixes = sorted(set(prefixes))
+    if not prefixes or '' in prefixes:
+        return []
+    return [f"refs/heads/{prefix}*" for prefix in prefixes]
+
+
+def parse_ls_remote(output: str) -> Dict[str, str]:
+    """Parse git ls-remote output into SHA per refname"""
+    refs = {}
+    for line in output.splitlines():
+        sha, _, refname = line.partition('\t')
+        if refname:
+            refs[refname] = sha
+    return refs
+
+
+class RemoteRefs:
+    """
+    Branches one remote advertised under the flow prefixes
+
+    Attributes:
+        remote (str): Remote name
+        patterns (List[str]): ls-remote patterns the refs were listed with, empty for all branches
+        refs (Dict[str, str]): SHA per refname on the remote
+        fetched (float): Time the remote was asked
+        live (bool): Whether this process asked the remote, rather than reading a cache file
+    """
+
+    def __init__(self, remote: str, patterns: List[str], refs: Dict[str, str],
+                 fetched: Optional[float] = None, live: bool = True):
+        self.remote = remote
+        self.patterns = patterns
+        self.refs = refs
+        self.fetched = time.time() if fetched is None else fetched
+        self.live = live
+
+    def __contains__(self, refname: str) -> bool:
+        return refname in self.refs
+
+    def get(self, refname: str) -> Optional[str]:
+        """SHA of a ref on the remote, None if it does not have it"""
+        return self.refs.get(refname)
+
+    def covers(self, refname: str) -> bool:
+        """Whether the listing included refname, so its absence means the remote lacks it"""
+        if not refname.startswith('refs/heads/'):
+            return False
+        return not self.patterns or any(refname.startswith(pattern[:-1]) for pattern in self.patterns)
+
+    def fresh(self, patterns: List[str], ttl: float) -> bool:
+        """Whether the listing can answer for patterns without asking the remote again"""
+        if self.patterns and not set(patterns) <= set(self.patterns):
+            return False
+        return 0 <= time.time() - self.fetched < ttl
+
+    def update(self, refname: str, sha: Optional[str]):
+        """Record a ref this process pushed, None for a deletion"""
+        if sha is None:
+            self.refs.pop(refname, None)
+        elif self.covers(refname):
+            self.refs[refname] = sha
+
+    @classmethod
+    def load(cls, path: str, remote: str) -> Optional['RemoteRefs']:
+        """Read a listing saved by an earlier process, None if there is none"""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if data.get('format') != REMOTE_REFS_FORMAT or data.get('remote') != remote:
+                return None
+            return cls(remote, list(data['patterns']), dict(data['refs']), float(data['fetched']), live=False)
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+    def save(self, path: str):
+        """Write the listing for later processes; a read-only git dir only loses the cache"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                json.dump({'format': REMOTE_REFS_FORMAT, 'remote': self.remote, 'patterns': self.patterns,
+                           'fetched': self.fetched, 'refs': self.refs}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -0,0 +1,31 @@
+"""
+Repository Location Module
+
+Finds the working tree root and git directory of a repository. Kept free
+of subprocess and third-party imports so the prompt fast path can share
+GitFlow's exact lookup without loading the rest of the package.
+"""
+
+import os
+from typing import Optional
+
+
+def find_repo_root(path: str = '.') -> Optional[str]:
+    """Get the nearest directory at or above path that contains .git, None outside a repository"""
+    current_path = os.path.abspath(path)
+    while current_path != os.path.dirname(current_path):
+        if os.path.exists(os.path.join(current_path, '.git')):
+            return current_path
+        current_path = os.path.dirname(current_path)
+    return None
+
+
+def resolve_git_dir(repo_path: str) -> str:
+    """Get the git directory of a working tree, following the gitdir file of linked worktrees"""
+    git_path = os.path.join(repo_path, '.git')
+    if os.path.isfile(git_path):
+        with open(git_path) as f:
+            content = f.read().strip()
+            if content.startswith('gitdir: '):
+                return os.path.abspath(os.path.join(repo_path, content[8:]))
+    return os.path.abspath(git_path)
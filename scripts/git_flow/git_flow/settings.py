@@ -1,6 +1,15 @@
 import os
-import yaml
-from typing import Dict, Any, Optional
+import copy
+import marshal
+import sys
+from typing import Dict, Any, Optional, Tuple
+
+# Bumped whenever the sidecar layout changes
+CACHE_FORMAT = 1
+
+# Compiled configs shared by every Settings in the process:
+# config path -> ((mtime_ns, size), marshalled config)
+_CONFIG_CACHE: Dict[str, Tuple[Tuple[int, int], bytes]] = {}
 
 DEFAULT_CONFIG = {
     'user': {
@@ -16,9 +25,12 @@ DEFAULT_CONFIG = {
         'url': {
             'origin': '',
             'upstream': ''
-        }
+        },
+        'refs_ttl': 60
+    },
+    'config': {
+        'untracked_dirty': False
     },
-    'config': {},
     'branch': {
         'main': {
             'prefix': '',
@@ -143,13 +155,39 @@ DEFAULT_CONFIG = {
     }
 }
 
+def load_compiled_config(config_path: str, cache_path: str) -> Optional[Dict[str, Any]]:
+    """Config from the sidecar Settings wrote, if it was written for the file as it is now
+
+    Trusts the mtime and size recorded in the sidecar instead of hashing
+    the file, so it costs one stat and one small read. Returns None when
+    the sidecar is missing or stale and the config has to be read through
+    Settings, which refreshes the sidecar.
+    """
+    try:
+        st = os.stat(config_path)
+        with open(cache_path, 'rb') as f:
+            header, stat_key, compiled = marshal.load(f)
+        if (header[:3] != (CACHE_FORMAT, tuple(sys.version_info[:2]), os.path.abspath(config_path))
+                or stat_key != (st.st_mtime_ns, st.st_size)):
+            return None
+        return marshal.loads(compiled)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
 class Settings:
     # Make DEFAULT_CONFIG accessible as a class attribute
     DEFAULT_CONFIG = DEFAULT_CONFIG
 
-    def __init__(self, config_path: str):
-        """Initialize Settings with config path"""
+    def __init__(self, config_path: str, cache_path: Optional[str] = None):
+        """Initialize Settings with config path
+
+        Args:
+            config_path: Path of the YAML config file
+            cache_path: Optional path of a compiled sidecar that lets later
+                processes skip YAML parsing while the config is unchanged
+        """
         self.config_path = config_path #self._update_config_extension(config_path)
+        self.cache_path = cache_path
         self.config = self.read_config()
 
     def config_exists(self) -> bool:
@@ -165,7 +203,7 @@ class Settings:
         if os.path.exists(self.config_path):
             raise FileExistsError("Config file already exists")
         
-        config = DEFAULT_CONFIG.copy()
+        config = copy.deepcopy(DEFAULT_CONFIG)
         if initial_values:
             self._deep_update(config, initial_values)
         
@@ -181,25 +219,92 @@ class Settings:
             return False
 
     def read_config(self) -> Dict[str, Any]:
-        """Read the YAML config file"""
+        """Read the YAML config file
+
+        The file is parsed at most once per process while its mtime and size
+        are unchanged; every call returns a fresh copy, so callers may mutate
+        the result.
+        """
         try:
-            if not os.path.exists(self.config_path):
+            try:
+                st = os.stat(self.config_path)
+            except FileNotFoundError:
                 return {}
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            stat_key = (st.st_mtime_ns, st.st_size)
+            cached = _CONFIG_CACHE.get(self.config_path)
+            if cached is not None and cached[0] == stat_key:
+                return marshal.loads(cached[1])
+
+            import hashlib
+            with open(self.config_path, 'rb') as f:
+                raw = f.read()
+            digest = hashlib.sha1(raw).hexdigest()
+            sidecar = self._read_sidecar(digest)
+            if sidecar is not None:
+                sidecar_key, compiled = sidecar
+                if sidecar_key != stat_key:
+                    # Touched but unchanged, e.g. by a checkout: record the new
+                    # mtime so load_compiled_config matches it again
+                    self._write_sidecar(stat_key, digest, compiled)
+            else:
+                import yaml
+                config = yaml.load(raw, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
                 if not self.validate_config(config):
                     raise ValueError("Invalid config structure")
-                return config
+                try:
+                    compiled = marshal.dumps(config)
+                except ValueError:
+                    # Values marshal cannot encode (e.g. YAML timestamps) skip the cache
+                    return config
+                self._write_sidecar(stat_key, digest, compiled)
+            _CONFIG_CACHE[self.config_path] = (stat_key, compiled)
+            return marshal.loads(compiled)
         except Exception as e:
             raise IOError(f"Error reading config: {str(e)}")
 
+    def _sidecar_header(self, digest: str) -> Tuple:
+        """Header identifying config contents and the interpreter that wrote the sidecar"""
+        return (CACHE_FORMAT, tuple(sys.version_info[:2]), os.path.abspath(self.config_path), digest)
+
+    def _read_sidecar(self, digest: str) -> Optional[Tuple[Tuple[int, int], bytes]]:
+        """Get the recorded (mtime_ns, size) and compiled config from the sidecar if it matches the file contents"""
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path, 'rb') as f:
+                header, stat_key, compiled = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if header != self._sidecar_header(digest):
+            return None
+        return stat_key, compiled
+
+    def _write_sidecar(self, stat_key: Tuple[int, int], digest: str, compiled: bytes) -> None:
+        """Store compiled config next to its mtime, size and content hash"""
+        if not self.cache_path:
+            return
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                marshal.dump((self._sidecar_header(digest), stat_key, compiled), f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # The sidecar is only an optimization; a read-only git dir is fine
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
     def write_config(self, config: Dict[str, Any]) -> None:
         """Write the YAML config file"""
         try:
             if not self.validate_config(config):
                 raise ValueError("Invalid config structure")
+            import yaml
             with open(self.config_path, 'w') as f:
                 yaml.safe_dump(config, f, default_flow_style=False, sort_keys=False)
+            _CONFIG_CACHE.pop(self.config_path, None)
         except Exception as e:
             raise IOError(f"Error writing config: {str(e)}")
 
@@ -212,6 +317,7 @@ class Settings:
         """Delete the config file"""
         if os.path.exists(self.config_path):
             os.remove(self.config_path)
+        _CONFIG_CACHE.pop(self.config_path, None)
 
     def _deep_update(self, base: Dict, updates: Dict) -> None:
         """Recursively update nested dictionaries"""
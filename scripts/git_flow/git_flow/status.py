@@ -0,0 +1,216 @@
+"""
+Branch Status Module
+
+Computes merge base and ahead/behind counts for many branches against one
+target (develop or main) in a single graph walk, instead of running
+merge-base and rev-parse for every branch. Shared by the list commands.
+"""
+
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+from .core import GitFlowError
+from .graph import CommitGraphError
+from . import trace
+
+# Status results kept per GitFlow; a long-lived instance (the daemon) reuses
+# them while the tips they were computed from are unchanged
+STATUS_CACHE_SIZE = 32
+
+# Relationship of a branch to its target
+SAME = 'same'
+BEHIND = 'behind'
+AHEAD = 'ahead'
+DIVERGED = 'diverged'
+UNRELATED = 'unrelated'
+
+
+class BranchStatus:
+    """
+    Status of a branch relative to a target branch
+
+    Attributes:
+        branch (str): Branch name
+        sha (str): Branch tip
+        target_sha (str): Target tip
+        base (str): Merge base of branch and target, None if unrelated
+        ahead (int): Commits on branch that are not on target, None if not counted
+        behind (int): Commits on target that are not on branch, None if not counted
+    """
+
+    def __init__(self, branch: str, sha: str, target_sha: str, base: Optional[str],
+                 ahead: Optional[int], behind: Optional[int]):
+        self.branch = branch
+        self.sha = sha
+        self.target_sha = target_sha
+        self.base = base
+        self.ahead = ahead
+        self.behind = behind
+
+    @property
+    def state(self) -> str:
+        """Classify branch as same, behind (may ff), ahead (based on latest), diverged or unrelated"""
+        if self.sha == self.target_sha:
+            return SAME
+        if self.base is None:
+            return UNRELATED
+        if self.base == self.sha:
+            return BEHIND
+        if self.base == self.target_sha:
+            return AHEAD
+        return DIVERGED
+
+
+class BranchStatusEngine:
+    """
+    Batched merge-base and ahead/behind computation
+
+    One ``merge-base --octopus`` call finds a commit common to every tip,
+    then one ``rev-list --topo-order --parents`` walk over the commits above
+    it paints each commit with the set of tips that reach it. Topological
+    order guarantees a commit is painted completely before it is emitted, so
+    the first commit carrying both a branch and the target is their merge
+    base, and ahead/behind counts fall out of the paint masks.
+
+    When a commit-graph covers every tip the same painting runs in process
+    over the memory-mapped graph, ordered by generation number, and no git
+    process is spawned at all.
+    """
+
+    def __init__(self, gitflow):
+        self.gitflow = gitflow
+
+    def compute(self, branches: List[str], target: str, counts: bool = True) -> Dict[str, BranchStatus]:
+        """
+        Compute status of every branch against target
+
+        Args:
+            branches: Branch names or full refnames
+            target: Branch to compare against
+            counts: Whether to count ahead/behind commits. Summing counts
+                costs time proportional to branches times distinct paint
+                masks, so callers that only need ``state`` over thousands of
+                branches should turn it off.
+
+        Returns:
+            Dict[str, BranchStatus]: Status keyed by the names passed in
+        """
+        if not branches:
+            return {}
+        with trace.span(f"branch status against {target}", branches=len(branches)):
+            target_sha, tips, seeds, full = self._seed(branches, target)
+            key = self._cache_key(branches, target_sha, tips, counts)
+            cached = self._cached(key)
+            if cached is not None:
+                return cached
+            common = None
+            painted = self._paint_graph(seeds, full)
+            if painted is None:
+                common, painted = self._paint_git(seeds)
+            return self._remember(key, self._statuses(branches, target_sha, tips, full, painted, common, counts))
+
+    @staticmethod
+    def _cache_key(branches: List[str], target_sha: str, tips: Dict[str, str], counts: bool) -> tuple:
+        """Key statuses by the commits they describe, so a moved ref never hits a stale entry"""
+        return target_sha, counts, tuple((branch, tips[branch]) for branch in branches)
+
+    def _cached(self, key: tuple) -> Optional[Dict[str, BranchStatus]]:
+        """Copy of the statuses computed earlier for key, None if there are none"""
+        cached = self.gitflow._status_cache.get(key)
+        return dict(cached) if cached is not None else None
+
+    def _remember(self, key: tuple, statuses: Dict[str, BranchStatus]) -> Dict[str, BranchStatus]:
+        """Keep statuses for key, evicting the oldest entry when the cache is full"""
+        cache = self.gitflow._status_cache
+        if len(cache) >= STATUS_CACHE_SIZE:
+            del cache[next(iter(cache))]
+        cache[key] = statuses
+        return dict(statuses)
+
+    def _seed(self, branches: List[str], target: str) -> Tuple[str, Dict[str, str], Dict[str, int], int]:
+        """Resolve tips and assign paint bits: bit 0 is the target, bit i+1 is branches[i]"""
+        target_sha = self.gitflow.rev_parse(target)
+        tips = {branch: self.gitflow.rev_parse(branch) for branch in branches}
+        seeds = {target_sha: 1}
+        for i, branch in enumerate(branches):
+            seeds[tips[branch]] = seeds.get(tips[branch], 0) | (2 << i)
+        return target_sha, tips, seeds, (2 << len(branches)) - 1
+
+    def _paint_graph(self, seeds: Dict[str, int], full: int) -> Optional[List[Tuple[str, int]]]:
+        """Paint in process over the commit-graph, None if it does not cover every tip"""
+        graph = self.gitflow.commit_graph
+        if graph is None or not graph.contains(list(seeds)):
+            return None
+        try:
+            return list(graph.paint(seeds, full))
+        except CommitGraphError:
+            return None
+
+    def _statuses(self, branches: List[str], target_sha: str, tips: Dict[str, str], full: int,
+                  painted: List[Tuple[str, int]], common: Optional[str], counts: bool) -> Dict[str, BranchStatus]:
+        """Derive merge bases and ahead/behind counts from painted commits"""
+        unresolved = full & ~1
+        bases = {}
+        masks = Counter()
+        for commit, mask in painted:
+            if counts:
+                masks[mask] += 1
+            if mask & 1:
+                found = mask & unresolved
+                unresolved &= ~found
+                while found:
+                    low = found & -found
+                    bases[low] = commit
+                    found ^= low
+
+        statuses = {}
+        for i, branch in enumerate(branches):
+            bit = 2 << i
+            # Everything below the common commit is reachable from all tips
+            base = bases.get(bit, common)
+            ahead = behind = None
+            if counts:
+                ahead = sum(n for mask, n in masks.items() if mask & bit and not mask & 1)
+                behind = sum(n for mask, n in masks.items() if mask & 1 and not mask & bit)
+            statuses[branch] = BranchStatus(branch, tips[branch], target_sha, base, ahead, behind)
+        return statuses
+
+    def _paint_git(self, seeds: Dict[str, int]) -> Tuple[Optional[str], List[Tuple[str, int]]]:
+        """Paint commits above the octopus merge base using git rev-list"""
+        common = None
+        if len(seeds) > 1:
+            try:
+                common = self.gitflow._git_command(['merge-base', '--octopus'] + list(seeds)).strip() or None
+            except GitFlowError:
+                common = None
+
+        args = ['rev-list', '--topo-order', '--parents', '--stdin']
+        revs = list(seeds) + ([f"^{common}"] if common else [])
+        output = self.gitflow._git_command(args, input='\n'.join(revs) + '\n')
+        return common, list(self._masks(output, seeds))
+
+    def _masks(self, output: str, seeds: Dict[str, int]) -> Iterator[Tuple[str, int]]:
+        """Propagate seed bits down rev-list --parents output"""
+        pending = dict(seeds)
+        for line in output.splitlines():
+            commit, *parents = line.split()
+            mask = pending.pop(commit, 0)
+            yield commit, mask
+            for parent in parents:
+                pending[parent] = pending.get(parent, 0) | mask
+
+    def describe(self, shas: List[str], tags: bool = True) -> Dict[str, str]:
+        """Name commits by nearest tag (when tags is set), falling back to short SHA"""
+        shas = sorted(set(sha for sha in shas if sha))
+        if not shas:
+            return {}
+        names = {}
+        if tags:
+            output = self.gitflow._git_command(['name-rev', '--tags', '--name-only'] + shas)
+            for sha, name in zip(shas, output.splitlines()):
+                if name and name != 'undefined':
+                    names[sha] = name
+        missing = [sha for sha in shas if sha not in names]
+        if missing:
+            output = self.gitflow._git_command(['log', '--no-walk=unsorted', '--format=%H %h'] + missing)
+            names.update(line.split() for line in output.splitlines())
+        return names
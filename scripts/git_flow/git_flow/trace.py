@@ -0,0 +1,236 @@
+"""
+Trace Module
+
+Records every git invocation (argv, wall time, exit code and output sizes)
+and nests it under named spans for flow steps such as "merge into main".
+The current span lives in a context variable, so nesting follows the call
+stack and stays separate per thread and asyncio task. Nothing is recorded
+until a Tracer is installed with enable(); until then span() and
+record_git() return after one global lookup.
+"""
+
+import json
+import math
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple, Union
+
+_tracer: Optional['Tracer'] = None
+_current_span: ContextVar[Optional['Span']] = ContextVar('git_flow_span', default=None)
+
+
+class Span:
+    """
+    Named step of a flow command
+
+    Attributes:
+        name (str): Step name, e.g. 'merge into main'
+        parent (Optional[Span]): Enclosing span
+        start (float): perf_counter() when the span was entered
+        end (Optional[float]): perf_counter() when it was left
+        lane (int): Thread or task the span ran on
+        args (Dict[str, str]): Extra details shown in the trace viewer
+    """
+
+    def __init__(self, name: str, parent: Optional['Span'], start: float, lane: int,
+                 args: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.parent = parent
+        self.start = start
+        self.end: Optional[float] = None
+        self.lane = lane
+        self.args = args or {}
+
+    @property
+    def path(self) -> str:
+        """Names of the enclosing spans and this one, joined by ' > '"""
+        return f"{self.parent.path} > {self.name}" if self.parent else self.name
+
+
+class GitCall:
+    """
+    One git invocation
+
+    Attributes:
+        args (List[str]): Arguments after 'git'
+        start (float): perf_counter() when git was started
+        duration (float): Wall time in seconds
+        returncode (int): Exit code
+        stdout_bytes (int): Size of the output
+        stderr_bytes (int): Size of the error output
+        span (Optional[Span]): Span the call was made in
+        lane (int): Thread or task the call ran on
+    """
+
+    def __init__(self, args: List[str], start: float, duration: float, returncode: int,
+                 stdout_bytes: int, stderr_bytes: int, span: Optional[Span], lane: int):
+        self.args = args
+        self.start = start
+        self.duration = duration
+        self.returncode = returncode
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+        self.span = span
+        self.lane = lane
+
+    @property
+    def subcommand(self) -> str:
+        """Git subcommand, skipping global options such as -c key=value"""
+        args = iter(self.args)
+        for arg in args:
+            if arg in ('-c', '-C'):
+                next(args, None)
+            elif not arg.startswith('-'):
+                return arg
+        return '(none)'
+
+
+class Tracer:
+    """Collects spans and git calls for one process"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self.calls: List[GitCall] = []
+        self._lock = threading.Lock()
+
+    def summary(self) -> List[Tuple[str, int, float, float, int]]:
+        """
+        Aggregate git calls per subcommand
+
+        Returns:
+            List of (subcommand, calls, total seconds, p95 seconds, stdout bytes),
+            slowest total first
+        """
+        groups: Dict[str, List[GitCall]] = {}
+        for call in self.calls:
+            groups.setdefault(call.subcommand, []).append(call)
+        rows = []
+        for subcommand, calls in groups.items():
+            durations = sorted(call.duration for call in calls)
+            p95 = durations[max(0, math.ceil(0.95 * len(durations)) - 1)]
+            rows.append((subcommand, len(calls), sum(durations), p95,
+                         sum(call.stdout_bytes for call in calls)))
+        return sorted(rows, key=lambda row: row[2], reverse=True)
+
+    def format_summary(self) -> List[str]:
+        """Summary as table lines, ending with the wall time since tracing started"""
+        lines = [f"{'git subcommand':<22}{'calls':>7}{'total ms':>11}{'p95 ms':>10}{'stdout KiB':>12}"]
+        for subcommand, calls, total, p95, stdout_bytes in self.summary():
+            lines.append(f"{subcommand:<22}{calls:>7}{total * 1000:>11.1f}{p95 * 1000:>10.1f}"
+                         f"{stdout_bytes / 1024:>12.1f}")
+        git_total = sum(call.duration for call in self.calls)
+        lines.append(f"{len(self.calls)} git calls, {git_total * 1000:.1f} ms in git, "
+                     f"{(time.perf_counter() - self.origin) * 1000:.1f} ms wall")
+        return lines
+
+    def chrome_trace(self) -> Dict[str, object]:
+        """Spans and git calls in the Chrome trace event format, which Perfetto also reads"""
+        pid = os.getpid()
+        lanes: Dict[int, int] = {}
+        events = []
+
+        def event(name: str, category: str, start: float, duration: float, lane: int, args: Dict[str, object]):
+            events.append({
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': round((start - self.origin) * 1e6, 3),
+                'dur': round(duration * 1e6, 3),
+                'pid': pid,
+                'tid': lanes.setdefault(lane, len(lanes) + 1),
+                'args': args,
+            })
+
+        now = time.perf_counter()
+        for span in self.spans:
+            event(span.name, 'flow', span.start, (span.end or now) - span.start, span.lane, dict(span.args))
+        for call in self.calls:
+            event(f"git {call.subcommand}", 'git', call.start, call.duration, call.lane, {
+                'argv': ['git'] + call.args,
+                'exit_code': call.returncode,
+                'stdout_bytes': call.stdout_bytes,
+                'stderr_bytes': call.stderr_bytes,
+                'span': call.span.path if call.span else None,
+            })
+        events.sort(key=lambda e: (e['ts'], -e['dur']))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path: str):
+        """Write the Chrome trace JSON to path"""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def enable() -> Tracer:
+    """Start recording into a new Tracer and return it"""
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def disable() -> Optional[Tracer]:
+    """Stop recording and return the Tracer that was active"""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def active() -> Optional[Tracer]:
+    """Tracer currently recording, None when tracing is off"""
+    return _tracer
+
+
+def _lane() -> int:
+    """Identify the current asyncio task, or the thread outside of one"""
+    # Only look for a task if asyncio is in use; importing it costs startup time
+    asyncio = sys.modules.get('asyncio')
+    try:
+        task = asyncio.current_task() if asyncio is not None else None
+    except RuntimeError:
+        task = None
+    return id(task) if task is not None else threading.get_ident()
+
+
+@contextmanager
+def span(name: str, **args):
+    """Run the body as a named step nested in the current one"""
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    current = Span(name, _current_span.get(), time.perf_counter(), _lane(),
+                   {key: str(value) for key, value in args.items()})
+    with tracer._lock:
+        tracer.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    finally:
+        current.end = time.perf_counter()
+        _current_span.reset(token)
+
+
+def _size(output: Union[str, bytes, int, None]) -> int:
+    """Byte size of captured output given as text, bytes or an already counted size"""
+    if output is None:
+        return 0
+    if isinstance(output, int):
+        return output
+    return len(output.encode(errors='replace')) if isinstance(output, str) else len(output)
+
+
+def record_git(args: List[str], start: float, returncode: int,
+               stdout: Union[str, bytes, int, None] = None, stderr: Union[str, bytes, int, None] = None):
+    """Record a git call that started at perf_counter() value start and has just finished"""
+    tracer = _tracer
+    if tracer is None:
+        return
+    call = GitCall(list(args), start, time.perf_counter() - start, returncode,
+                   _size(stdout), _size(stderr), _current_span.get(), _lane())
+    with tracer._lock:
+        tracer.calls.append(call)
@@ -0,0 +1,154 @@
+"""
+Version Index Module
+
+Parses every version tag (``branch.version.prefix`` followed by a semantic
+version) once into a list sorted by semver precedence. The latest release,
+the next version for a bump and whether a version is already tagged are
+then answered by bisecting that list instead of scanning all tags.
+"""
+
+import bisect
+import re
+from typing import List, Optional, Tuple
+
+# MAJOR[.MINOR[.PATCH]][-PRERELEASE][+BUILD]; missing components count as 0.
+# Unanchored at the start so match(tag, pos) can skip the tag prefix
+VERSION_RE = re.compile(
+    r'(0|[1-9]\d*)(?:\.(0|[1-9]\d*))?(?:\.(0|[1-9]\d*))?'
+    r'(?:-([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?(?:\+([0-9A-Za-z-]+(?:\.[0-9A-Za-z-]+)*))?$'
+)
+
+BUMP_PARTS = ('major', 'minor', 'patch')
+
+
+class Version:
+    """
+    Semantic version parsed from a tag
+
+    Attributes:
+        text (str): Version as written in the tag, without the prefix
+        major (int): Major version
+        minor (int): Minor version
+        patch (int): Patch version
+        prerelease (Tuple[str, ...]): Pre-release identifiers, empty for a release
+        width (int): Number of numeric components the version was written with
+        key (tuple): Sort key following semver precedence
+    """
+
+    def __init__(self, text: str, major: int, minor: int = 0, patch: int = 0,
+                 prerelease: Tuple[str, ...] = (), width: int = 3):
+        self.text = text
+        self.major = major
+        self.minor = minor
+        self.patch = patch
+        self.prerelease = prerelease
+        self.width = width
+        self.key = version_key(major, minor, patch, prerelease)
+
+    @classmethod
+    def parse(cls, text: str) -> Optional['Version']:
+        """Parse a version string, None if it is not a semantic version"""
+        match = VERSION_RE.match(text)
+        if match is None:
+            return None
+        major, minor, patch, prerelease, _ = match.groups()
+        width = 3 if patch is not None else 2 if minor is not None else 1
+        return cls(text, int(major), int(minor or 0), int(patch or 0),
+                   tuple(prerelease.split('.')) if prerelease else (), width)
+
+    def bump(self, part: str) -> 'Version':
+        """Next release after this one, keeping the number of components where possible"""
+        if part == 'major':
+            numbers = (self.major + 1, 0, 0)
+        elif part == 'minor':
+            numbers = (self.major, self.minor + 1, 0)
+        elif part == 'patch':
+            numbers = (self.major, self.minor, self.patch + 1)
+        else:
+            raise ValueError(f"Invalid bump: {part} (expected one of {', '.join(BUMP_PARTS)})")
+        width = max(self.width, BUMP_PARTS.index(part) + 1)
+        return Version('.'.join(str(n) for n in numbers[:width]), *numbers, width=width)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def version_key(major: int, minor: int, patch: int, prerelease: Tuple[str, ...] = ()) -> tuple:
+    """Sort key following semver precedence; build metadata is ignored"""
+    if not prerelease:
+        return (major, minor, patch, 1, ())
+    # Numeric identifiers sort numerically and before alphanumeric ones
+    return (major, minor, patch, 0, tuple((0, int(part), '') if part.isdigit() else (1, 0, part)
+                                          for part in prerelease))
+
+
+class VersionIndex:
+    """
+    Version tags sorted by semver precedence
+
+    Attributes:
+        prefix (str): Tag prefix the versions were parsed from
+    """
+
+    def __init__(self, tags: List[str], prefix: str = ''):
+        self.prefix = prefix
+        # Only keys and tag texts are kept; Version objects are built for results
+        entries = []
+        start = len(prefix)
+        for tag in tags:
+            match = VERSION_RE.match(tag, start) if tag.startswith(prefix) else None
+            if match is not None:
+                major, minor, patch, prerelease, _ = match.groups()
+                key = version_key(int(major), int(minor or 0), int(patch or 0),
+                                  tuple(prerelease.split('.')) if prerelease else ())
+                entries.append((key, tag[start:]))
+        entries.sort()
+        self._keys = [key for key, _ in entries]
+        self._texts = [text for _, text in entries]
+        # Position of the latest release, skipping newer pre-releases
+        self._latest = next((i for i in range(len(entries) - 1, -1, -1) if entries[i][0][3]), None)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, text: str) -> bool:
+        return self.find(text) is not None
+
+    def find(self, text: str) -> Optional[Version]:
+        """Get the tagged version equal to text by semver precedence (1.0 matches 1.0.0)"""
+        version = Version.parse(text)
+        if version is None:
+            return None
+        i = bisect.bisect_left(self._keys, version.key)
+        return Version.parse(self._texts[i]) if i < len(self._keys) and self._keys[i] == version.key else None
+
+    def latest(self, prerelease: bool = False) -> Optional[Version]:
+        """Get the highest version, only counting releases unless prerelease is set"""
+        i = len(self._keys) - 1 if prerelease else self._latest
+        return Version.parse(self._texts[i]) if i is not None and i >= 0 else None
+
+    def previous(self, text: str) -> Optional[Version]:
+        """Get the highest release below text, skipping pre-releases"""
+        version = Version.parse(text)
+        if version is None:
+            raise ValueError(f"Invalid version: {text}")
+        i = bisect.bisect_left(self._keys, version.key) - 1
+        while i >= 0 and not self._keys[i][3]:
+            i -= 1
+        return Version.parse(self._texts[i]) if i >= 0 else None
+
+    def newer(self, text: str) -> List[Version]:
+        """Get every tagged version above text, lowest first"""
+        version = Version.parse(text)
+        if version is None:
+            raise ValueError(f"Invalid version: {text}")
+        return [Version.parse(text) for text in self._texts[bisect.bisect_right(self._keys, version.key):]]
+
+    def next(self, part: str) -> Version:
+        """Next version after the latest release, bumping 0.0.0 if nothing is tagged yet"""
+        latest = self.latest() or Version('0.0.0', 0, 0, 0)
+        return latest.bump(part)
+
+    def tag(self, version: str) -> str:
+        """Tag name for a version"""
+        return f"{self.prefix}{version}"
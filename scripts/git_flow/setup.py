@@ -6,9 +6,9 @@ setup(
     packages=find_packages(),
     entry_points={
         'console_scripts': [
-            'git-flow=git_flow.cli:main',
+            'git-flow=git_flow.__main__:main',
         ],
     },
     install_requires=[],
-    python_requires='>=3.6',
+    python_requires='>=3.7',
 )
@@ -0,0 +1,74 @@
+"""
+Shared fixtures: throwaway repositories built with plain git
+
+``repo`` is a working repository with main, develop and the default flow
+config; ``origin`` is a bare repository added to it as the ``origin``
+remote, standing in for the real server.
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git_flow.settings import Settings  # noqa: E402
+
+
+def git(repo: str, *args: str, input: str = None) -> str:
+    """Run git in repo and return its stripped output"""
+    return subprocess.run(['git'] + list(args), cwd=repo, check=True, capture_output=True,
+                          text=True, input=input).stdout.strip()
+
+
+def commit(repo: str, path: str, content: str, message: str = None) -> str:
+    """Write a file, commit it on the current branch and return the commit"""
+    with open(os.path.join(repo, path), 'w') as f:
+        f.write(content)
+    git(repo, 'add', path)
+    git(repo, 'commit', '-q', '-m', message or f"Update {path}")
+    return git(repo, 'rev-parse', 'HEAD')
+
+
+@pytest.fixture(autouse=True)
+def git_environment(tmp_path, monkeypatch):
+    """Isolate git from the user's configuration and the flow daemon"""
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    monkeypatch.setenv('GIT_FLOW_NO_DAEMON', '1')
+    for variable in ('GIT_AUTHOR_NAME', 'GIT_COMMITTER_NAME'):
+        monkeypatch.setenv(variable, 'Flow Test')
+    for variable in ('GIT_AUTHOR_EMAIL', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.setenv(variable, 'flow@example.com')
+
+
+def init_repo(path: str) -> str:
+    """Create a repository with main, develop checked out and the default flow config"""
+    os.makedirs(path)
+    git(path, 'init', '-q', '-b', 'main')
+    commit(path, 'README', 'flow\n', 'Initial commit')
+    git(path, 'checkout', '-q', '-b', 'develop')
+    Settings(os.path.join(path, '.git_flow', 'config.yaml')).create_config()
+    with open(os.path.join(path, '.git', 'info', 'exclude'), 'a') as f:
+        f.write('.git_flow\n')
+    return path
+
+
+@pytest.fixture
+def repo(tmp_path) -> str:
+    """Repository with main, develop checked out and the default flow config"""
+    return init_repo(str(tmp_path / 'repo'))
+
+
+@pytest.fixture
+def origin(tmp_path, repo) -> str:
+    """Bare repository set up as repo's origin, holding main and develop"""
+    path = str(tmp_path / 'origin.git')
+    git(str(tmp_path), 'init', '-q', '--bare', path)
+    git(repo, 'remote', 'add', 'origin', path)
+    git(repo, 'push', '-q', 'origin', 'main', 'develop')
+    return path
@@ -0,0 +1,77 @@
+"""
+Memoized ancestry checks behind the merged checks and start base validation
+"""
+
+import pytest
+
+from conftest import commit, git
+from git_flow.commands.branch import HotfixCommand, SupportCommand
+from git_flow.core import GitFlow
+
+
+@pytest.fixture
+def git_calls(monkeypatch):
+    """Subcommands of every git process spawned through any GitFlow during the test"""
+    calls = []
+    run_git = GitFlow._run_git
+
+    def recording(self, args, input=None):
+        calls.append(args[0])
+        return run_git(self, args, input=input)
+
+    monkeypatch.setattr(GitFlow, '_run_git', recording)
+    return calls
+
+
+@pytest.fixture
+def history(repo) -> dict:
+    """develop two commits ahead of main, and a feature branch off its first commit"""
+    first = commit(repo, 'one.txt', 'one\n')
+    git(repo, 'branch', 'feature-side')
+    second = commit(repo, 'two.txt', 'two\n')
+    return {'main': git(repo, 'rev-parse', 'main'), 'first': first, 'second': second}
+
+
+def test_is_ancestor_is_answered_once_per_commit_pair(repo, history, git_calls):
+    gitflow = GitFlow(repo)
+
+    assert gitflow.is_ancestor('main', 'develop')
+    assert not gitflow.is_ancestor('develop', 'main')
+    assert gitflow.is_ancestor('feature-side', 'feature-side')
+    assert git_calls.count('merge-base') == 2
+
+    # Same commits under other names hit the memo
+    assert gitflow.is_ancestor(history['main'], history['second'])
+    assert gitflow.is_branch_merged_into('feature-side', 'develop')
+    assert not gitflow.is_branch_merged_into('develop', 'feature-side')
+    assert not gitflow.is_branch_merged_into('feature-missing', 'develop')
+    assert git_calls.count('merge-base') == 4
+
+
+def test_contains_many_uses_one_for_each_ref(repo, history, git_calls):
+    gitflow = GitFlow(repo)
+
+    contained = gitflow.contains_many(history['first'], ['main', 'develop', 'feature-side', history['second']])
+
+    assert contained == {'main': False, 'develop': True, 'feature-side': True, history['second']: True}
+    # Refs go to for-each-ref together; only the bare commit needs its own check
+    assert (git_calls.count('for-each-ref'), git_calls.count('merge-base')) == (1, 1)
+    # Answers are shared with is_ancestor, in both directions of the API
+    assert not gitflow.is_ancestor(history['first'], 'main')
+    assert gitflow.contains_many(history['first'], ['develop']) == {'develop': True}
+    assert (git_calls.count('for-each-ref'), git_calls.count('merge-base')) == (1, 1)
+
+
+def test_start_requires_a_base_on_main(repo, history):
+    gitflow = GitFlow(repo)
+
+    with pytest.raises(ValueError, match='Base develop is not a valid commit on main'):
+        HotfixCommand(gitflow).start('1.0.1', base='develop')
+    with pytest.raises(ValueError, match='Base develop is not a valid commit on main'):
+        SupportCommand(gitflow).start('1.x', 'develop')
+
+    git(repo, 'checkout', '-q', 'main')
+    commit(repo, 'fix.txt', 'fix\n')
+    # Any commit on main, not only its tip
+    assert HotfixCommand(gitflow).start('1.0.1', base=history['main']) == '1.0.1'
+    assert git(repo, 'rev-parse', 'HEAD') == history['main']
@@ -0,0 +1,138 @@
+"""
+Persistent cat-file --batch-command backend
+"""
+
+import hashlib
+import itertools
+import subprocess
+
+import pytest
+
+from conftest import commit, git
+from git_flow import backend
+from git_flow.backend import GitBackend, GitBackendError
+from git_flow.core import GitFlow
+
+
+@pytest.fixture
+def worker(repo):
+    worker = GitBackend(repo)
+    yield worker
+    worker.close()
+
+
+def test_resolves_refs_and_revision_syntax(repo, worker):
+    head = git(repo, 'rev-parse', 'HEAD')
+    second = commit(repo, 'second.txt', 'two\n')
+    git(repo, 'tag', '-a', '-m', 'v1', 'v1.0', head)
+
+    assert worker.resolve('develop') == second
+    assert worker.resolve('refs/heads/main') == head
+    assert worker.resolve('HEAD~1') == head
+    assert worker.resolve(second[:7]) == second
+    assert worker.resolve('v1.0^{commit}') == head
+    assert worker.resolve('v1.0') == git(repo, 'rev-parse', 'v1.0')
+
+
+def test_missing_revisions_resolve_to_none(repo, worker):
+    assert worker.resolve('no-such-branch') is None
+    assert worker.resolve('develop~99') is None
+    assert worker.resolve('0' * 40) is None
+    # Still answering after misses
+    assert worker.resolve('main') == git(repo, 'rev-parse', 'main')
+
+
+def test_invalid_revisions_never_reach_the_worker(worker):
+    assert worker.resolve('') is None
+    assert worker.resolve('main\ninfo HEAD') is None
+    assert worker._process is None
+
+
+def _blobs_sharing_a_prefix(length: int = 4):
+    """Two blob contents whose object names start with the same hex digits"""
+    seen = {}
+    for i in itertools.count():
+        content = f"blob {i}\n".encode()
+        sha = hashlib.sha1(b"blob %d\0" % len(content) + content).hexdigest()
+        if sha[:length] in seen:
+            return seen[sha[:length]], content, sha[:length]
+        seen[sha[:length]] = content
+
+
+def test_ambiguous_abbreviation_resolves_to_none(repo, worker):
+    first, second, prefix = _blobs_sharing_a_prefix()
+    for content in (first, second):
+        subprocess.run(['git', 'hash-object', '-w', '--stdin'], cwd=repo, input=content,
+                       check=True, capture_output=True)
+
+    assert worker.resolve(prefix) is None
+    assert worker.resolve('develop') == git(repo, 'rev-parse', 'develop')
+
+
+def test_request_parses_the_info_header(repo, worker):
+    sha = git(repo, 'rev-parse', 'HEAD')
+    assert worker._request('info HEAD') == [sha, 'commit', git(repo, 'cat-file', '-s', sha)]
+    assert worker._request('info nope') == ['nope', 'missing']
+
+
+def test_worker_is_started_once_and_reused(repo, worker):
+    worker.resolve('main')
+    process = worker._process
+    worker.resolve('develop')
+    assert worker._process is process
+
+
+def test_exited_worker_is_restarted_before_the_next_request(repo, worker):
+    worker.resolve('main')
+    process = worker._process
+    process.kill()
+    process.wait()
+
+    assert worker.resolve('develop') == git(repo, 'rev-parse', 'develop')
+    assert worker._process is not process
+
+
+def test_worker_dying_mid_request_is_restarted(repo, worker):
+    worker.resolve('main')
+    process = worker._process
+    process.kill()
+    process.wait()
+    # Not noticed as exited yet, so the request itself hits the closed pipes
+    process.poll = lambda: None
+
+    with pytest.raises(GitBackendError, match='terminated unexpectedly'):
+        worker.resolve('main')
+    assert worker.available
+    assert worker._process is None
+    assert worker.resolve('develop') == git(repo, 'rev-parse', 'develop')
+
+
+def test_gitflow_survives_a_dead_worker(repo):
+    with GitFlow(repo) as gitflow:
+        gitflow._backend.resolve('main')
+        gitflow._backend._process.kill()
+        assert gitflow._resolve_object('develop~0') == git(repo, 'rev-parse', 'develop')
+        assert gitflow._resolve_object('develop~0') == git(repo, 'rev-parse', 'develop')
+
+
+def test_git_without_batch_command_disables_the_backend(repo, worker, monkeypatch):
+    popen = subprocess.Popen
+
+    def old_git(args, **kwargs):
+        # What git < 2.36 does with an unknown cat-file option: usage and exit 129
+        return popen([arg if arg != '--batch-command' else '--no-such-option' for arg in args], **kwargs)
+
+    monkeypatch.setattr(backend.subprocess, 'Popen', old_git)
+
+    with pytest.raises(GitBackendError):
+        worker.resolve('main')
+    assert not worker.available
+    with pytest.raises(GitBackendError, match='not available'):
+        worker.resolve('main')
+
+
+def test_gitflow_falls_back_to_rev_parse(repo):
+    with GitFlow(repo) as gitflow:
+        gitflow._backend.available = False
+        assert gitflow._resolve_object('develop') == git(repo, 'rev-parse', 'develop')
+        assert gitflow._resolve_object('no-such-branch') is None
@@ -0,0 +1,94 @@
+"""
+Batch mode: parsing, shared prefetch and the atomic checkpoint
+"""
+
+import os
+
+import pytest
+
+from conftest import commit, git
+from git_flow.batch import parse_line, run_batch
+from git_flow.core import GitFlow, GitFlowError
+
+
+def batch(lines):
+    return [parse_line(text, number) for number, text in enumerate(lines, 1)]
+
+
+def test_parse_line_accepts_text_and_json():
+    text = parse_line('git-flow branch release start --bump=minor --dry-run', 3)
+    assert (text.line, text.args, text.options) == (3, ['release', 'start'], {'bump': 'minor', 'dry_run': True})
+    array = parse_line('["feature", "start", "login"]', 1)
+    assert (array.args, array.options) == (['feature', 'start', 'login'], {})
+    mapping = parse_line('{"command": "feature pull origin", "options": {"names": ["a", "b"]}}', 1)
+    assert (mapping.args, mapping.options) == (['feature', 'pull', 'origin'], {'names': ['a', 'b']})
+    assert parse_line('  # comment', 1) is None
+    with pytest.raises(ValueError, match='Line 2'):
+        parse_line('feature', 2)
+
+
+def test_failed_line_rolls_back_every_earlier_one(repo):
+    develop = git(repo, 'rev-parse', 'develop')
+
+    results, restored = run_batch(GitFlow(repo), batch([
+        'feature start one',
+        'feature start two',
+        'feature start one',
+    ]), atomic=True)
+
+    assert [result.ok for result in results] == [True, True, False]
+    assert 'already exists' in results[2].error
+    assert restored == 2
+    assert git(repo, 'branch', '--list', 'feature-*') == ''
+    assert git(repo, 'symbolic-ref', 'HEAD') == 'refs/heads/develop'
+    assert git(repo, 'rev-parse', 'HEAD') == develop
+    assert git(repo, 'status', '--porcelain') == ''
+
+
+def test_rollback_restores_a_commit_on_the_checked_out_branch(repo):
+    develop = git(repo, 'rev-parse', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'feature-work', 'develop')
+    commit(repo, 'work.txt', 'work\n')
+    git(repo, 'checkout', '-q', 'develop')
+
+    results, restored = run_batch(GitFlow(repo), batch([
+        'feature finish work',
+        'develop start',
+    ]), atomic=True)
+
+    assert [result.ok for result in results] == [True, False]
+    assert restored >= 1
+    assert git(repo, 'rev-parse', 'develop') == develop
+    assert git(repo, 'rev-parse', '--verify', '-q', 'feature-work')
+    assert not os.path.exists(os.path.join(repo, 'work.txt'))
+    assert git(repo, 'status', '--porcelain') == ''
+
+
+def test_failed_rollback_reports_both_errors(repo):
+    def lock_the_new_branch(result):
+        # Another git process holds the ref when the rollback tries to delete it
+        if not result.ok:
+            open(os.path.join(repo, '.git', 'refs', 'heads', 'feature-one.lock'), 'w').close()
+
+    with pytest.raises(GitFlowError) as error:
+        run_batch(GitFlow(repo), batch([
+            'feature start one',
+            'feature start one',
+        ]), atomic=True, on_result=lock_the_new_branch)
+
+    assert str(error.value).startswith('Line 2 failed: Branch feature-one already exists; rollback failed:')
+    assert 'feature-one.lock' in str(error.value)
+
+
+def test_later_lines_fetch_branches_published_by_earlier_ones(repo, origin):
+    git(repo, 'push', '-q', origin, 'develop:refs/heads/feature-shared')
+
+    results, _ = run_batch(GitFlow(repo), batch([
+        'feature track shared',
+        'feature start late',
+        'feature publish late',
+        'feature pull origin late',
+    ]))
+
+    assert [result.error for result in results] == [''] * 4
+    assert git(origin, 'rev-parse', 'refs/heads/feature-late') == git(repo, 'rev-parse', 'feature-late')
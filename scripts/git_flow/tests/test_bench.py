@@ -0,0 +1,81 @@
+"""
+Benchmark suite: the repository generator, every case on a small repository and baseline comparison
+"""
+
+import os
+
+import pytest
+
+from conftest import git
+from git_flow.bench.cases import default_cases
+from git_flow.bench.generate import RepoSpec, generate_repo
+from git_flow.bench.runner import compare, load_results, run_benchmarks, select_cases, write_results
+
+SPEC = RepoSpec(features=5, releases=2, hotfixes=2, supports=1, tags=12, commits=30, files=150)
+
+
+@pytest.fixture
+def bench_repo(tmp_path) -> str:
+    path = str(tmp_path / 'bench')
+    generate_repo(path, SPEC)
+    return path
+
+
+def refs(repo: str, namespace: str) -> list:
+    return git(repo, 'for-each-ref', '--format=%(refname:short)', namespace).split()
+
+
+def test_generated_repository_has_the_requested_shape(bench_repo):
+    branches = refs(bench_repo, 'refs/heads/')
+    tags = refs(bench_repo, 'refs/tags/')
+
+    assert len(branches) == 2 + 5 + 2 + 2 + 1
+    assert {'main', 'develop', 'feature-f0', 'release-r1', 'hotfix-h1', 'support-s0'} <= set(branches)
+    assert git(bench_repo, 'rev-list', '--count', 'main') == '30'
+    assert git(bench_repo, 'rev-parse', 'develop^') == git(bench_repo, 'rev-parse', 'main')
+    assert git(bench_repo, 'rev-parse', 'hotfix-h0^') == git(bench_repo, 'rev-parse', 'main')
+    assert len(tags) == 12 and git(bench_repo, 'cat-file', '-t', 'v0.0.11') == 'tag'
+    assert git(bench_repo, 'merge-base', '--is-ancestor', 'v0.0.11', 'main') == ''
+    assert len(git(bench_repo, 'ls-files', 'src').splitlines()) == 150
+    assert git(bench_repo, 'status', '--porcelain') == ''
+    assert os.path.isfile(os.path.join(bench_repo, '.git', 'objects', 'info', 'commit-graph'))
+    assert refs(f"{bench_repo}.origin", 'refs/heads/') == ['develop', 'main']
+
+
+def test_every_case_runs_and_leaves_the_repository_alone(bench_repo, tmp_path):
+    before = git(bench_repo, 'for-each-ref')
+    seen = []
+
+    results = run_benchmarks(bench_repo, default_cases(), str(tmp_path / 'cases'), repeat=2,
+                             on_result=lambda name, result: seen.append(name))
+
+    assert {name: result.get('error') for name, result in results.items()} == {name: None for name in seen}
+    assert seen == [case.name for case in default_cases()]
+    assert all(result['runs'] == 2 and result['min'] <= result['median'] <= result['max']
+               for result in results.values())
+    assert git(bench_repo, 'for-each-ref') == before
+    assert os.listdir(str(tmp_path / 'cases')) == []
+
+
+def test_results_round_trip_and_regressions_need_both_thresholds(tmp_path):
+    path = str(tmp_path / 'results.json')
+    baseline = {'fast': {'median': 0.001}, 'slow': {'median': 0.100}, 'same': {'median': 0.100}}
+    write_results(path, baseline, SPEC.to_dict())
+    assert load_results(path) == baseline
+
+    results = {'fast': {'median': 0.003}, 'slow': {'median': 0.200}, 'same': {'median': 0.110},
+               'new': {'median': 0.5}, 'broken': {'error': 'boom'}}
+    comparisons = {c.name: c for c in compare(results, load_results(path), threshold=0.25, min_delta=0.005)}
+
+    # fast tripled but by 2 ms, under the absolute threshold
+    assert {name: c.regressed for name, c in comparisons.items()} == {
+        'fast': False, 'slow': True, 'same': False, 'new': False}
+    assert comparisons['slow'].change == pytest.approx(1.0)
+    assert comparisons['new'].change is None
+
+
+def test_cases_are_selected_by_glob():
+    names = [case.name for case in select_cases(default_cases(), ['feature.*', 'cli.version'])]
+
+    assert names == ['cli.version', 'feature.list', 'feature.list_verbose', 'feature.start', 'feature.finish',
+                     'feature.publish']
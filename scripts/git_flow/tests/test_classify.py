@@ -0,0 +1,83 @@
+"""
+Branch type classification from the configured prefixes
+"""
+
+import copy
+
+import pytest
+
+from git_flow.classify import BranchClassifier, PrefixTrie, config_prefixes
+from git_flow.core import GitFlow
+from git_flow.settings import DEFAULT_CONFIG, Settings
+
+
+@pytest.fixture
+def classifier() -> BranchClassifier:
+    return BranchClassifier.from_config(DEFAULT_CONFIG)
+
+
+def test_trie_prefers_the_longest_prefix():
+    trie = PrefixTrie()
+    trie.insert('f', 'short')
+    trie.insert('feat/', 'long')
+    trie.insert('feat/', 'replaced')
+
+    assert trie.longest_match('feat/x') == ('feat/', 'replaced')
+    assert trie.longest_match('feat') == ('f', 'short')
+    assert trie.longest_match('g') is None
+    trie.insert('', 'any')
+    assert trie.longest_match('g') == ('', 'any')
+
+
+@pytest.mark.parametrize('branch, branch_type', [
+    ('main', 'main'),
+    ('develop', 'develop'),
+    ('feature-login', 'feature'),
+    ('feature-login/task/tests', 'task'),
+    ('bugfix-crash/task/x', 'bugfix'),
+    ('release-1.2.0', 'release'),
+    ('hotfix-1.2.1', 'hotfix'),
+    ('support-1.x', 'support'),
+    ('task-cleanup', 'task'),
+    ('setup/ci', 'setup'),
+    ('features', None),
+    ('topic', None),
+])
+def test_default_prefixes(classifier, branch, branch_type):
+    assert classifier.classify(branch) == branch_type
+
+
+def test_remote_names_are_split_from_the_branch(classifier):
+    assert classifier.classify_remote('origin/feature-x') == ('origin', 'feature')
+    assert classifier.classify_remote('upstream/main') == ('upstream', 'main')
+    assert classifier.classify_remote('origin/topic') == ('origin', None)
+
+
+def test_custom_config_with_nested_and_extra_types():
+    config = copy.deepcopy(DEFAULT_CONFIG)
+    config['branch']['feature']['prefix'] = 'feat/'
+    config['branch']['bugfix']['prefix'] = 'feat/fix/'
+    config['branch']['hotfix']['prefix'] = ''
+    config['branch']['experiment'] = {'prefix': 'exp/'}
+    config['branch']['main']['default'] = 'trunk'
+
+    classifier = BranchClassifier.from_config(config)
+
+    assert config_prefixes(config)['setup'] == 'setup/'
+    assert classifier.classify('trunk') == 'main' and classifier.classify('main') is None
+    assert classifier.classify('feat/login') == 'feature'
+    assert classifier.classify('feat/fix/crash') == 'bugfix'
+    assert classifier.classify('feat/login/task/a') == 'task'
+    assert classifier.classify('hotfix-1.0.1') is None
+    assert classifier.classify('exp/ideas') == 'experiment'
+    assert classifier.types() == ['main', 'develop', 'feature', 'task', 'bugfix', 'release', 'support', 'setup',
+                                  'experiment']
+
+
+def test_gitflow_classifier_follows_its_settings(repo):
+    Settings(f"{repo}/.git_flow/config.yaml").update_config({'branch': {'release': {'prefix': 'rel/'}}})
+
+    classifier = GitFlow(repo).classifier
+
+    assert classifier.classify('rel/1.0.0') == 'release'
+    assert classifier.classify('release-1.0.0') is None
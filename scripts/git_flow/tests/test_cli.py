@@ -0,0 +1,68 @@
+"""
+CLI startup: nothing heavy is imported and no GitFlow is built until a command needs it
+"""
+
+import os
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from git_flow import __version__
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded only once a command runs
+HEAVY_MODULES = ('git_flow.core', 'git_flow.settings', 'git_flow.commands', 'yaml', 'rich')
+
+
+def python(cwd: str, code: str) -> subprocess.CompletedProcess:
+    """Run code in a fresh interpreter, as a new git-flow process would start"""
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+    return subprocess.run([sys.executable, '-c', code], cwd=cwd, env=env, capture_output=True, text=True)
+
+
+def loaded(modules) -> str:
+    return f"print(sorted(m for m in {modules!r} if m in sys.modules))"
+
+
+def test_version_outside_a_repository_imports_nothing(tmp_path):
+    result = python(str(tmp_path), "import sys\n"
+                                   "sys.argv = ['git-flow', '--version']\n"
+                                   "from git_flow.__main__ import main\n"
+                                   "main()\n"
+                                   + loaded(HEAVY_MODULES + ('typer', 'git_flow.cli')))
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines() == [f"git-flow {__version__}", '[]']
+
+
+def test_building_the_cli_imports_no_command_module(tmp_path):
+    result = python(str(tmp_path), "import sys\n"
+                                   "from git_flow.cli import CLI\n"
+                                   "CLI()\n"
+                                   + loaded(HEAVY_MODULES))
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '[]'
+
+
+def test_help_and_version_work_outside_a_repository(tmp_path, monkeypatch):
+    from git_flow.cli import CLI
+    monkeypatch.chdir(tmp_path)
+    runner = CliRunner()
+
+    assert runner.invoke(CLI().app, ['--version']).output == f"git-flow {__version__}\n"
+    assert runner.invoke(CLI().app, ['--help']).exit_code == 0
+    help_result = runner.invoke(CLI().app, ['branch', 'release', '--help'])
+    assert help_result.exit_code == 0 and '--bump' in help_result.output
+
+
+def test_command_outside_a_repository_reports_the_error(tmp_path, monkeypatch):
+    from git_flow.cli import CLI
+    monkeypatch.chdir(tmp_path)
+
+    result = CliRunner().invoke(CLI().app, ['branch', 'release', 'list'])
+
+    assert result.exit_code == 1
+    assert result.output.startswith('Error: ')
@@ -0,0 +1,144 @@
+"""
+Resident daemon: socket trust checks, routing and the warm per-repository state
+"""
+
+import os
+
+import pytest
+
+from conftest import git
+from git_flow import daemon
+from git_flow.daemon import PROTOCOL, DaemonError, DaemonServer
+
+
+@pytest.fixture
+def tmp_socket_dir(tmp_path, monkeypatch) -> str:
+    """Stand-in for the shared /tmp fallback directory, not created yet"""
+    path = str(tmp_path / 'git-flow-uid')
+    monkeypatch.setattr(daemon, '_tmp_socket_dir', lambda: path)
+    return path
+
+
+@pytest.fixture
+def other_user(monkeypatch):
+    """Make every file on disk look owned by someone else"""
+    uid = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+
+
+def make_dir(path: str, mode: int) -> str:
+    os.makedirs(path)
+    os.chmod(path, mode)
+    return path
+
+
+def make_socket(directory: str) -> str:
+    """Plain file standing in for a socket; only its owner is checked"""
+    path = os.path.join(directory, 'daemon.sock')
+    open(path, 'w').close()
+    return path
+
+
+def run(server: DaemonServer, repo: str, *argv: str) -> dict:
+    return server.handle({'protocol': PROTOCOL, 'op': 'run', 'argv': list(argv), 'cwd': repo})
+
+
+def test_private_dir_requires_owner_and_mode_0700(tmp_path):
+    private = make_dir(str(tmp_path / 'private'), 0o700)
+
+    assert daemon._private_dir(private)
+    assert not daemon._private_dir(make_dir(str(tmp_path / 'group'), 0o750))
+    assert not daemon._private_dir(make_dir(str(tmp_path / 'shared'), 0o755))
+    assert not daemon._private_dir(make_dir(str(tmp_path / 'open'), 0o777))
+    assert not daemon._private_dir(str(tmp_path / 'missing'))
+    os.symlink(private, str(tmp_path / 'link'))
+    assert not daemon._private_dir(str(tmp_path / 'link'))
+
+
+def test_private_dir_owned_by_someone_else_is_rejected(tmp_path, other_user):
+    assert not daemon._private_dir(make_dir(str(tmp_path / 'private'), 0o700))
+
+
+@pytest.mark.parametrize('mode', [0o755, 0o770, 0o777], ids=oct)
+def test_socket_in_a_shared_fallback_dir_is_not_trusted(tmp_socket_dir, mode):
+    socket = make_socket(make_dir(tmp_socket_dir, mode))
+
+    assert not daemon.trusted_socket(socket)
+    os.chmod(tmp_socket_dir, 0o700)
+    assert daemon.trusted_socket(socket)
+
+
+def test_socket_owned_by_someone_else_is_not_trusted(tmp_path, tmp_socket_dir, other_user):
+    assert not daemon.trusted_socket(make_socket(make_dir(tmp_socket_dir, 0o700)))
+    # Outside the fallback directory only the socket's owner matters
+    assert not daemon.trusted_socket(make_socket(str(tmp_path)))
+
+
+@pytest.mark.parametrize('mode', [0o755, 0o777], ids=oct)
+def test_serve_refuses_a_shared_fallback_dir(tmp_socket_dir, mode):
+    make_dir(tmp_socket_dir, mode)
+
+    with pytest.raises(DaemonError, match='Refusing to listen in'):
+        DaemonServer(os.path.join(tmp_socket_dir, 'daemon.sock'), idle_timeout=0.1).serve()
+
+    assert os.listdir(tmp_socket_dir) == []
+
+
+def test_serve_refuses_a_fallback_dir_owned_by_someone_else(tmp_socket_dir, other_user):
+    make_dir(tmp_socket_dir, 0o700)
+
+    with pytest.raises(DaemonError, match='Refusing to listen in'):
+        DaemonServer(os.path.join(tmp_socket_dir, 'daemon.sock'), idle_timeout=0.1).serve()
+
+
+def test_route_skips_untrusted_sockets_and_writes(tmp_socket_dir, repo, monkeypatch):
+    sent = []
+    monkeypatch.delenv('GIT_FLOW_NO_DAEMON')
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    monkeypatch.delenv('GIT_FLOW_SOCKET', raising=False)
+    monkeypatch.setattr(daemon, 'request', lambda message, path=None: sent.append(message) or {'ok': True})
+    socket = make_socket(make_dir(tmp_socket_dir, 0o777))
+    assert daemon.socket_path() == socket
+
+    assert daemon.route(['branch', 'release', 'list'], repo) is None
+    os.chmod(tmp_socket_dir, 0o700)
+    assert daemon.route(['branch', 'feature', 'start', 'x'], repo) is None
+    assert daemon.route(['branch', 'release', 'list', '-v'], repo) is None
+    assert daemon.route(['branch', 'release', 'list'], repo) == {'ok': True}
+    assert [message['argv'] for message in sent] == [['branch', 'release', 'list']]
+
+
+def test_warm_repository_sees_new_refs_and_config(repo):
+    server = DaemonServer()
+    git(repo, 'branch', 'release-1.0.0', 'develop')
+
+    first = run(server, repo, 'branch', 'release', 'list')
+    git(repo, 'branch', 'release-1.1.0', 'develop')
+    second = run(server, repo, 'branch', 'release', 'list')
+
+    assert (first['ok'], first['code']) == (True, 0)
+    assert '1.0.0' in first['stdout'] and '1.1.0' not in first['stdout']
+    assert '1.0.0' in second['stdout'] and '1.1.0' in second['stdout']
+    assert len(server._repos) == 1
+    warm = server.gitflow_for(repo)
+
+    # Settings come from the config file, so an edit rebuilds the instance
+    with open(warm.config_path) as f:
+        config = f.read()
+    with open(warm.config_path, 'w') as f:
+        f.write(config.replace('release-', 'rel-'))
+    git(repo, 'branch', 'rel-2.0.0', 'develop')
+
+    third = run(server, repo, 'branch', 'release', 'list')
+    assert server.gitflow_for(repo) is not warm
+    assert '2.0.0' in third['stdout'] and '1.0.0' not in third['stdout']
+
+
+def test_commands_that_write_are_refused(repo):
+    server = DaemonServer()
+
+    answer = run(server, repo, 'branch', 'feature', 'start', 'x')
+
+    assert answer == {'ok': False, 'error': 'Not a read-only command'}
+    assert git(repo, 'branch', '--list', 'feature-x') == ''
+    assert server.handle({'op': 'ping'})['ok'] is False
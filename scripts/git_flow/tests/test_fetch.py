@@ -0,0 +1,121 @@
+"""
+Coalesced fetches for track and pull, against a bare repository as origin
+"""
+
+import pytest
+
+from conftest import commit, git
+from git_flow.commands.branch import FeatureCommand
+from git_flow.core import GitFlow
+
+
+@pytest.fixture
+def fetch_calls(monkeypatch):
+    """git fetch invocations made through any GitFlow during the test"""
+    calls = []
+    run_git = GitFlow._run_git
+
+    def recording(self, args, input=None):
+        if args and args[0] == 'fetch':
+            calls.append(input)
+        return run_git(self, args, input=input)
+
+    monkeypatch.setattr(GitFlow, '_run_git', recording)
+    return calls
+
+
+def remote_commit(repo: str, branch: str, parent: str = 'develop') -> str:
+    """Push a new commit on parent to branch on origin only, as another developer would"""
+    sha = git(repo, 'commit-tree', f"{parent}^{{tree}}", '-p', parent, '-m', f"Work on {branch}")
+    # To the URL, so the remote-tracking ref is not updated as a push to the remote name would
+    git(repo, 'push', '-q', git(repo, 'remote', 'get-url', 'origin'), f"{sha}:refs/heads/{branch}")
+    return sha
+
+
+def statuses(updates):
+    return {update.branch: update.status for update in updates}
+
+
+def test_one_fetch_creates_fast_forwards_and_reports_diverged(repo, origin, fetch_calls):
+    git(repo, 'branch', 'feature-behind', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'feature-mine', 'develop')
+    mine = commit(repo, 'mine.txt', 'mine\n')
+    git(repo, 'checkout', '-q', 'develop')
+    new = remote_commit(repo, 'feature-new')
+    ahead = remote_commit(repo, 'feature-behind')
+    theirs = remote_commit(repo, 'feature-mine')
+
+    with GitFlow(repo) as gitflow:
+        updates = gitflow.fetch_planner.update_branches('origin', ['feature-new', 'feature-behind', 'feature-mine'])
+
+    assert statuses(updates) == {'feature-new': 'created', 'feature-behind': 'fast-forward',
+                                 'feature-mine': 'diverged'}
+    assert [update.ok for update in updates] == [True, True, False]
+    assert len(fetch_calls) == 1
+    assert fetch_calls[0].splitlines() == [f"+refs/heads/{branch}:refs/remotes/origin/{branch}"
+                                           for branch in ('feature-new', 'feature-behind', 'feature-mine')]
+    assert git(repo, 'rev-parse', 'feature-new') == new
+    assert git(repo, 'rev-parse', 'feature-behind') == ahead
+    assert git(repo, 'rev-parse', 'feature-mine') == mine
+    assert git(repo, 'rev-parse', 'refs/remotes/origin/feature-mine') == theirs
+
+
+def test_checked_out_branch_is_merged(repo, origin):
+    git(repo, 'checkout', '-q', '-b', 'feature-here', 'develop')
+    git(repo, 'push', '-q', 'origin', 'feature-here')
+    remote = remote_commit(repo, 'feature-here')
+
+    with GitFlow(repo) as gitflow:
+        updates = FeatureCommand(gitflow).pull('origin', 'here')
+
+    assert statuses(updates) == {'feature-here': 'fast-forward'}
+    assert git(repo, 'rev-parse', 'HEAD') == remote
+    assert git(repo, 'status', '--porcelain') == ''
+
+
+def test_up_to_date_branches_are_fetched_once_per_process(repo, origin, fetch_calls):
+    git(repo, 'push', '-q', origin, 'develop:refs/heads/feature-same')
+
+    with GitFlow(repo) as gitflow:
+        assert statuses(FeatureCommand(gitflow).pull('origin', 'same')) == {'feature-same': 'created'}
+        assert statuses(FeatureCommand(gitflow).pull('origin', 'same')) == {'feature-same': 'up to date'}
+
+    assert len(fetch_calls) == 1
+
+
+def test_prune_drops_the_tracking_ref_of_a_deleted_branch(repo, origin):
+    remote_commit(repo, 'feature-gone')
+    git(repo, 'fetch', '-q', 'origin')
+    git(repo, 'push', '-q', origin, ':refs/heads/feature-gone')
+
+    with GitFlow(repo) as gitflow:
+        with pytest.raises(ValueError, match='feature-gone does not exist'):
+            gitflow.fetch_planner.update_branches('origin', ['feature-gone'], prune=True)
+
+    assert git(repo, 'for-each-ref', 'refs/remotes/origin/feature-gone') == ''
+
+
+def test_branch_published_after_a_miss_is_fetched(repo, origin):
+    with GitFlow(repo) as gitflow:
+        planner = gitflow.fetch_planner
+        assert planner.fetch('origin', ['feature-late']) == {'feature-late': None}
+
+        git(repo, 'checkout', '-q', '-b', 'feature-late', 'develop')
+        late = commit(repo, 'late.txt', 'late\n')
+        git(repo, 'checkout', '-q', 'develop')
+        gitflow.push_branch('feature-late')
+
+        assert planner.fetch('origin', ['feature-late']) == {'feature-late': late}
+
+
+def test_push_forgets_the_fetched_tip(repo, origin):
+    old = remote_commit(repo, 'feature-moved')
+
+    with GitFlow(repo) as gitflow:
+        FeatureCommand(gitflow).track('moved')
+        assert gitflow.fetch_planner.fetched == {('origin', 'feature-moved'): old}
+        new = commit(repo, 'moved.txt', 'moved\n')
+        gitflow.push_branch('feature-moved')
+        assert gitflow.fetch_planner.fetched == {}
+
+        assert gitflow.fetch_planner.fetch('origin', ['feature-moved']) == {'feature-moved': new}
@@ -0,0 +1,98 @@
+"""
+Finishing release branches in one ref transaction
+"""
+
+import os
+
+import pytest
+
+from conftest import commit, git
+from git_flow.core import GitFlow, GitFlowError
+from git_flow.finish import FinishEngine
+
+
+def release(repo: str, version: str) -> str:
+    """Start release-<version> from develop with one commit, back on develop, and return the branch"""
+    branch = f"release-{version}"
+    git(repo, 'checkout', '-q', '-b', branch, 'develop')
+    commit(repo, f"{branch}.txt", f"{version}\n")
+    git(repo, 'checkout', '-q', 'develop')
+    return branch
+
+
+def tips(repo: str):
+    return git(repo, 'rev-parse', 'main'), git(repo, 'rev-parse', 'develop')
+
+
+def test_squash_finish_run_again_adds_no_commits(repo):
+    branch = release(repo, '1.0.0')
+    FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'], squash=True, keep=True, tag='v1.0.0')
+    finished = tips(repo)
+    assert git(repo, 'rev-list', '--count', 'main~1..main') == '1'
+
+    plan = FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'], squash=True, keep=True)
+
+    assert plan.changes == []
+    assert tips(repo) == finished
+
+
+def test_squash_finish_resumed_after_one_target_only_merges_the_rest(repo):
+    branch = release(repo, '1.0.0')
+    FinishEngine(GitFlow(repo)).finish(branch, ['main'], squash=True, keep=True)
+    main = git(repo, 'rev-parse', 'main')
+
+    plan = FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'], squash=True)
+
+    assert [change.refname for change in plan.changes] == ['refs/heads/develop', f"refs/heads/{branch}"]
+    assert git(repo, 'rev-parse', 'main') == main
+    assert git(repo, 'log', '-1', '--format=%s', 'develop') == f"Squashed commit of branch '{branch}'"
+    assert git(repo, 'diff', 'main', 'develop', '--', f"{branch}.txt") == ''
+
+
+def state(repo: str):
+    """Refs, HEAD, index and working tree status, to compare before and after a failed finish"""
+    return (git(repo, 'for-each-ref', '--format=%(refname) %(objectname)'), git(repo, 'symbolic-ref', 'HEAD'),
+            git(repo, 'write-tree'), git(repo, 'status', '--porcelain', '--untracked-files=all'))
+
+
+def test_failed_transaction_puts_the_checked_out_branch_back(repo):
+    branch = release(repo, '1.0.0')
+    # So that switching to main after the finish changes the files
+    git(repo, 'checkout', '-q', 'main')
+    commit(repo, 'hotfix.txt', 'fix\n')
+    git(repo, 'checkout', '-q', branch)
+    before = state(repo)
+    # Another git process holds main while the finish commits
+    open(f"{repo}/.git/refs/heads/main.lock", 'w').close()
+
+    with pytest.raises(GitFlowError, match='no refs were changed'):
+        FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'], tag='v1.0.0')
+
+    assert state(repo) == before
+    assert not os.path.exists(f"{repo}/hotfix.txt")
+
+
+def test_failed_transaction_puts_a_merged_target_back(repo):
+    branch = release(repo, '1.0.0')
+    before = state(repo)
+    open(f"{repo}/.git/refs/heads/main.lock", 'w').close()
+
+    with pytest.raises(GitFlowError, match='no refs were changed'):
+        FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'])
+
+    assert state(repo) == before
+    assert not os.path.exists(f"{repo}/{branch}.txt")
+
+
+def test_untracked_file_in_the_way_stops_the_finish_before_any_ref_moves(repo):
+    branch = release(repo, '1.0.0')
+    with open(f"{repo}/{branch}.txt", 'w') as f:
+        f.write('mine\n')
+    before = state(repo)
+
+    with pytest.raises(GitFlowError):
+        FinishEngine(GitFlow(repo)).finish(branch, ['main', 'develop'], tag='v1.0.0')
+
+    assert state(repo) == before
+    with open(f"{repo}/{branch}.txt") as f:
+        assert f.read() == 'mine\n'
@@ -0,0 +1,127 @@
+"""
+In-process commit-graph reader, checked against git merge-base
+"""
+
+import os
+import random
+import subprocess
+
+import pytest
+
+from conftest import git
+from git_flow.core import GitFlow
+from git_flow.graph import CommitGraph
+
+
+def build_history(repo: str, count: int, seed: int = 7) -> list:
+    """Commit a random history with merges, octopus merges and a second root; return the commits in order"""
+    rng = random.Random(seed)
+    tree = git(repo, 'write-tree')
+    commits = []
+    for i in range(count):
+        if i in (0, count // 3):
+            parents = []
+        else:
+            width = rng.choices([1, 2, 3], weights=[6, 3, 1])[0]
+            parents = rng.sample(commits, min(width, len(commits)))
+        args = [arg for parent in parents for arg in ('-p', parent)]
+        commits.append(git(repo, 'commit-tree', tree, *args, '-m', f"Commit {i}"))
+    return commits
+
+
+def write_graph(repo: str, commits: list, *options: str):
+    git(repo, 'commit-graph', 'write', '--stdin-commits', *options, input='\n'.join(commits) + '\n')
+
+
+def objects(repo: str) -> str:
+    return os.path.join(repo, '.git', 'objects')
+
+
+def merge_bases(repo: str, one: str, two: str) -> list:
+    """Every best common ancestor per git, empty when the commits are unrelated"""
+    return subprocess.run(['git', 'merge-base', '--all', one, two], cwd=repo, capture_output=True,
+                          text=True).stdout.split()
+
+
+def ancestors(repo: str, commits: list) -> dict:
+    return {sha: set(git(repo, 'rev-list', sha).split()) for sha in commits}
+
+
+@pytest.fixture
+def history(repo) -> list:
+    return build_history(repo, 60)
+
+
+def check_against_git(repo: str, graph: CommitGraph, commits: list):
+    reachable = ancestors(repo, commits)
+    for ancestor in commits:
+        for descendant in commits:
+            assert graph.is_ancestor(ancestor, descendant) == (ancestor in reachable[descendant])
+
+    rng = random.Random(11)
+    for one, two in [rng.sample(commits, 2) for _ in range(80)]:
+        expected = merge_bases(repo, one, two)
+        base = graph.merge_base(one, two)
+        if expected:
+            assert base in expected
+        else:
+            assert base is None
+
+
+def test_single_file_matches_git(repo, history):
+    write_graph(repo, history)
+
+    graph = CommitGraph.open(objects(repo))
+
+    assert len(graph.layers) == 1
+    assert graph.contains(history)
+    check_against_git(repo, graph, history)
+
+
+def test_split_chain_matches_git(repo, history):
+    for end in (20, 40, 60):
+        write_graph(repo, history[:end], '--split=no-merge')
+
+    graph = CommitGraph.open(objects(repo))
+
+    assert len(graph.layers) == 3
+    assert [layer.offset for layer in graph.layers] == [0, graph.layers[0].count,
+                                                        graph.layers[0].count + graph.layers[1].count]
+    assert graph.contains(history)
+    check_against_git(repo, graph, history)
+
+
+def test_no_commit_graph(repo, history):
+    assert CommitGraph.open(objects(repo)) is None
+
+    gitflow = GitFlow(repo)
+    assert gitflow.commit_graph is None
+    assert gitflow.is_ancestor(history[1], history[-1]) == (history[1] in ancestors(repo, history[-1:])[history[-1]])
+
+
+def test_commits_newer_than_the_graph_fall_back_to_git(repo, history):
+    write_graph(repo, history[:30], '--split=no-merge')
+    gitflow = GitFlow(repo)
+    graph = gitflow.commit_graph
+    assert graph.contains(history[:30]) and not graph.contains(history[30:])
+    reachable = ancestors(repo, history)
+
+    for ancestor in history[::7]:
+        for descendant in history[::5]:
+            assert gitflow.is_ancestor(ancestor, descendant) == (ancestor in reachable[descendant])
+    for one, two in zip(history[::3], history[50:]):
+        expected = merge_bases(repo, one, two)
+        base = gitflow._graph_merge_base(one, two)
+        assert base in expected if expected else base is None
+
+
+def test_damaged_graph_is_ignored(repo, history):
+    write_graph(repo, history)
+    path = os.path.join(objects(repo), 'info', 'commit-graph')
+    os.chmod(path, 0o644)
+    with open(path, 'r+b') as f:
+        f.write(b'XXXX')
+
+    assert CommitGraph.open(objects(repo)) is None
+    assert GitFlow(repo).is_ancestor(history[0], history[1]) == (
+        history[0] in ancestors(repo, history[1:2])[history[1]])
@@ -0,0 +1,54 @@
+"""
+Running branch commands across repositories
+"""
+
+import os
+
+import pytest
+
+from conftest import commit, git, init_repo
+from git_flow.commands.branch import DevelopCommand, ReleaseCommand
+from git_flow.multi import discover_repos, parse_options, run_multi
+
+
+def test_parse_options_reads_flags_and_values_like_the_cli():
+    finish = ReleaseCommand.finish
+    assert parse_options(finish, ['1.0.0', '--dry-run', '--tag-message', 'Shipped', '--signing-key=ABC']) == (
+        ['1.0.0'], {'dry_run': True, 'tag_message': 'Shipped', 'signing_key': 'ABC'})
+    assert parse_options(finish, ['--no-keep', '--push=false', '--', '--odd-name']) == (
+        ['--odd-name'], {'keep': False, 'push': False})
+    assert parse_options(DevelopCommand.merge, ['feature-x', '--no-ff']) == (['feature-x'], {'no_ff': True})
+
+
+@pytest.mark.parametrize('words, error', [
+    (['--bogus'], 'Unknown option: --bogus'),
+    (['--no-tag-message'], 'Unknown option: --no-tag-message'),
+    (['--tag-message'], 'Option --tag-message requires a value'),
+])
+def test_parse_options_rejects_what_the_method_does_not_take(words, error):
+    with pytest.raises(ValueError, match=error):
+        parse_options(ReleaseCommand.finish, ['1.0.0'] + words)
+
+
+def test_options_reach_the_command_in_every_repository(tmp_path):
+    repos = [init_repo(str(tmp_path / name)) for name in ('app', 'lib')]
+    for repo, tag in zip(repos, ('v1.2.0', 'v2.0.1')):
+        git(repo, 'tag', tag)
+        commit(repo, 'work.txt', 'work\n')
+
+    results = run_multi(discover_repos(patterns=[str(tmp_path / '*')]),
+                        ['release', 'start', '--bump', 'minor'], jobs=2)
+
+    assert [(os.path.basename(result.repo), result.ok, result.output) for result in results] == [
+        ('app', True, '1.3.0'), ('lib', True, '2.1.0')]
+    assert git(repos[0], 'branch', '--show-current') == 'release-1.3.0'
+    assert git(repos[1], 'branch', '--show-current') == 'release-2.1.0'
+
+
+def test_unknown_option_fails_each_repository(tmp_path):
+    repos = [init_repo(str(tmp_path / 'app'))]
+
+    results = run_multi(repos, ['feature', 'start', 'login', '--bump', 'minor'], jobs=1)
+
+    assert [(result.ok, result.error) for result in results] == [(False, 'Unknown option: --bump')]
+    assert git(repos[0], 'branch', '--list', 'feature-*') == ''
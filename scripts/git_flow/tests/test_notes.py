@@ -0,0 +1,105 @@
+"""
+Release notes between version tags
+"""
+
+import tracemalloc
+
+import pytest
+
+from conftest import commit, git
+from git_flow.core import GitFlow
+from git_flow.notes import ReleaseNotes, merged_branch
+
+
+def merge(repo: str, branch: str, content: str) -> str:
+    """Commit on branch (created from develop if new), merge it into develop and return the merge"""
+    if git(repo, 'branch', '--list', branch):
+        git(repo, 'checkout', '-q', branch)
+    else:
+        git(repo, 'checkout', '-q', '-b', branch, 'develop')
+    commit(repo, f"{branch}.txt", content)
+    git(repo, 'checkout', '-q', 'develop')
+    git(repo, 'merge', '-q', '--no-ff', '--no-edit', branch)
+    return git(repo, 'rev-parse', 'HEAD')
+
+
+def short(repo: str, rev: str) -> str:
+    return git(repo, 'rev-parse', '--short=7', rev)
+
+
+def test_merged_branch_reads_merge_and_squash_subjects():
+    assert merged_branch("Merge branch 'feature-login' into develop") == 'feature-login'
+    assert merged_branch("Merge remote-tracking branch 'origin/bugfix-x'") == 'origin/bugfix-x'
+    assert merged_branch("Squashed commit of branch 'feature-a'") == 'feature-a'
+    assert merged_branch("Merge pull request #12 from someone/feature-b") == 'feature-b'
+    assert merged_branch("Fix the build") is None
+
+
+def test_changes_are_grouped_by_branch_type(repo):
+    git(repo, 'tag', 'v1.0.0')
+    typo = commit(repo, 'typo.txt', 'typo\n', 'Fix typo')
+    login = merge(repo, 'feature-login', 'one\n')
+    crash = merge(repo, 'bugfix-crash', 'crash\n')
+    merge(repo, 'feature-login', 'two\n')
+    topic = merge(repo, 'topic', 'topic\n')
+    git(repo, 'checkout', '-q', 'main')
+    commit(repo, 'hotfix.txt', 'fix\n')
+    git(repo, 'checkout', '-q', 'develop')
+    git(repo, 'merge', '-q', '--no-edit', 'main')
+    git(repo, 'branch', 'release-1.1.0')
+
+    lines = list(ReleaseNotes(GitFlow(repo)).generate('1.1.0'))
+
+    assert lines == [
+        '## 1.1.0',
+        '',
+        '### Features',
+        # Listed once, at its first merge
+        f"- login ({short(repo, login)})",
+        '',
+        '### Bug fixes',
+        f"- crash ({short(repo, crash)})",
+        '',
+        '### Other changes',
+        f"- Fix typo ({short(repo, typo)})",
+        f"- Merge branch 'topic' into develop ({short(repo, topic)})",
+    ]
+
+
+def test_notes_start_after_the_previous_release_tag(repo):
+    git(repo, 'tag', 'v0.9.0')
+    commit(repo, 'old.txt', 'old\n', 'Shipped in 1.0')
+    git(repo, 'tag', 'v1.0.0')
+    commit(repo, 'rc.txt', 'rc\n', 'Shipped in the release candidate')
+    git(repo, 'tag', 'v1.1.0-rc.1')
+    new = commit(repo, 'new.txt', 'new\n', 'New in 1.1')
+    git(repo, 'tag', 'v1.1.0')
+    notes = ReleaseNotes(GitFlow(repo))
+
+    # Finished: ends at the tag; pre-releases are not a starting point
+    assert list(notes.generate('1.1.0'))[-2:] == [f"- Shipped in the release candidate ({short(repo, 'v1.1.0-rc.1')})",
+                                                  f"- New in 1.1 ({short(repo, new)})"]
+    # Nothing tagged below: back to the root commit
+    assert list(notes.generate('0.9.0'))[-1] == f"- Initial commit ({short(repo, 'v0.9.0')})"
+    with pytest.raises(ValueError, match='Neither branch release-2.0.0 nor tag v2.0.0 exists'):
+        notes.generate('2.0.0')
+
+
+def test_memory_does_not_grow_with_the_history(repo):
+    def peak(count: int) -> int:
+        stream = ''.join(f"commit refs/heads/long\nmark :{i + 1}\ncommitter Flow <flow@example.com> {i} +0000\n"
+                         f"data 30\nDirect commit number {i:09d}\n"
+                         + (f"from :{i}\n" if i else 'from develop\n') + '\n'
+                         for i in range(count))
+        git(repo, 'fast-import', '--quiet', '--force', input=stream)
+        tracemalloc.start()
+        for _ in ReleaseNotes(GitFlow(repo)).generate('1.0.0', end='long'):
+            pass
+        size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return size
+
+    small, large = peak(1000), peak(20000)
+
+    # A list of 20000 entries alone would take well over a megabyte
+    assert large < small + 512 * 1024
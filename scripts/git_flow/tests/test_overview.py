@@ -0,0 +1,64 @@
+"""
+Branch overview, from plain code and from inside an event loop
+"""
+
+import asyncio
+
+import pytest
+
+from conftest import commit, git
+from git_flow.commands.branch import OverviewCommand
+from git_flow.core import GitFlow
+from git_flow.status import AHEAD, BEHIND, DIVERGED, SAME
+
+
+@pytest.fixture
+def branches(repo, origin):
+    """Flow branches in every state against develop and main, plus remote and unclassified ones"""
+    git(repo, 'branch', 'feature-behind', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'bugfix-diverged', 'develop')
+    commit(repo, 'diverged.txt', 'diverged\n')
+    git(repo, 'checkout', '-q', 'develop')
+    commit(repo, 'develop.txt', 'develop\n')
+    git(repo, 'branch', 'feature-same', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'feature-ahead', 'develop')
+    commit(repo, 'ahead.txt', 'ahead\n')
+    git(repo, 'checkout', '-q', 'develop')
+    git(repo, 'branch', 'hotfix-1.0.1', 'main')
+    git(repo, 'branch', 'scratch', 'develop')
+    git(repo, 'push', '-q', 'origin', 'feature-ahead')
+    return repo
+
+
+EXPECTED = {
+    'develop': (1, 1, {AHEAD: 1}),
+    'feature': (3, 1, {SAME: 1, AHEAD: 1, BEHIND: 1}),
+    'bugfix': (1, 0, {DIVERGED: 1}),
+    'hotfix': (1, 0, {SAME: 1}),
+    'other': (1, 0, {}),
+}
+
+
+def summary(rows):
+    return {branch_type: (local, remote, states) for branch_type, local, remote, states in rows
+            if branch_type in EXPECTED}
+
+
+def test_overview_counts_branches_and_states(branches):
+    rows = OverviewCommand(GitFlow(branches)).overview()
+
+    assert summary(rows) == EXPECTED
+    assert [row[0] for row in rows][-1] == 'other'
+
+
+def test_overview_inside_a_running_event_loop(branches):
+    async def from_coroutine():
+        return OverviewCommand(GitFlow(branches)).overview()
+
+    assert summary(asyncio.run(from_coroutine())) == EXPECTED
+
+
+def test_overview_async_matches_overview(branches):
+    command = OverviewCommand(GitFlow(branches))
+
+    assert asyncio.run(command.overview_async()) == OverviewCommand(GitFlow(branches)).overview()
@@ -0,0 +1,64 @@
+"""
+status --prompt fast path and the compiled config it reads
+"""
+
+import os
+
+import pytest
+
+from conftest import git
+from git_flow import prompt, settings
+from git_flow.prompt import prompt_status
+
+
+@pytest.fixture
+def new_process(monkeypatch):
+    """Empty the in-process config cache, as for the next prompt"""
+    def reset():
+        monkeypatch.setattr(settings, '_CONFIG_CACHE', {})
+    return reset
+
+
+@pytest.fixture
+def no_settings(monkeypatch):
+    """Fail if the prompt falls back to reading the config through Settings"""
+    def disable():
+        def fail(*args, **kwargs):
+            raise AssertionError('config read through Settings')
+        monkeypatch.setattr(prompt, 'Settings', fail)
+    return disable
+
+
+def test_prompt_classifies_the_checked_out_branch(repo):
+    assert prompt_status(repo) == 'develop'
+    git(repo, 'checkout', '-q', '-b', 'feature-login')
+    assert prompt_status(repo) == 'feature:login'
+    git(repo, 'checkout', '-q', '-b', 'scratch')
+    assert prompt_status(repo) == 'scratch'
+    git(repo, 'checkout', '-q', '--detach')
+    assert prompt_status(repo) == f"detached:{git(repo, 'rev-parse', '--short=7', 'HEAD')}"
+
+
+def test_prompt_outside_a_repository_is_empty(tmp_path):
+    assert prompt_status(str(tmp_path)) == ''
+
+
+def test_warm_prompt_reads_only_the_sidecar(repo, new_process, no_settings):
+    prompt_status(repo)
+    new_process()
+    no_settings()
+
+    assert prompt_status(repo) == 'develop'
+
+
+def test_touched_config_costs_one_slow_prompt(repo, new_process, no_settings):
+    prompt_status(repo)
+    config = os.path.join(repo, '.git_flow', 'config.yaml')
+    st = os.stat(config)
+    os.utime(config, ns=(st.st_atime_ns, st.st_mtime_ns + 5 * 10**9))
+    new_process()
+    assert prompt_status(repo) == 'develop'
+
+    new_process()
+    no_settings()
+    assert prompt_status(repo) == 'develop'
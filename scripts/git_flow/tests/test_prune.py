@@ -0,0 +1,69 @@
+"""
+Pruning merged flow branches, locally and on a bare repository as origin
+"""
+
+from conftest import commit, git
+from git_flow.commands.branch import PruneCommand
+from git_flow.core import GitFlow
+
+
+def merged_feature(repo: str, name: str) -> str:
+    """Commit on feature-<name>, merge it into develop and return the branch tip"""
+    git(repo, 'checkout', '-q', '-b', f"feature-{name}", 'develop')
+    tip = commit(repo, f"{name}.txt", f"{name}\n")
+    git(repo, 'checkout', '-q', 'develop')
+    git(repo, 'merge', '-q', '--no-ff', '-m', f"Merge feature-{name}", f"feature-{name}")
+    return tip
+
+
+def test_prunes_merged_local_branches_only(repo):
+    merged_feature(repo, 'done')
+    git(repo, 'branch', 'feature-open', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'feature-wip', 'develop')
+    commit(repo, 'wip.txt', 'wip\n')
+    git(repo, 'checkout', '-q', 'develop')
+
+    result = PruneCommand(GitFlow(repo)).prune()
+
+    assert result.local == {'feature-done': 'develop'}
+    assert git(repo, 'branch', '--list', 'feature-*', '--format=%(refname:short)').split() == [
+        'feature-open', 'feature-wip']
+
+
+def test_dry_run_deletes_nothing(repo, origin):
+    merged_feature(repo, 'done')
+    git(repo, 'push', '-q', 'origin', 'feature-done')
+    git(repo, 'fetch', '-q', 'origin')
+
+    result = PruneCommand(GitFlow(repo)).prune(remote=True, dry_run=True)
+
+    assert (result.local, result.remote, result.pushed) == ({'feature-done': 'develop'},
+                                                            {'feature-done': 'develop'}, [])
+    assert git(repo, 'rev-parse', '--verify', '-q', 'feature-done')
+    assert git(origin, 'rev-parse', '--verify', '-q', 'refs/heads/feature-done')
+
+
+def test_remote_branch_moved_after_the_fetch_is_kept(repo, origin, tmp_path):
+    merged_feature(repo, 'done')
+    merged_feature(repo, 'reopened')
+    git(repo, 'push', '-q', 'origin', 'develop', 'feature-done', 'feature-reopened')
+    git(repo, 'fetch', '-q', 'origin')
+    git(repo, 'branch', '-q', '-D', 'feature-done', 'feature-reopened')
+    # Someone else pushes more work to feature-reopened; this clone has not fetched it
+    other = str(tmp_path / 'other')
+    git(str(tmp_path), 'clone', '-q', '-b', 'feature-reopened', origin, other)
+    moved = commit(other, 'more.txt', 'more\n')
+    git(other, 'push', '-q', 'origin', 'feature-reopened')
+    tracking = git(repo, 'rev-parse', 'refs/remotes/origin/feature-reopened')
+
+    result = PruneCommand(GitFlow(repo)).prune(remote=True)
+
+    assert {push.refname: push.ok for push in result.pushed} == {
+        'refs/heads/feature-done': True,
+        'refs/heads/feature-reopened': False,
+    }
+    assert git(origin, 'for-each-ref', 'refs/heads/feature-done') == ''
+    assert git(origin, 'rev-parse', 'refs/heads/feature-reopened') == moved
+    # Only the accepted deletion drops its remote-tracking ref
+    assert git(repo, 'for-each-ref', 'refs/remotes/origin/feature-done') == ''
+    assert git(repo, 'rev-parse', 'refs/remotes/origin/feature-reopened') == tracking
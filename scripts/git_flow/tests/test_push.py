@@ -0,0 +1,110 @@
+"""
+Atomic push of finished branches, against a bare repository as origin
+"""
+
+import pytest
+
+from conftest import commit, git
+from git_flow.core import GitFlow, GitFlowError
+from git_flow.finish import FinishEngine
+from git_flow.remote import parse_push_porcelain
+
+PORCELAIN = (
+    "To /srv/origin.git\n"
+    "*\trefs/tags/v1.0:refs/tags/v1.0\t[new tag]\n"
+    " \trefs/heads/main:refs/heads/main\t1a2b3c4..5d6e7f8\n"
+    "+\trefs/heads/develop:refs/heads/develop\t1a2b3c4...5d6e7f8 (forced update)\n"
+    "-\t:refs/heads/release-1.0\t[deleted]\n"
+    "=\trefs/heads/support:refs/heads/support\t[up to date]\n"
+    "!\trefs/heads/hotfix:refs/heads/hotfix\t[rejected] (fetch first)\n"
+    "Done\n"
+)
+
+
+def test_parse_push_porcelain_reads_every_ref_line():
+    results = parse_push_porcelain(PORCELAIN)
+    assert [(r.refname, r.status) for r in results] == [
+        ('refs/tags/v1.0', 'new'),
+        ('refs/heads/main', 'fast-forward'),
+        ('refs/heads/develop', 'forced'),
+        ('refs/heads/release-1.0', 'deleted'),
+        ('refs/heads/support', 'up to date'),
+        ('refs/heads/hotfix', 'rejected'),
+    ]
+    assert [r.ok for r in results] == [True, True, True, True, True, False]
+    assert results[3].source == ''
+    assert results[5].describe() == 'refs/heads/hotfix: rejected [rejected] (fetch first)'
+
+
+def test_parse_push_porcelain_ignores_other_lines():
+    assert parse_push_porcelain("To /srv/origin.git\nDone\n") == []
+    assert parse_push_porcelain("") == []
+
+
+def _finished(repo: str, version: str):
+    """Finish release-<version> into main and develop with a tag, returning the engine and plan"""
+    git(repo, 'checkout', '-q', '-b', f"release-{version}", 'develop')
+    commit(repo, f"release-{version}.txt", f"{version}\n")
+    git(repo, 'push', '-q', 'origin', f"release-{version}")
+    git(repo, 'checkout', '-q', 'develop')
+    engine = FinishEngine(GitFlow(repo))
+    plan = engine.finish(f"release-{version}", ['main', 'develop'], tag=f"v{version}")
+    return engine, plan
+
+
+def test_push_sends_every_finished_ref_in_one_push(repo, origin):
+    engine, plan = _finished(repo, '1.0')
+
+    pushed = engine.push(plan, 'origin')
+
+    assert {r.refname: r.status for r in pushed} == {
+        'refs/heads/main': 'fast-forward',
+        'refs/heads/develop': 'fast-forward',
+        'refs/tags/v1.0': 'new',
+        'refs/heads/release-1.0': 'deleted',
+    }
+    for refname in ('refs/heads/main', 'refs/heads/develop', 'refs/tags/v1.0'):
+        assert git(origin, 'rev-parse', refname) == git(repo, 'rev-parse', refname)
+    assert git(origin, 'for-each-ref', 'refs/heads/release-1.0') == ''
+
+
+def test_push_reports_up_to_date_refs(repo, origin):
+    engine, plan = _finished(repo, '1.0')
+    engine.push(plan, 'origin')
+
+    again = engine.push(plan, 'origin')
+
+    assert {r.refname: r.status for r in again} == {
+        'refs/heads/main': 'up to date',
+        'refs/heads/develop': 'up to date',
+        'refs/tags/v1.0': 'up to date',
+    }
+    assert all(r.ok for r in again)
+
+
+def test_rejected_push_changes_nothing_on_the_remote(repo, origin, tmp_path):
+    # Someone else moves main on the remote first
+    other = str(tmp_path / 'other')
+    git(str(tmp_path), 'clone', '-q', origin, other)
+    git(other, 'checkout', '-q', 'main')
+    commit(other, 'elsewhere.txt', 'moved\n')
+    git(other, 'push', '-q', 'origin', 'main')
+    remote_main = git(origin, 'rev-parse', 'refs/heads/main')
+    remote_develop = git(origin, 'rev-parse', 'refs/heads/develop')
+    engine, plan = _finished(repo, '1.0')
+
+    with pytest.raises(GitFlowError, match='rejected, local finish is kept'):
+        engine.push(plan, 'origin')
+
+    assert not any(r.ok for r in plan.pushed)
+    summaries = {r.refname: r.summary for r in plan.pushed}
+    assert summaries.pop('refs/heads/main') == '[rejected] (fetch first)'
+    assert set(summaries.values()) == {'[rejected] (atomic push failed)'}
+    # Atomic: the refs the remote would have accepted were not updated either
+    assert git(origin, 'rev-parse', 'refs/heads/main') == remote_main
+    assert git(origin, 'rev-parse', 'refs/heads/develop') == remote_develop
+    assert git(origin, 'tag', '--list', 'v1.0') == ''
+    assert git(origin, 'rev-parse', '--verify', '-q', 'refs/heads/release-1.0')
+    # The local finish stays applied
+    assert git(repo, 'rev-parse', '--verify', '-q', 'refs/tags/v1.0')
+    assert git(repo, 'branch', '--list', 'release-1.0') == ''
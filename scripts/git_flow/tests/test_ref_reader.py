@@ -0,0 +1,118 @@
+"""
+Reading HEAD, loose refs and packed-refs straight from the git directory
+"""
+
+import os
+
+import pytest
+
+from conftest import commit, git
+from git_flow.core import GitFlow
+from git_flow.refs import FileRefReader, RefFormatError
+
+
+def reader(repo: str) -> FileRefReader:
+    return FileRefReader(os.path.join(repo, '.git'))
+
+
+def for_each_ref(repo: str) -> dict:
+    return dict(line.split(' ', 1) for line in git(repo, 'for-each-ref', '--format=%(refname) %(objectname)')
+                .splitlines())
+
+
+@pytest.fixture
+def many_refs(repo) -> str:
+    """Packed branches and annotated tags, with some loose refs shadowing packed ones"""
+    for i in range(50):
+        git(repo, 'branch', f"feature-{i:02d}")
+        git(repo, 'tag', '-a', '-m', f"Tag {i}", f"v1.{i}.0")
+    git(repo, 'pack-refs', '--all')
+    commit(repo, 'loose.txt', 'loose\n')
+    git(repo, 'branch', '-f', 'feature-10', 'develop')
+    git(repo, 'branch', 'feature-loose', 'develop')
+    git(repo, 'branch', '-D', 'feature-20')
+    return repo
+
+
+def test_packed_and_loose_refs_match_git(many_refs):
+    refs, symrefs = reader(many_refs).read_all()
+
+    assert refs == for_each_ref(many_refs)
+    assert symrefs == {}
+    with open(os.path.join(many_refs, '.git', 'packed-refs')) as f:
+        # Peeled lines for the annotated tags are there but never read as refs
+        assert sum(line.startswith('^') for line in f) == 50
+
+
+def test_point_lookups_binary_search_packed_refs(many_refs):
+    refs = reader(many_refs)
+
+    for name in ['feature-00', 'feature-10', 'feature-49', 'feature-loose', 'v1.0.0', 'v1.49.0', 'v1.25.0',
+                 'develop', 'heads/main', 'refs/tags/v1.7.0', 'HEAD']:
+        assert refs.resolve(name) == git(many_refs, 'rev-parse', name), name
+    for name in ['feature-20', 'feature-5', 'v1.50.0', 'v0', 'zzz', 'refs/heads/feature-0']:
+        assert refs.resolve(name) is None, name
+
+
+def test_unsorted_packed_refs_are_parsed_in_full(many_refs):
+    path = os.path.join(many_refs, '.git', 'packed-refs')
+    records = []
+    with open(path) as f:
+        for line in f.readlines()[1:]:
+            if line.startswith('^'):
+                records[-1] += line
+            else:
+                records.append(line)
+    # No header, so git and the reader may not assume the file is sorted
+    with open(path, 'w') as f:
+        f.write(''.join(records[::-1]))
+
+    refs = reader(many_refs)
+
+    assert refs.resolve('feature-33') == git(many_refs, 'rev-parse', 'feature-33')
+    assert refs.read_all()[0] == for_each_ref(many_refs)
+
+
+def test_head_attached_detached_and_unborn(repo):
+    refs = reader(repo)
+    assert refs.read_symref('HEAD') == 'refs/heads/develop'
+
+    git(repo, 'checkout', '-q', '--detach')
+    assert refs.read_symref('HEAD') is None
+    assert refs.resolve('HEAD') == git(repo, 'rev-parse', 'HEAD')
+    assert GitFlow(repo).get_current_branch() == ''
+
+    git(repo, 'checkout', '-q', '--orphan', 'feature-new')
+    assert refs.read_symref('HEAD') == 'refs/heads/feature-new'
+    assert refs.resolve('HEAD') is None
+    assert GitFlow(repo).is_headless()
+
+
+def test_worktree_reads_its_own_head_and_the_shared_refs(repo, tmp_path):
+    path = str(tmp_path / 'worktree')
+    git(repo, 'worktree', 'add', '-q', '-b', 'feature-tree', path, 'develop')
+
+    gitflow = GitFlow(path)
+
+    assert gitflow._ref_reader.supported
+    assert gitflow._ref_reader.common_dir == os.path.join(repo, '.git')
+    assert gitflow.get_current_branch() == 'feature-tree'
+    assert GitFlow(repo).get_current_branch() == 'develop'
+    assert gitflow.get_branches() == ['develop', 'feature-tree', 'main']
+
+
+def test_damaged_ref_falls_back_to_git(repo):
+    with open(os.path.join(repo, '.git', 'refs', 'heads', 'feature-bad'), 'w') as f:
+        f.write('not a sha\n')
+    with pytest.raises(RefFormatError):
+        reader(repo).read_all()
+
+    # git skips the broken ref, so does the snapshot it is loaded from instead
+    gitflow = GitFlow(repo)
+    assert gitflow.get_branches() == ['develop', 'main']
+
+
+def test_reftable_layout_is_not_read_directly(repo):
+    os.mkdir(os.path.join(repo, '.git', 'reftable'))
+
+    assert not reader(repo).supported
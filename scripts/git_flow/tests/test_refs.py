@@ -0,0 +1,77 @@
+"""
+In-memory ref index and how GitFlow keeps it in step with its own ref changes
+"""
+
+from conftest import git
+from git_flow.core import GitFlow
+from git_flow.refs import RefIndex
+
+
+def for_each_ref(repo: str) -> dict:
+    return dict(line.split(' ', 1) for line in git(repo, 'for-each-ref', '--format=%(refname) %(objectname)')
+                .splitlines())
+
+
+def test_index_lookups_and_scans():
+    index = RefIndex({'refs/heads/feature-a': '1' * 40, 'refs/heads/feature-b': '2' * 40,
+                      'refs/heads/featurex': '3' * 40, 'refs/tags/feature-a': '4' * 40,
+                      'refs/remotes/origin/HEAD': '1' * 40, 'refs/remotes/origin/feature-a': '1' * 40},
+                     {'refs/remotes/origin/HEAD': 'refs/remotes/origin/feature-a'})
+
+    assert 'refs/heads/feature-a' in index and 'feature-a' not in index
+    assert index.get('refs/heads/feature-b') == '2' * 40
+    # Tags win over branches of the same name, as in git rev-parse
+    assert index.resolve('feature-a') == '4' * 40
+    assert index.resolve('heads/feature-a') == '1' * 40
+    assert index.resolve('origin') == '1' * 40
+    assert index.resolve('missing') is None
+    assert index.names('refs/heads/', 'feature-') == ['feature-a', 'feature-b']
+    # Symbolic refs resolve but are not listed
+    assert index.names('refs/remotes/') == ['origin/feature-a']
+
+    generation = index.generation
+    index.set('refs/heads/feature-0', '5' * 40)
+    index.set('refs/heads/feature-a', None)
+    index.set('refs/heads/feature-a', None)
+    assert index.names('refs/heads/', 'feature-') == ['feature-0', 'feature-b']
+    assert index.generation == generation + 3
+
+
+def test_snapshot_matches_git(repo, origin):
+    git(repo, 'branch', 'feature-one')
+    git(repo, 'tag', '-a', '-m', 'One', 'v1.0.0')
+    git(repo, 'fetch', '-q', 'origin')
+    git(repo, 'remote', 'set-head', 'origin', 'develop')
+    gitflow = GitFlow(repo)
+
+    assert dict(gitflow.refs._refs) == for_each_ref(repo)
+    # Marks and symbolic refs never leak into branch listings
+    assert gitflow.get_branches() == ['develop', 'feature-one', 'main']
+    assert gitflow.get_remote_branches() == ['origin/develop', 'origin/main']
+    assert gitflow.get_all_tags() == ['v1.0.0']
+
+
+def test_own_ref_changes_patch_the_index_without_a_reload(repo):
+    gitflow = GitFlow(repo)
+    index = gitflow.refs
+
+    gitflow.create_branch('feature-one', 'develop')
+    gitflow.create_tag('v1.0.0', 'develop', message='One')
+    git(repo, 'checkout', '-q', 'develop')
+    gitflow.delete_branch('feature-one')
+
+    assert gitflow.refs is index
+    assert not gitflow.branch_exists('feature-one')
+    assert gitflow.tag_exists('v1.0.0')
+    assert gitflow.refs.get('refs/tags/v1.0.0') == git(repo, 'rev-parse', 'refs/tags/v1.0.0')
+    assert dict(gitflow.refs._refs) == for_each_ref(repo)
+
+
+def test_other_ref_changes_drop_the_snapshot(repo):
+    gitflow = GitFlow(repo)
+    index = gitflow.refs
+
+    gitflow._git_command(['branch', 'feature-raw'])
+
+    assert gitflow.refs is not index
+    assert gitflow.branch_exists('feature-raw')
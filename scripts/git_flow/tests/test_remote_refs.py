@@ -0,0 +1,175 @@
+"""
+Remote ref cache behind publish and track, against a bare repository as origin
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from conftest import commit, git
+from git_flow.commands.branch import FeatureCommand
+from git_flow.core import GitFlow
+from git_flow.remote import RemoteRefs, branch_patterns
+
+FLOW_PATTERNS = ['refs/heads/feature-*', 'refs/heads/release-*']
+
+
+@pytest.fixture
+def ls_remote_calls(monkeypatch):
+    """ls-remote invocations made through any GitFlow during the test"""
+    calls = []
+    run_git = GitFlow._run_git
+
+    def recording(self, args, input=None):
+        if 'ls-remote' in args:
+            calls.append(args)
+        return run_git(self, args, input=input)
+
+    monkeypatch.setattr(GitFlow, '_run_git', recording)
+    return calls
+
+
+def remote_branch(repo: str, origin: str, branch: str) -> str:
+    """Create branch on origin only, as another developer's push would, and return its tip"""
+    sha = git(repo, 'commit-tree', 'develop^{tree}', '-p', 'develop', '-m', f"Work on {branch}")
+    git(repo, 'push', '-q', 'origin', f"{sha}:refs/heads/{branch}")
+    return sha
+
+
+def cache_path(repo: str) -> str:
+    return os.path.join(repo, '.git', 'git_flow', 'remote-refs', 'origin.json')
+
+
+def test_branch_patterns():
+    assert branch_patterns(['release-', 'feature-', 'feature-']) == FLOW_PATTERNS
+    # An empty prefix means every branch may be a flow branch
+    assert branch_patterns(['feature-', '']) == []
+    assert branch_patterns([]) == []
+
+
+def test_covers_only_listed_prefixes():
+    listing = RemoteRefs('origin', FLOW_PATTERNS, {})
+    assert listing.covers('refs/heads/feature-login')
+    assert listing.covers('refs/heads/release-1.0')
+    assert not listing.covers('refs/heads/develop')
+    assert not listing.covers('refs/tags/feature-login')
+    assert RemoteRefs('origin', [], {}).covers('refs/heads/develop')
+
+
+def test_fresh_honours_ttl_and_patterns():
+    listing = RemoteRefs('origin', FLOW_PATTERNS, {}, fetched=time.time() - 30)
+    assert listing.fresh(FLOW_PATTERNS, ttl=60)
+    assert listing.fresh(FLOW_PATTERNS[:1], ttl=60)
+    assert not listing.fresh(FLOW_PATTERNS, ttl=10)
+    assert not listing.fresh(FLOW_PATTERNS + ['refs/heads/hotfix-*'], ttl=60)
+    # A clock that went backwards does not make a listing fresh forever
+    assert not RemoteRefs('origin', FLOW_PATTERNS, {}, fetched=time.time() + 3600).fresh(FLOW_PATTERNS, ttl=60)
+
+
+def test_update_records_pushes_within_the_listing():
+    listing = RemoteRefs('origin', FLOW_PATTERNS, {'refs/heads/feature-a': 'a' * 40})
+    listing.update('refs/heads/feature-b', 'b' * 40)
+    listing.update('refs/heads/develop', 'c' * 40)
+    listing.update('refs/heads/feature-a', None)
+    assert listing.refs == {'refs/heads/feature-b': 'b' * 40}
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / 'remote-refs' / 'origin.json')
+    RemoteRefs('origin', FLOW_PATTERNS, {'refs/heads/feature-a': 'a' * 40}, fetched=123.0).save(path)
+
+    loaded = RemoteRefs.load(path, 'origin')
+
+    assert (loaded.patterns, loaded.refs, loaded.fetched) == (FLOW_PATTERNS, {'refs/heads/feature-a': 'a' * 40}, 123.0)
+    assert not loaded.live
+    assert RemoteRefs.load(path, 'upstream') is None
+    assert RemoteRefs.load(str(tmp_path / 'missing.json'), 'origin') is None
+    with open(path, 'w') as f:
+        f.write('{not json')
+    assert RemoteRefs.load(path, 'origin') is None
+
+
+def test_one_ls_remote_lists_flow_branches_and_is_cached_on_disk(repo, origin, ls_remote_calls):
+    feature = remote_branch(repo, origin, 'feature-login')
+
+    with GitFlow(repo) as gitflow:
+        listing = gitflow.remote_refs()
+        assert gitflow.remote_branch('feature-login') == feature
+        assert gitflow.remote_branch('feature-missing') is None
+
+    assert listing.refs == {'refs/heads/feature-login': feature}
+    assert len(ls_remote_calls) == 1
+    assert 'protocol.version=2' in ls_remote_calls[0] and '--heads' in ls_remote_calls[0]
+    with open(cache_path(repo)) as f:
+        assert json.load(f)['refs'] == {'refs/heads/feature-login': feature}
+
+    # A later process within the TTL answers from the file
+    with GitFlow(repo) as gitflow:
+        assert gitflow.remote_branch('feature-login') == feature
+    assert len(ls_remote_calls) == 1
+
+
+def test_expired_cache_asks_the_remote_again(repo, origin, ls_remote_calls):
+    with GitFlow(repo) as gitflow:
+        gitflow.remote_refs()
+    with open(cache_path(repo)) as f:
+        data = json.load(f)
+    data['fetched'] -= 3600
+    with open(cache_path(repo), 'w') as f:
+        json.dump(data, f)
+    feature = remote_branch(repo, origin, 'feature-late')
+
+    with GitFlow(repo) as gitflow:
+        assert gitflow.remote_branch('feature-late') == feature
+    assert len(ls_remote_calls) == 2
+
+
+def test_branch_outside_the_prefixes_gets_its_own_lookup(repo, origin, ls_remote_calls):
+    with GitFlow(repo) as gitflow:
+        assert gitflow.remote_branch('develop') == git(repo, 'rev-parse', 'develop')
+    assert len(ls_remote_calls) == 2
+    assert ls_remote_calls[1][-1] == 'refs/heads/develop'
+
+
+def test_publish_rechecks_a_stale_hit(repo, origin, ls_remote_calls):
+    # An earlier process saw feature-login on the remote; it has been deleted since
+    remote_branch(repo, origin, 'feature-login')
+    with GitFlow(repo) as gitflow:
+        gitflow.remote_refs()
+    git(repo, 'push', '-q', 'origin', ':refs/heads/feature-login')
+    git(repo, 'checkout', '-q', '-b', 'feature-login', 'develop')
+    local = commit(repo, 'login.txt', 'login\n')
+
+    with GitFlow(repo) as gitflow:
+        FeatureCommand(gitflow).publish('login')
+        assert gitflow.remote_refs().get('refs/heads/feature-login') == local
+
+    assert git(origin, 'rev-parse', 'refs/heads/feature-login') == local
+    assert len(ls_remote_calls) == 2
+    # The push patched the file too, so the next process sees the branch without asking
+    with GitFlow(repo) as gitflow:
+        with pytest.raises(ValueError, match='already exists'):
+            FeatureCommand(gitflow).publish('login')
+
+
+def test_track_rechecks_a_stale_miss(repo, origin, ls_remote_calls):
+    with GitFlow(repo) as gitflow:
+        gitflow.remote_refs()
+    # Pushed after the cached listing, and never fetched here
+    feature = remote_branch(repo, origin, 'feature-shared')
+
+    with GitFlow(repo) as gitflow:
+        FeatureCommand(gitflow).track('shared')
+
+    assert len(ls_remote_calls) == 2
+    assert git(repo, 'rev-parse', 'feature-shared') == feature
+    assert git(repo, 'branch', '--show-current') == 'feature-shared'
+
+
+def test_live_miss_is_not_rechecked(repo, origin, ls_remote_calls):
+    with GitFlow(repo) as gitflow:
+        with pytest.raises(ValueError, match='does not exist'):
+            FeatureCommand(gitflow).track('nowhere')
+    assert len(ls_remote_calls) == 1
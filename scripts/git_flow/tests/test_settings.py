@@ -0,0 +1,107 @@
+"""
+Config parsing and the compiled sidecar later processes load instead of YAML
+"""
+
+import os
+
+import pytest
+import yaml
+
+from git_flow import settings
+from git_flow.settings import DEFAULT_CONFIG, Settings, load_compiled_config
+
+
+@pytest.fixture
+def config_path(tmp_path, monkeypatch) -> str:
+    """Default config file, with the in-process cache emptied as in a new process"""
+    monkeypatch.setattr(settings, '_CONFIG_CACHE', {})
+    path = str(tmp_path / '.git_flow' / 'config.yaml')
+    Settings(path).create_config()
+    return path
+
+
+@pytest.fixture
+def cache_path(tmp_path) -> str:
+    return str(tmp_path / 'git' / 'git_flow' / 'config.cache')
+
+
+@pytest.fixture
+def yaml_loads(monkeypatch):
+    """Configs parsed from YAML during the test"""
+    loads = []
+    load = yaml.load
+
+    def counting(stream, Loader):
+        loads.append(stream)
+        return load(stream, Loader=Loader)
+
+    monkeypatch.setattr(yaml, 'load', counting)
+    return loads
+
+
+def new_process(monkeypatch):
+    monkeypatch.setattr(settings, '_CONFIG_CACHE', {})
+
+
+def set_mtime(path: str, offset_ns: int):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + offset_ns))
+
+
+def test_config_is_parsed_once_and_copied(config_path, yaml_loads):
+    first = Settings(config_path).config
+    first['branch']['feature']['prefix'] = 'changed-'
+
+    assert Settings(config_path).config == DEFAULT_CONFIG
+    assert len(yaml_loads) == 1
+    assert DEFAULT_CONFIG['branch']['feature']['prefix'] == 'feature-'
+
+
+def test_sidecar_skips_yaml_in_the_next_process(config_path, cache_path, yaml_loads, monkeypatch):
+    Settings(config_path, cache_path)
+    new_process(monkeypatch)
+
+    assert load_compiled_config(config_path, cache_path) == DEFAULT_CONFIG
+    assert Settings(config_path, cache_path).config == DEFAULT_CONFIG
+    assert len(yaml_loads) == 1
+
+
+def test_edited_config_makes_the_sidecar_stale(config_path, cache_path, yaml_loads, monkeypatch):
+    Settings(config_path, cache_path)
+    new_process(monkeypatch)
+    Settings(config_path).update_config({'branch': {'feature': {'prefix': 'feat/'}}})
+
+    assert load_compiled_config(config_path, cache_path) is None
+    assert Settings(config_path, cache_path).config['branch']['feature']['prefix'] == 'feat/'
+    assert load_compiled_config(config_path, cache_path)['branch']['feature']['prefix'] == 'feat/'
+
+
+def test_touched_config_refreshes_the_sidecar_stat(config_path, cache_path, yaml_loads, monkeypatch):
+    Settings(config_path, cache_path)
+    set_mtime(config_path, 5 * 10**9)
+    new_process(monkeypatch)
+
+    assert load_compiled_config(config_path, cache_path) is None
+    assert Settings(config_path, cache_path).config == DEFAULT_CONFIG
+    # Same contents, so the sidecar was reused rather than the YAML parsed again
+    assert len(yaml_loads) == 1
+    assert load_compiled_config(config_path, cache_path) == DEFAULT_CONFIG
+
+
+@pytest.mark.parametrize('damage', [
+    lambda data: data[:len(data) // 2],
+    lambda data: b'\x00' * len(data),
+    lambda data: b'',
+])
+def test_damaged_sidecar_falls_back_to_yaml(config_path, cache_path, yaml_loads, monkeypatch, damage):
+    Settings(config_path, cache_path)
+    with open(cache_path, 'rb') as f:
+        data = f.read()
+    with open(cache_path, 'wb') as f:
+        f.write(damage(data))
+    new_process(monkeypatch)
+
+    assert load_compiled_config(config_path, cache_path) is None
+    assert Settings(config_path, cache_path).config == DEFAULT_CONFIG
+    assert len(yaml_loads) == 2
+    assert load_compiled_config(config_path, cache_path) == DEFAULT_CONFIG
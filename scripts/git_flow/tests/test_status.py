@@ -0,0 +1,80 @@
+"""
+Batched branch status for the list commands, with and without a commit-graph
+"""
+
+import pytest
+
+from conftest import commit, git
+from git_flow.commands.branch import FeatureCommand, ReleaseCommand
+from git_flow.core import GitFlow
+from git_flow.status import AHEAD, BEHIND, DIVERGED, SAME, UNRELATED, BranchStatusEngine
+
+
+@pytest.fixture(params=['rev-list', 'commit-graph'])
+def branches(request, repo) -> dict:
+    """Feature branches in every state against develop, painted through either walk"""
+    git(repo, 'branch', 'feature-behind', 'develop')
+    git(repo, 'branch', 'feature-diverged', 'develop')
+    base = git(repo, 'rev-parse', 'develop')
+    commit(repo, 'develop.txt', 'develop\n')
+    git(repo, 'branch', 'feature-same', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'feature-ahead', 'develop')
+    commit(repo, 'ahead.txt', 'ahead\n')
+    commit(repo, 'ahead2.txt', 'ahead\n')
+    git(repo, 'checkout', '-q', 'feature-diverged')
+    commit(repo, 'diverged.txt', 'diverged\n')
+    git(repo, 'checkout', '-q', '--orphan', 'feature-unrelated')
+    commit(repo, 'unrelated.txt', 'unrelated\n')
+    git(repo, 'checkout', '-q', 'develop')
+    if request.param == 'commit-graph':
+        git(repo, 'commit-graph', 'write', '--reachable')
+    return {'base': base, 'graph': request.param == 'commit-graph'}
+
+
+def test_every_state_and_count_in_one_pass(repo, branches):
+    gitflow = GitFlow(repo)
+    assert (gitflow.commit_graph is not None) == branches['graph']
+    names = ['feature-same', 'feature-ahead', 'feature-behind', 'feature-diverged', 'feature-unrelated']
+
+    statuses = BranchStatusEngine(gitflow).compute(names, 'develop')
+
+    assert {branch: (s.state, s.ahead, s.behind) for branch, s in statuses.items()} == {
+        'feature-same': (SAME, 0, 0),
+        'feature-ahead': (AHEAD, 2, 0),
+        'feature-behind': (BEHIND, 0, 1),
+        'feature-diverged': (DIVERGED, 1, 1),
+        'feature-unrelated': (UNRELATED, 1, 2),
+    }
+    assert statuses['feature-diverged'].base == branches['base']
+    assert statuses['feature-unrelated'].base is None
+    for branch in names[1:4]:
+        assert statuses[branch].base == git(repo, 'merge-base', branch, 'develop')
+
+
+def test_feature_list_labels(repo, branches):
+    listed = {branch: status for branch, _, status, _ in FeatureCommand(GitFlow(repo)).list(verbose=True)}
+
+    assert listed == {
+        'feature-ahead': '(based on latest develop)',
+        'feature-behind': '(is behind develop, may ff)',
+        'feature-diverged': '(may be rebased)',
+        'feature-same': '(no commits yet)',
+        'feature-unrelated': '(unknown base)',
+    }
+
+
+def test_release_list_names_the_base_and_never_none(repo):
+    base = git(repo, 'rev-parse', 'develop')
+    git(repo, 'checkout', '-q', '-b', 'release-1.0.0')
+    commit(repo, 'version.txt', '1.0.0\n')
+    git(repo, 'checkout', '-q', '--orphan', 'release-2.0.0')
+    commit(repo, 'version.txt', '2.0.0\n')
+    git(repo, 'checkout', '-q', 'develop')
+    commit(repo, 'develop.txt', 'develop\n')
+
+    listed = {branch: status for branch, _, status, _ in ReleaseCommand(GitFlow(repo)).list(verbose=True)}
+
+    assert listed == {
+        'release-1.0.0': f"(based on {git(repo, 'rev-parse', '--short', base)})",
+        'release-2.0.0': '(unknown base)',
+    }
@@ -0,0 +1,114 @@
+"""
+Git call tracing, flow step spans and the --profile/--trace CLI options
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import commit, git
+from git_flow import trace
+from git_flow.commands.branch import ReleaseCommand
+from git_flow.core import GitFlow
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def tracer():
+    tracer = trace.enable()
+    yield tracer
+    trace.disable()
+
+
+def test_nothing_is_recorded_while_disabled(repo):
+    assert trace.active() is None
+    with trace.span('step') as current:
+        GitFlow(repo).rev_parse('HEAD^{tree}')
+    assert current is None
+
+
+def test_git_calls_nest_under_flow_steps(repo, tracer):
+    git(repo, 'checkout', '-q', '-b', 'release-1.0.0')
+    commit(repo, 'version.txt', '1.0.0\n')
+    git(repo, 'checkout', '-q', 'develop')
+
+    ReleaseCommand(GitFlow(repo)).finish('1.0.0', tag_message='Release 1.0.0')
+
+    paths = [span.path for span in tracer.spans]
+    assert 'finish release-1.0.0 > merge into main' in paths
+    assert 'finish release-1.0.0 > merge into develop' in paths
+    assert 'finish release-1.0.0 > update refs' in paths
+    merges = [call.span.path for call in tracer.calls if call.subcommand == 'merge-tree']
+    assert merges == ['finish release-1.0.0 > merge into main', 'finish release-1.0.0 > merge into develop']
+    updates = [call for call in tracer.calls if call.subcommand == 'update-ref']
+    assert [(call.span.name, call.returncode) for call in updates] == [('update refs', 0)]
+    assert all(span.end is not None and span.end >= span.start for span in tracer.spans)
+
+
+def test_summary_and_chrome_trace(repo, tracer, tmp_path):
+    gitflow = GitFlow(repo)
+    with trace.span('lookups', count=3):
+        for _ in range(3):
+            gitflow._git_command(['-c', 'core.quotepath=off', 'rev-parse', 'HEAD'])
+        gitflow._git_command(['cat-file', '-t', 'missing'], check=False)
+
+    rows = {row[0]: row for row in tracer.summary()}
+    assert rows['rev-parse'][1] == 3
+    assert rows['rev-parse'][4] == 3 * 41
+    assert rows['rev-parse'][3] == max(call.duration for call in tracer.calls if call.subcommand == 'rev-parse')
+    failed = [call for call in tracer.calls if call.subcommand == 'cat-file']
+    assert failed[0].returncode != 0 and failed[0].stderr_bytes > 0
+    assert tracer.format_summary()[-1].startswith('4 git calls, ')
+
+    path = str(tmp_path / 'trace.json')
+    tracer.write_chrome_trace(path)
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    assert [event['name'] for event in events][:2] == ['lookups', 'git rev-parse']
+    assert events[0]['args'] == {'count': '3'}
+    assert events[1]['args']['span'] == 'lookups'
+    assert events[1]['args']['argv'] == ['git', '-c', 'core.quotepath=off', 'rev-parse', 'HEAD']
+    assert {event['ph'] for event in events} == {'X'}
+
+
+def test_concurrent_tasks_keep_their_own_spans(repo, tracer):
+    gitflow = GitFlow(repo)
+
+    async def step(name):
+        with trace.span(name):
+            await asyncio.sleep(0)
+            await asyncio.to_thread(gitflow._git_command, ['rev-parse', 'HEAD'])
+            await asyncio.sleep(0)
+            gitflow._git_command(['rev-parse', 'develop'])
+
+    async def both():
+        await asyncio.gather(step('one'), step('two'))
+
+    asyncio.run(both())
+
+    by_span = {}
+    for call in tracer.calls:
+        by_span.setdefault(call.span.name, []).append(call.args[-1])
+    assert by_span == {'one': ['HEAD', 'develop'], 'two': ['HEAD', 'develop']}
+    assert len({span.lane for span in tracer.spans}) == 2
+
+
+def test_profile_and_trace_options(repo, tmp_path):
+    path = str(tmp_path / 'trace.json')
+    env = dict(os.environ, PYTHONPATH=PACKAGE_DIR)
+
+    result = subprocess.run([sys.executable, '-m', 'git_flow', '--profile', '--trace', path,
+                             'branch', 'overview'], cwd=repo, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stderr.splitlines()[0].startswith('git subcommand')
+    assert f"Trace written to {path}" in result.stderr
+    with open(path) as f:
+        events = json.load(f)['traceEvents']
+    assert events[0]['name'].startswith('git-flow --profile --trace')
+    assert any(event['cat'] == 'git' for event in events)
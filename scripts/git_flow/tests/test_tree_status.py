@@ -0,0 +1,90 @@
+"""
+Working tree cleanliness from one memoized git status
+"""
+
+import os
+
+import pytest
+
+from conftest import commit, git
+from git_flow.core import GitFlow
+
+
+@pytest.fixture
+def status_calls(monkeypatch):
+    """git status invocations made through any GitFlow during the test"""
+    calls = []
+    run_git = GitFlow._run_git
+
+    def recording(self, args, input=None):
+        if args and args[0] == 'status':
+            calls.append(args)
+        return run_git(self, args, input=input)
+
+    monkeypatch.setattr(GitFlow, '_run_git', recording)
+    return calls
+
+
+def write(repo: str, path: str, content: str):
+    with open(os.path.join(repo, path), 'w') as f:
+        f.write(content)
+
+
+@pytest.mark.parametrize('change', [
+    lambda repo: write(repo, 'README', 'changed\n'),
+    lambda repo: (write(repo, 'staged.txt', 'staged\n'), git(repo, 'add', 'staged.txt')),
+    lambda repo: git(repo, 'rm', '-q', 'README'),
+    lambda repo: git(repo, 'mv', 'README', 'README.md'),
+], ids=['modified', 'staged', 'deleted', 'renamed'])
+def test_tracked_changes_are_dirty(repo, change):
+    assert GitFlow(repo).is_clean_working_tree()
+    change(repo)
+
+    assert not GitFlow(repo).is_clean_working_tree()
+    assert not GitFlow(repo).is_clean_working_tree(untracked=False)
+
+
+def test_untracked_files_count_only_when_asked(repo):
+    write(repo, 'new.txt', 'new\n')
+    gitflow = GitFlow(repo)
+
+    assert gitflow.is_clean_working_tree()
+    assert not gitflow.is_clean_working_tree(untracked=True)
+    assert not GitFlow(repo).is_clean_working_tree(untracked=True)
+
+    gitflow.settings.update_config({'config': {'untracked_dirty': True}})
+    assert not GitFlow(repo).is_clean_working_tree()
+
+
+def test_renamed_path_is_not_read_as_an_untracked_entry(repo):
+    commit(repo, '?odd', 'odd\n')
+    git(repo, 'mv', '?odd', 'plain')
+
+    tracked_changes, has_untracked = GitFlow._parse_tree_status(
+        git(repo, *GitFlow._tree_status_args(True)) + '\0', True)
+
+    assert (tracked_changes, has_untracked) == (True, False)
+
+
+def test_status_is_memoized_until_a_command_touches_the_tree(repo, status_calls):
+    gitflow = GitFlow(repo)
+
+    assert gitflow.is_clean_working_tree()
+    assert gitflow.is_clean_working_tree()
+    # A scan without untracked files cannot answer for them; one with them answers both
+    assert gitflow.is_clean_working_tree(untracked=True)
+    assert gitflow.is_clean_working_tree(untracked=False)
+    assert len(status_calls) == 2
+    assert '--untracked-files=no' in status_calls[0]
+
+    write(repo, 'README', 'changed\n')
+    gitflow._git_command(['add', 'README'])
+    assert not gitflow.is_clean_working_tree()
+    assert len(status_calls) == 3
+
+
+def test_unborn_head_is_not_clean(repo):
+    git(repo, 'checkout', '-q', '--orphan', 'feature-new')
+    git(repo, 'rm', '-q', '-r', '--cached', '.')
+
+    assert not GitFlow(repo).is_clean_working_tree(untracked=False)
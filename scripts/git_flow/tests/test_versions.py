@@ -0,0 +1,96 @@
+"""
+Semantic-version tag index and release/hotfix start --bump
+"""
+
+import pytest
+
+from conftest import git
+from git_flow.commands.branch import HotfixCommand, ReleaseCommand
+from git_flow.core import GitFlow
+from git_flow.versions import Version, VersionIndex
+
+TAGS = ['v1.0.0', 'v1.10.0', 'v1.2.0', 'v1.2.0-rc.1', 'v1.2.0-rc.10', 'v1.2.0-rc.2', 'v1.2.0-beta',
+        'v2.0', 'v2.1.0-alpha', 'v0.9.0+build.5', 'release-3.0.0', 'vnext', 'v01.0.0']
+
+
+def texts(versions) -> list:
+    return [str(version) for version in versions]
+
+
+def test_index_sorts_by_semver_precedence():
+    index = VersionIndex(TAGS, 'v')
+
+    # Other prefixes and non-semver tags are left out
+    assert len(index) == 10
+    assert texts(index.newer('0')) == ['0.9.0+build.5', '1.0.0', '1.2.0-beta', '1.2.0-rc.1', '1.2.0-rc.2',
+                                       '1.2.0-rc.10', '1.2.0', '1.10.0', '2.0', '2.1.0-alpha']
+    assert texts(index.newer('1.2.0')) == ['1.10.0', '2.0', '2.1.0-alpha']
+
+
+def test_latest_and_previous_skip_prereleases():
+    index = VersionIndex(TAGS, 'v')
+
+    assert str(index.latest()) == '2.0'
+    assert str(index.latest(prerelease=True)) == '2.1.0-alpha'
+    assert str(index.previous('1.2.0')) == '1.0.0'
+    assert str(index.previous('2.0.0')) == '1.10.0'
+    assert index.previous('0.9.0') is None
+    with pytest.raises(ValueError, match='Invalid version: next'):
+        index.previous('next')
+
+
+def test_find_matches_equal_versions_written_differently():
+    index = VersionIndex(TAGS, 'v')
+
+    assert str(index.find('2.0.0')) == '2.0'
+    assert str(index.find('0.9.0')) == '0.9.0+build.5'
+    assert '1.2.0-rc.2' in index
+    assert '1.2.0-rc.3' not in index
+    assert 'next' not in index
+    assert index.tag(index.find('2')) == 'v2.0'
+
+
+@pytest.mark.parametrize('part, expected', [('major', '3.0'), ('minor', '2.1'), ('patch', '2.0.1')])
+def test_next_bumps_the_latest_release(part, expected):
+    assert str(VersionIndex(TAGS, 'v').next(part)) == expected
+
+
+def test_next_without_tags_starts_from_zero():
+    index = VersionIndex([], 'v')
+
+    assert index.latest() is None
+    assert texts(index.next(part) for part in ('major', 'minor', 'patch')) == ['1.0.0', '0.1.0', '0.0.1']
+    with pytest.raises(ValueError, match='Invalid bump: micro'):
+        index.next('micro')
+    assert Version.parse('1.2.3-rc.1').bump('patch').text == '1.2.4'
+
+
+def test_release_start_bump_names_the_next_version(repo):
+    git(repo, 'tag', 'v1.2.3')
+    git(repo, 'tag', 'v1.3.0-rc.1')
+    gitflow = GitFlow(repo)
+
+    assert ReleaseCommand(gitflow).start(bump='minor') == '1.3.0'
+    assert git(repo, 'rev-parse', '--abbrev-ref', 'HEAD') == 'release-1.3.0'
+    git(repo, 'checkout', '-q', 'main')
+    assert HotfixCommand(gitflow).start(bump='patch') == '1.2.4'
+    assert git(repo, 'rev-parse', '--abbrev-ref', 'HEAD') == 'hotfix-1.2.4'
+
+
+def test_start_refuses_tagged_versions_and_ambiguous_arguments(repo):
+    git(repo, 'tag', 'v1.2')
+    gitflow = GitFlow(repo)
+
+    with pytest.raises(ValueError, match='Tag v1.2 already exists'):
+        ReleaseCommand(gitflow).start('1.2.0')
+    with pytest.raises(ValueError, match='either a version or a bump'):
+        ReleaseCommand(gitflow).start('1.3.0', bump='minor')
+    with pytest.raises(ValueError, match='A version or a bump is required'):
+        ReleaseCommand(gitflow).start()
+
+    # Tagged by another process: the index is rebuilt with the ref snapshot
+    git(repo, 'tag', 'v1.3.0')
+    gitflow.invalidate()
+    with pytest.raises(ValueError, match='Tag v1.3.0 already exists'):
+        ReleaseCommand(gitflow).start('1.3.0')
+    assert ReleaseCommand(gitflow).start(bump='minor') == '1.4.0'